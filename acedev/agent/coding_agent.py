@@ -1,19 +1,40 @@
 import logging
 import re
 from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Optional
 
-from acedev.agent.prompts import coding_agent_system_prompt
+from acedev.agent.prompts import (
+    coding_agent_system_prompt,
+    coding_agent_retry_prompt,
+    coding_agent_search_replace_system_prompt,
+)
 from acedev.service.model import (
+    AssistantMessage,
+    ChatMessage,
     UserMessage,
     SystemMessage,
     File,
+    FailedHunk,
 )
 from acedev.service.openai_service import OpenAIService
-from acedev.tools.code_editor import CodeEditor, CodeEditorException
+from acedev.tools.code_editor import (
+    CodeEditor,
+    CodeEditorException,
+    DiffResult,
+    hunk_context,
+    parse_search_replace_blocks,
+)
+from acedev.tools.syntax_validator import ParseError, SyntaxValidator
 
 logger = logging.getLogger(__name__)
 
 
+class EditFormat(Enum):
+    DIFF = "diff"
+    SEARCH_REPLACE = "search_replace"
+
+
 @dataclass
 class CodingAgent:
     code_editor: CodeEditor
@@ -21,11 +42,22 @@ class CodingAgent:
     model: str
     temperature: float
     max_retries: int
+    # Candidate diffs sampled per attempt, the first one that applies cleanly is used
+    candidates: int = 1
+    candidate_temperature: float = 0.7
+    # Candidates with valid syntax are preferred when set
+    is_valid: Optional[Callable[[File], bool]] = None
+    # Rejects edits that introduce syntax errors and prefers valid candidates when set
+    syntax_validator: Optional[SyntaxValidator] = None
+    edit_format: EditFormat = EditFormat.DIFF
 
     def edit_file(self, instructions: str, file: File) -> File:
         """
         Edit the file in the given task using the LLM agent.
         """
+        if self.edit_format == EditFormat.SEARCH_REPLACE:
+            return self._edit_file_with_search_replace(instructions, file)
+
         messages = [
             SystemMessage(content=coding_agent_system_prompt()),
             UserMessage(
@@ -33,29 +65,81 @@ class CodingAgent:
             ),
         ]
 
+        # Diffs apply to the file with the hunks applied so far, syntax errors are only
+        # new when the original file does not have them
+        base = file
         for attempt in range(self.max_retries):
             try:
-                response = self.openai_service.invoke(
-                    messages, model=self.model, temperature=self.temperature
-                )
+                responses = self._invoke(messages)
                 pattern = r"```diff(.*?)```"
-                matches = re.findall(pattern, response.content, re.DOTALL)
-                if not matches:
-                    logger.warning(f"No diff found in response on attempt {attempt + 1}: {response.content}")
+                matches = [re.findall(pattern, response.content, re.DOTALL) for response in responses]
+                diffs = [diff_matches[0] for diff_matches in matches if len(diff_matches) == 1]
+
+                if not diffs and not matches[0]:
+                    logger.warning(f"No diff found in response on attempt {attempt + 1}: {responses[0].content}")
                     messages.append(SystemMessage(content=f"No diff found in response. Make sure to wrap diff \
                                                   inside triple ticks with the diff identifier, e.g. ```diff ...```."))
                     continue
 
-                if len(matches) > 1:
+                if not diffs:
                     logger.warning(
-                        f"Multiple diffs found in response on attempt {attempt + 1}: {response.content}"
+                        f"Multiple diffs found in response on attempt {attempt + 1}: {responses[0].content}"
                     )
                     messages.append(SystemMessage(content=f"Multiple diffs found in response. Please respond with just one diff."))
                     continue
 
-                diff = matches[0]
-                logger.info(f"Applying diff to {file.path}:\n{diff}")
-                return self.code_editor.apply_diff(diff, file)
+                results = []
+                for diff in diffs:
+                    logger.info(f"Applying diff to {base.path}:\n{diff}")
+                    results.append(self.code_editor.apply_diff_partially(diff, base))
+
+                applied = [
+                    (diff, result) for diff, result in zip(diffs, results) if not result.failed_hunks
+                ]
+                if applied:
+                    best = self._best_candidate([result for _, result in applied], file)
+                    if not self._new_errors(file, best.file):
+                        return best.file
+
+                    # The best candidate only has syntax errors when all applied candidates do
+                    failed = "\n".join(
+                        "\n".join(str(error) for error in self._new_errors(file, result.file))
+                        + f"\n```diff{diff}```"
+                        for diff, result in applied
+                    )
+                    logger.warning(f"Diff introduces syntax errors on attempt {attempt + 1}:\n{failed}")
+                    if len(applied) == 1:
+                        intro, diffs_before = "The diff below applies, but the edited file has", "this diff"
+                    else:
+                        intro, diffs_before = "The diffs below apply, but each edited file has", "these diffs"
+                    messages.append(SystemMessage(content=f"{intro} syntax errors:\n\
+{failed}\nRespond with a corrected diff against the file before {diffs_before}."))
+                    continue
+
+                result = min(results, key=lambda result: len(result.failed_hunks))
+                logger.warning(
+                    f"{len(result.failed_hunks)} hunks failed to apply on attempt {attempt + 1}"
+                )
+                # Keep the applied hunks and only ask for the failed ones, with the file
+                # lines around them instead of the whole file
+                base = result.file
+                messages = [
+                    SystemMessage(content=coding_agent_system_prompt()),
+                    UserMessage(
+                        content=coding_agent_retry_prompt(
+                            instructions,
+                            base.path,
+                            [
+                                FailedHunk(
+                                    hunk=hunk,
+                                    context=hunk_context(hunk, base.content),
+                                    reason=result.failure_reasons.get(hunk),
+                                )
+                                for hunk in result.failed_hunks
+                            ],
+                        )
+                    ),
+                ]
             except CodeEditorException as e:
                 logger.warning(f"Attempt {attempt + 1} failed, retrying. Error: {e}")
                 messages.append(SystemMessage(content=f"Retry attempt {attempt + 1} due to error: {e}"))
@@ -64,6 +148,94 @@ class CodingAgent:
                 f"All {self.max_retries} attempts to edit the file have failed."
             )
 
+    def _edit_file_with_search_replace(self, instructions: str, file: File) -> File:
+        messages = [
+            SystemMessage(content=coding_agent_search_replace_system_prompt()),
+            UserMessage(
+                content=f"Instructions: {instructions}.\n```{file.path}\n{file.content}```"
+            ),
+        ]
+
+        for attempt in range(self.max_retries):
+            responses = self._invoke(messages)
+
+            results = []
+            errors = []
+            for response in responses:
+                blocks = parse_search_replace_blocks(response.content)
+                if not blocks:
+                    errors.append(
+                        "No search/replace blocks found in response. Make sure to start each block with "
+                        "<<<<<<< SEARCH and end it with >>>>>>> REPLACE."
+                    )
+                    continue
+                try:
+                    results.append(
+                        DiffResult(file=self.code_editor.apply_search_replace(blocks, file))
+                    )
+                except CodeEditorException as e:
+                    errors.append(e.message)
+
+            if results:
+                best = self._best_candidate(results, file)
+                parse_errors = self._new_errors(file, best.file)
+                if not parse_errors:
+                    return best.file
+
+                errors.append(
+                    "The blocks apply, but the edited file has syntax errors:\n"
+                    + "\n".join(str(error) for error in parse_errors)
+                )
+
+            logger.warning(f"Attempt {attempt + 1} failed, retrying. Error: {errors[0]}")
+            messages.append(AssistantMessage(content=responses[0].content))
+            messages.append(
+                SystemMessage(
+                    content=f"Retry attempt {attempt + 1} due to error: {errors[0]}\n"
+                    f"Respond with all search/replace blocks again, against the file before your edit."
+                )
+            )
+        else:
+            raise CodingAgentException(
+                f"All {self.max_retries} attempts to edit the file have failed."
+            )
+
+    def _invoke(self, messages: list[ChatMessage]) -> list[AssistantMessage]:
+        if self.candidates > 1:
+            return self.openai_service.invoke_candidates(
+                messages,
+                n=self.candidates,
+                model=self.model,
+                temperature=self.candidate_temperature,
+            )
+
+        return [
+            self.openai_service.invoke(
+                messages, model=self.model, temperature=self.temperature
+            )
+        ]
+
+    def _best_candidate(self, results: list[DiffResult], file: File) -> DiffResult:
+        """
+        The first candidate without new syntax errors that is_valid accepts, else the first
+        without new syntax errors, else the first one.
+        """
+        if len(results) == 1:
+            return results[0]
+
+        return min(
+            results,
+            key=lambda result: (
+                bool(self._new_errors(file, result.file)),
+                self.is_valid is not None and not self.is_valid(result.file),
+            ),
+        )
+
+    def _new_errors(self, before: File, after: File) -> list[ParseError]:
+        if self.syntax_validator is None:
+            return []
+        return self.syntax_validator.new_errors(before, after)
+
 class CodingAgentException(Exception):
     def __init__(self, message: str) -> None:
         super().__init__(message)
@@ -1,6 +1,7 @@
+import logging
 import os
 from dataclasses import dataclass
-from typing import Sequence
+from typing import Optional, Sequence
 
 from acedev.agent import AgentRunner
 from acedev.agent.prompts import (
@@ -18,6 +19,8 @@ from acedev.service.model import (
 )
 from acedev.tools.tool_provider import ToolProvider
 
+logger = logging.getLogger(__name__)
+
 ACEBOTS_APP_USERNAME = os.getenv("GITHUB_APP_USERNAME", "acebots-ai[bot]")
 
 
@@ -81,7 +84,7 @@ class GitHubAgent:
             )
         else:
             # TODO: use different prompt for not assigned issues
-            system_message = SystemMessage(content=issue_assigned_prompt(issue=issue))
+            system_message = self._issue_system_message(issue)
 
         messages: list[ChatMessage] = [system_message] + self._messages_from_issue(
             issue
@@ -95,9 +98,7 @@ class GitHubAgent:
 
     def handle_issue_assignment(self, issue_number: int) -> None:
         issue = self.github_service.get_issue(issue_number)
-        messages = [
-            SystemMessage(content=issue_assigned_prompt(issue=issue))
-        ] + self._messages_from_issue(issue)
+        messages = [self._issue_system_message(issue)] + self._messages_from_issue(issue)
 
         for message in self.agent_runner.run(messages, self.tools()):
             if isinstance(message, AssistantMessage) and message.content:
@@ -105,6 +106,29 @@ class GitHubAgent:
                     issue_number=issue_number, body=message.content
                 )
 
+    def _issue_system_message(self, issue: Issue) -> SystemMessage:
+        return SystemMessage(
+            content=issue_assigned_prompt(
+                issue=issue, relevant_code=self._relevant_code(issue)
+            )
+        )
+
+    def _relevant_code(self, issue: Issue) -> Optional[str]:
+        """
+        Code matching the issue, so the agent starts from it instead of exploring the outline.
+
+        It is best-effort: the run starts without it if the search fails, and it is skipped
+        without a local mirror, where indexing would download every file before the first step.
+        """
+        if not self.tool_provider.git_repository.local_reads:
+            return None
+
+        try:
+            return self.tool_provider.find_relevant_code(query=f"{issue.title}\n{issue.body}")
+        except Exception:
+            logger.exception(f"Failed to find code relevant to issue #{issue.number}")
+            return None
+
     @staticmethod
     def _message_history_from_review_comment(
         thread: PullRequestReviewThread,
@@ -1,16 +1,21 @@
+import os
+
 from diff_match_patch import diff_match_patch
 from tree_sitter_languages import get_parser, get_language
 
 from acedev.agent import AgentRunner
-from acedev.agent.coding_agent import CodingAgent
+from acedev.agent.coding_agent import CodingAgent, EditFormat
 from acedev.agent.github_agent import GitHubAgent
 from acedev.service.github_service import GitHubService
 from acedev.service.git_repository import GitRepository
 from acedev.service.openai_service import OpenAIService
 from acedev.tools.code_editor import CodeEditor
 from acedev.tools.symbol_manipulator import SymbolManipulator
+from acedev.tools.syntax_validator import LANGUAGE_EXTENSIONS, SyntaxValidator
 from acedev.tools.tool_provider import ToolProvider
 
+EDIT_FORMAT = EditFormat(os.getenv("EDIT_FORMAT", EditFormat.DIFF.value))
+
 
 class GitHubAgentFactory:
 
@@ -21,12 +26,19 @@ class GitHubAgentFactory:
         agent_runner: AgentRunner,
         openai_service: OpenAIService,
     ) -> GitHubAgent:
+        parser = get_parser(git_repo.language)
+
         symbol_manipulator = SymbolManipulator(
             git_repository=git_repo,
-            parser=get_parser(git_repo.language),
+            parser=parser,
             language=get_language(git_repo.language),
         )
 
+        syntax_validator = SyntaxValidator(
+            parser=parser,
+            extensions=LANGUAGE_EXTENSIONS.get(git_repo.language, ()),
+        )
+
         code_editor = CodeEditor()
 
         coding_agent = CodingAgent(
@@ -34,7 +46,9 @@ class GitHubAgentFactory:
             openai_service=openai_service,
             model="gpt-4-turbo-preview",
             temperature=0,
-            max_retries=3
+            max_retries=3,
+            syntax_validator=syntax_validator,
+            edit_format=EDIT_FORMAT,
         )
 
         tool_provider = ToolProvider(
@@ -43,6 +57,7 @@ class GitHubAgentFactory:
             symbol_manipulator=symbol_manipulator,
             code_editor=code_editor,
             coding_agent=coding_agent,
+            syntax_validator=syntax_validator,
         )
 
         return GitHubAgent(
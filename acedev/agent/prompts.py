@@ -1,9 +1,81 @@
-from acedev.service.model import PullRequest, Issue
+import fnmatch
+from typing import Iterator, Optional, Sequence
+
+from acedev.service.model import PullRequest, Issue, FileChange, FailedHunk
 from acedev.utils.prompts import prompt
 
+# Diffs larger than these budgets are summarized and can be read with the get_pr_file_diff tool
+MAX_FILE_DIFF_CHARS = 8_000
+MAX_TOTAL_DIFF_CHARS = 40_000
+
+# Lock files, vendored and generated files are always summarized
+GENERATED_FILE_PATTERNS = [
+    "*.lock",
+    "*-lock.json",
+    "*-lock.yaml",
+    "go.sum",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*.snap",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.generated.*",
+    "vendor/*",
+    "*/vendor/*",
+    "node_modules/*",
+    "*/node_modules/*",
+    "third_party/*",
+    "dist/*",
+]
+
+
+def pull_request_review_comment_prompt(
+    pull_request: PullRequest,
+    max_file_diff_chars: int = MAX_FILE_DIFF_CHARS,
+    max_total_diff_chars: int = MAX_TOTAL_DIFF_CHARS,
+) -> str:
+    files = budget_file_changes(
+        pull_request.files, max_file_diff_chars, max_total_diff_chars
+    )
+    return _pull_request_review_comment_template(pull_request=pull_request, files=files)
+
+
+def budget_file_changes(
+    files: Sequence[FileChange], max_file_diff_chars: int, max_total_diff_chars: int
+) -> Iterator[FileChange]:
+    """Keep small diffs inline and summarize the rest in one line each."""
+    total_diff_chars = 0
+
+    for file in files:
+        if is_generated_file(file.filename):
+            summary = "generated or vendored file, diff omitted"
+            yield file.model_copy(update={"summary": summary})
+            continue
+
+        diff_chars = len(file.diff)
+        if (
+            diff_chars > max_file_diff_chars
+            or total_diff_chars + diff_chars > max_total_diff_chars
+        ):
+            lines = len(file.diff.splitlines())
+            summary = f"{lines} diff lines omitted, use get_pr_file_diff to read them"
+            yield file.model_copy(update={"summary": summary})
+            continue
+
+        total_diff_chars += diff_chars
+        yield file
+
+
+def is_generated_file(filename: str) -> bool:
+    return any(fnmatch.fnmatch(filename, pattern) for pattern in GENERATED_FILE_PATTERNS)
+
 
 @prompt
-def pull_request_review_comment_prompt(pull_request: PullRequest) -> None:
+def _pull_request_review_comment_template(
+    pull_request: PullRequest, files: Iterator[FileChange]
+) -> None:
     """
     You are AceDev, an AI member of the software engineering team. You have opened a pull
     request and are waiting for a review. When a review comment is posted, you should reply
@@ -17,12 +89,17 @@ def pull_request_review_comment_prompt(pull_request: PullRequest) -> None:
     {{ pull_request.body }}
 
     Pull request files:
-    {% for file in pull_request.files %}
+    {% for file in files %}
+    {% if file.summary %}
+    {{ file.status }} {{ file.filename }} ({{ file.summary }})
+
+    {% else %}
     {{ file.status }} {{ file.filename }}
     ```diff
     {{ file.diff }}
     ```
 
+    {% endif %}
     {% endfor -%}
 
     Here's what I expect from you now:
@@ -35,7 +112,7 @@ def pull_request_review_comment_prompt(pull_request: PullRequest) -> None:
 
 
 @prompt
-def issue_assigned_prompt(issue: Issue) -> None:
+def issue_assigned_prompt(issue: Issue, relevant_code: Optional[str] = None) -> None:
     """
     You are AceDev, an AI assistant for software engineering.
 
@@ -46,8 +123,17 @@ def issue_assigned_prompt(issue: Issue) -> None:
     Issue body:
     {{ issue.body }}
 
+    {% if relevant_code %}
+    Code that may be relevant to the issue, found by matching its words against the repository:
+    {{ relevant_code }}
+
+    {% endif %}
     Here's what I expect from you now:
+    {% if relevant_code %}
+    1. Start from the code above. Check out the high-level overview of the project only if it is not enough.
+    {% else %}
     1. Check out the high-level overview of the project.
+    {% endif %}
     2. Expand any files if needed.
     3. Give me a 4-5 bullet-point plan for implementation. Be specific and include any relevant code snippets. The plan
     must contain the list of files that need to be changed and the changes that need to be made. If there are multiple
@@ -128,3 +214,66 @@ def coding_agent_system_prompt() -> None:
 
     ```
     """
+
+
+@prompt
+def coding_agent_retry_prompt(
+    instructions: str, path: str, failed_hunks: Sequence[FailedHunk]
+) -> None:
+    """
+    Instructions: {{ instructions }}.
+
+    Your previous diff was applied to {{ path }} except for the hunks below. Their context and removed lines
+    don't match the current contents of the file, or match more than one place in it. The hunks that applied
+    are already in the file, don't repeat them.
+
+    {% for failed_hunk in failed_hunks %}
+    Failed hunk:
+    ```diff
+    {{ failed_hunk.hunk }}
+    ```
+    {% if failed_hunk.reason %}
+    {{ failed_hunk.reason }}.
+    {% endif %}
+
+    Current lines of {{ path }} around it (line numbers are not part of the file):
+    ```
+    {{ failed_hunk.context }}
+    ```
+
+    {% endfor -%}
+    Respond with a diff that contains only the corrected versions of the failed hunks.
+    """
+
+
+@prompt
+def coding_agent_search_replace_system_prompt() -> None:
+    """
+    You are software engineer. When you get a source code and a task you'll respond with search/replace blocks containing all required changes.
+
+    Search/replace rules:
+
+    * Start each block with `<<<<<<< SEARCH`, separate the search and the replace part with `=======` and end the block with `>>>>>>> REPLACE`.
+    * The search part must be copied from the current contents of the file. Leading and trailing whitespace of the lines is ignored.
+    * The search part must match exactly one place in the file. Include enough lines to make it unique.
+    * Keep the search part short. Include the lines that change and a line or two around them.
+    * Use a separate block for each section of the file that needs changes. Blocks must not overlap.
+    * To delete code, leave the replace part empty.
+    * To add code at the end of the file, leave the search part empty.
+    * Indentation matters in the replace part!
+
+    Example:
+
+    ```
+    <<<<<<< SEARCH
+        def existing_method_one(self):
+            print("This is an existing method in the class.")
+    =======
+        def existing_method_one(self):
+            print("This is an existing method in the class.")
+
+        def new_method(self):
+            print("This is a new method added to the class.")
+    >>>>>>> REPLACE
+    ```
+    """
@@ -7,6 +7,7 @@ from acedev.api import webhook, root
 from acedev.api.settings import ApiSettings
 from acedev.agent.openai_agent_runner import OpenAIAgentRunner
 from acedev.service.openai_service import OpenAIService
+from acedev.service.rate_limit_scheduler import RateLimitScheduler
 
 
 def get_api(
@@ -14,6 +15,7 @@ def get_api(
     openai_service: OpenAIService,
     openai_agent: OpenAIAgentRunner,
     github_agent_factory: GitHubAgentFactory,
+    rate_limit_scheduler: RateLimitScheduler,
 ) -> fastapi.FastAPI:
     """Create and set up the API.
 
@@ -44,6 +46,7 @@ def get_api(
     api.state.openai_service = openai_service
     api.state.openai_agent = openai_agent
     api.state.github_agent_factory = github_agent_factory
+    api.state.rate_limit_scheduler = rate_limit_scheduler
 
     # Add CORS middleware, almost required if the API is to be used from a
     # browser. The CORS origins are configured in the settings.
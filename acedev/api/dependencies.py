@@ -5,6 +5,7 @@ from acedev.agent.github_agent_factory import GitHubAgentFactory
 from acedev.api.settings import ApiSettings
 from acedev.agent.openai_agent_runner import OpenAIAgentRunner
 from acedev.service.openai_service import OpenAIService
+from acedev.service.rate_limit_scheduler import RateLimitScheduler
 
 
 def get_ghe_client(request: Request) -> GithubIntegration:
@@ -25,3 +26,7 @@ def get_api_settings(request: Request) -> ApiSettings:
 
 def get_github_agent_factory(request: Request) -> GitHubAgentFactory:
     return request.app.state.github_agent_factory  # type: ignore[no-any-return]
+
+
+def get_rate_limit_scheduler(request: Request) -> RateLimitScheduler:
+    return request.app.state.rate_limit_scheduler  # type: ignore[no-any-return]
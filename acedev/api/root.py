@@ -1,7 +1,8 @@
 import fastapi
 
-from acedev.api.dependencies import get_api_settings
+from acedev.api.dependencies import get_api_settings, get_rate_limit_scheduler
 from acedev.api.settings import ApiSettings
+from acedev.service.rate_limit_scheduler import RateLimitBudget, RateLimitScheduler
 
 router = fastapi.APIRouter()
 
@@ -17,3 +18,18 @@ def get_root(
     not matter.
     """
     return f"{api_settings.title}, version {api_settings.version}"
+
+
+@router.get(
+    "/metrics/rate-limits",
+    summary="Current GitHub rate limit budget per installation",
+)
+def get_rate_limits(
+    rate_limit_scheduler: RateLimitScheduler = fastapi.Depends(get_rate_limit_scheduler),
+) -> dict[int, RateLimitBudget]:
+    """Rate limit metrics.
+
+    Returns the remaining GitHub rate limit budget per installation, as last
+    reported by the response headers of the GitHub API.
+    """
+    return rate_limit_scheduler.budgets()
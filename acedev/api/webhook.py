@@ -5,6 +5,7 @@ from typing import Annotated, Any, Optional
 import fastapi
 from fastapi import BackgroundTasks, Body, Depends, Header
 from github import GithubIntegration
+from github.Repository import Repository as GitHubRepository
 from pydantic import BaseModel
 
 from acedev.agent.github_agent_factory import GitHubAgentFactory
@@ -14,15 +15,24 @@ from acedev.api.dependencies import (
     get_openai_agent,
     get_github_agent_factory,
     get_openai_service,
+    get_rate_limit_scheduler,
 )
+from acedev.service.etag_cache import installation_scope
+from acedev.service.git_mirror import GitMirror, MirroredGitRepository
 from acedev.service.git_repository import GitRepository
 from acedev.service.github_service import GitHubService
 from acedev.service.openai_service import OpenAIService
+from acedev.service.rate_limit_scheduler import (
+    InstallationRateLimiter,
+    RateLimitScheduler,
+)
 
 router = fastapi.APIRouter()
 logger = logging.getLogger(__name__)
 
 ACEDEV_USERNAME = os.getenv("GITHUB_BOT_USERNAME", "acedev-ai")
+# Directory with local bare mirrors of the repositories. Code is read through the API if not set.
+GIT_MIRROR_DIR = os.getenv("GIT_MIRROR_DIR")
 
 
 class User(BaseModel):
@@ -54,6 +64,7 @@ class PullRequest(BaseModel):
 
 class Repository(BaseModel):
     full_name: str
+    clone_url: Optional[str] = None
 
 
 class Installation(BaseModel):
@@ -122,6 +133,17 @@ class IssueAssignedPayload(BaseModel):
     repository: Repository
 
 
+class PushPayload(BaseModel):
+    """
+    Payload for push event.
+    See https://docs.github.com/en/webhooks/webhook-events-and-payloads#push
+    """
+
+    ref: str
+    installation: Installation
+    repository: Repository
+
+
 @router.post(
     "/webhook",
     summary="Webhook for Github events.",
@@ -135,6 +157,7 @@ def webhook(
     openai_agent: OpenAIAgentRunner = Depends(get_openai_agent),
     github_agent_factory: GitHubAgentFactory = Depends(get_github_agent_factory),
     openai_service: OpenAIService = Depends(get_openai_service),
+    rate_limit_scheduler: RateLimitScheduler = Depends(get_rate_limit_scheduler),
 ) -> fastapi.Response:
     logger.info(f"Received {x_github_event=}")
     logger.debug(f"{payload=}")
@@ -155,6 +178,7 @@ def webhook(
                     openai_agent,
                     github_agent_factory,
                     openai_service,
+                    rate_limit_scheduler,
                 )
         case "issue_comment":
             issue_comment = IssueCommentPayload(**payload)
@@ -172,6 +196,7 @@ def webhook(
                     openai_agent,
                     github_agent_factory,
                     openai_service,
+                    rate_limit_scheduler,
                 )
         case "issues":
             if payload.get("action", None) == "assigned":
@@ -185,7 +210,13 @@ def webhook(
                         openai_agent,
                         github_agent_factory,
                         openai_service,
+                        rate_limit_scheduler,
                     )
+        case "push":
+            if GIT_MIRROR_DIR:
+                background_tasks.add_task(
+                    handle_push, PushPayload(**payload), ghe_client
+                )
         case _:
             logger.warning(f"Unexpected event: {x_github_event}")
 
@@ -198,23 +229,29 @@ def handle_pull_request_review_comment(
     openai_agent: OpenAIAgentRunner,
     github_agent_factory: GitHubAgentFactory,
     openai_service: OpenAIService,
+    rate_limit_scheduler: RateLimitScheduler,
 ) -> None:
     try:
-        github_repo = github_client.get_github_for_installation(
-            payload.installation.id
-        ).get_repo(payload.repository.full_name)
-
-        github_agent = github_agent_factory.create(
-            git_repo=GitRepository(github_repo),
-            github_service=GitHubService(github_repo),
-            agent_runner=openai_agent,
-            openai_service=openai_service,
-        )
-
-        github_agent.handle_pull_request_review_comment(
-            comment_id=payload.comment.id,
-            pull_request_number=payload.pull_request.number,
-        )
+        with installation_scope(payload.installation.id):
+            github = github_client.get_github_for_installation(payload.installation.id)
+            github_repo = github.get_repo(payload.repository.full_name)
+            rate_limiter = rate_limit_scheduler.for_installation(
+                payload.installation.id, github
+            )
+
+            github_agent = github_agent_factory.create(
+                git_repo=create_git_repository(
+                    github_client, payload.installation.id, github_repo, rate_limiter
+                ),
+                github_service=GitHubService(github_repo, rate_limiter),
+                agent_runner=openai_agent,
+                openai_service=openai_service,
+            )
+
+            github_agent.handle_pull_request_review_comment(
+                comment_id=payload.comment.id,
+                pull_request_number=payload.pull_request.number,
+            )
     except Exception:
         logger.exception(f"Failed to handle pull request review comment: {payload=}")
 
@@ -225,22 +262,28 @@ def handle_issue_comment(
     openai_agent: OpenAIAgentRunner,
     github_agent_factory: GitHubAgentFactory,
     openai_service: OpenAIService,
+    rate_limit_scheduler: RateLimitScheduler,
 ) -> None:
     try:
-        github_repo = github_client.get_github_for_installation(
-            payload.installation.id
-        ).get_repo(payload.repository.full_name)
-
-        github_agent = github_agent_factory.create(
-            git_repo=GitRepository(github_repo),
-            github_service=GitHubService(github_repo),
-            agent_runner=openai_agent,
-            openai_service=openai_service,
-        )
-
-        github_agent.handle_issue_comment(
-            issue_number=payload.issue.number,
-        )
+        with installation_scope(payload.installation.id):
+            github = github_client.get_github_for_installation(payload.installation.id)
+            github_repo = github.get_repo(payload.repository.full_name)
+            rate_limiter = rate_limit_scheduler.for_installation(
+                payload.installation.id, github
+            )
+
+            github_agent = github_agent_factory.create(
+                git_repo=create_git_repository(
+                    github_client, payload.installation.id, github_repo, rate_limiter
+                ),
+                github_service=GitHubService(github_repo, rate_limiter),
+                agent_runner=openai_agent,
+                openai_service=openai_service,
+            )
+
+            github_agent.handle_issue_comment(
+                issue_number=payload.issue.number,
+            )
     except Exception:
         logger.exception(f"Failed to handle issue comment: {payload=}")
 
@@ -251,21 +294,70 @@ def handle_assigned_issue(
     openai_agent: OpenAIAgentRunner,
     github_agent_factory: GitHubAgentFactory,
     openai_service: OpenAIService,
+    rate_limit_scheduler: RateLimitScheduler,
 ) -> None:
     try:
-        github_repo = github_client.get_github_for_installation(
-            payload.installation.id
-        ).get_repo(payload.repository.full_name)
-
-        github_agent = github_agent_factory.create(
-            git_repo=GitRepository(github_repo),
-            github_service=GitHubService(github_repo),
-            agent_runner=openai_agent,
-            openai_service=openai_service,
-        )
+        with installation_scope(payload.installation.id):
+            github = github_client.get_github_for_installation(payload.installation.id)
+            github_repo = github.get_repo(payload.repository.full_name)
+            rate_limiter = rate_limit_scheduler.for_installation(
+                payload.installation.id, github
+            )
+
+            github_agent = github_agent_factory.create(
+                git_repo=create_git_repository(
+                    github_client, payload.installation.id, github_repo, rate_limiter
+                ),
+                github_service=GitHubService(github_repo, rate_limiter),
+                agent_runner=openai_agent,
+                openai_service=openai_service,
+            )
+
+            github_agent.handle_issue_assignment(
+                issue_number=payload.issue.number,
+            )
+    except Exception:
+        logger.exception(f"Failed to handle assigned issue: {payload=}")
 
-        github_agent.handle_issue_assignment(
-            issue_number=payload.issue.number,
+
+def handle_push(payload: PushPayload, github_client: GithubIntegration) -> None:
+    try:
+        mirror = git_mirror(payload.repository.full_name)
+        if mirror is None:
+            return
+        mirror.sync(
+            payload.repository.clone_url,
+            token=access_token(github_client, payload.installation.id),
         )
     except Exception:
-        logger.exception(f"Failed to handle assigned issue: {payload=}")
+        logger.exception(f"Failed to update git mirror: {payload=}")
+
+
+def create_git_repository(
+    github_client: GithubIntegration,
+    installation_id: int,
+    github_repo: GitHubRepository,
+    rate_limiter: InstallationRateLimiter,
+) -> GitRepository:
+    mirror = git_mirror(github_repo.full_name)
+    if mirror is None:
+        return GitRepository(github_repo, rate_limiter)
+
+    return MirroredGitRepository(
+        github_repo,
+        mirror=mirror,
+        remote_url=github_repo.clone_url,
+        token=access_token(github_client, installation_id),
+        rate_limiter=rate_limiter,
+    )
+
+
+def git_mirror(full_name: str) -> Optional[GitMirror]:
+    """The mirror of the repository, or None if mirrors are not configured."""
+    if not GIT_MIRROR_DIR:
+        return None
+    return GitMirror(os.path.join(GIT_MIRROR_DIR, f"{full_name}.git"))
+
+
+def access_token(github_client: GithubIntegration, installation_id: int) -> str:
+    return github_client.get_access_token(installation_id).token
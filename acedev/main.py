@@ -8,7 +8,10 @@ from replit.object_storage import Client
 from acedev.agent.github_agent_factory import GitHubAgentFactory
 from acedev.api.api import get_api
 from acedev.agent.openai_agent_runner import OpenAIAgentRunner
+from acedev.service.etag_cache import ETagCache
 from acedev.service.openai_service import OpenAIService
+from acedev.service.rate_limit_scheduler import RateLimitScheduler
+from acedev.service.response_cache import ResponseCache
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s : %(message)s")
 
@@ -18,6 +21,8 @@ load_dotenv()
 
 c = Client()
 
+ETagCache().install()
+
 auth = Auth.AppAuth(
     app_id=int(os.environ["GITHUB_APP_ID"]),
     private_key=c.download_as_text("hide-app.2024-10-21.private-key.pem"),
@@ -28,7 +33,12 @@ ghe_client = GithubIntegration(
 )
 
 github_agent_factory = GitHubAgentFactory()
-openai_service = OpenAIService()
+rate_limit_scheduler = RateLimitScheduler()
+openai_service = OpenAIService(
+    response_cache=(
+        ResponseCache(os.environ["LLM_CACHE_PATH"]) if os.environ.get("LLM_CACHE_PATH") else None
+    )
+)
 openai_agent = OpenAIAgentRunner(
     model="gpt-4o", temperature=0.0, openai_service=openai_service
 )
@@ -38,4 +48,5 @@ main = get_api(
     openai_service=openai_service,
     openai_agent=openai_agent,
     github_agent_factory=github_agent_factory,
+    rate_limit_scheduler=rate_limit_scheduler,
 )
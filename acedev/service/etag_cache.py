@@ -0,0 +1,183 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Iterator, Optional
+
+import requests
+from github.Requester import (
+    HTTPRequestsConnectionClass,
+    HTTPSRequestsConnectionClass,
+    Requester,
+    RequestsResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+# Installation whose requests are being made, which scopes the cached responses
+_installation_id: ContextVar[Optional[int]] = ContextVar("installation_id", default=None)
+
+
+@contextmanager
+def installation_scope(installation_id: int) -> Iterator[None]:
+    """
+    Cache the responses of the requests made in the block under the installation.
+
+    Installation tokens expire after an hour, so responses cached under the token
+    would be revalidated with it only for as long as it lives.
+    """
+    token = _installation_id.set(installation_id)
+    try:
+        yield
+    finally:
+        _installation_id.reset(token)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    etag: str
+    headers: dict[str, str]
+    text: str
+
+    @property
+    def size(self) -> int:
+        return len(self.text) + sum(len(name) + len(value) for name, value in self.headers.items())
+
+
+@dataclass
+class ETagCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+@dataclass
+class ETagCache:
+    """
+    HTTP-level cache of GitHub GET responses keyed by URL, Accept header and auth scope.
+
+    Cached responses are revalidated with ``If-None-Match``. GitHub answers with
+    ``304 Not Modified`` when the resource is unchanged, which is served from the cache
+    and does not count against the rate limit. The least recently used responses are
+    evicted once there are ``max_entries`` of them or they take ``max_size`` characters.
+    """
+
+    max_entries: int = 4096
+    max_size: int = 64 * 1024 * 1024
+    stats: ETagCacheStats = field(default_factory=ETagCacheStats)
+    _entries: "OrderedDict[tuple[str, str, str], CachedResponse]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _size: int = field(default=0, init=False, repr=False)
+    _sessions: dict[str, requests.Session] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def install(self) -> None:
+        """Route all PyGithub HTTPS requests through the cache."""
+        connection_class = type(
+            "ETagCachingConnection", (ETagCachingConnection,), {"cache": self}
+        )
+        Requester.injectConnectionClasses(HTTPRequestsConnectionClass, connection_class)
+
+    def get(self, key: tuple[str, str, str]) -> Optional[CachedResponse]:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: tuple[str, str, str], response: CachedResponse) -> None:
+        if response.size > self.max_size:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = response
+            self._size += response.size
+            while len(self._entries) > self.max_entries or self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def session(self, base_url: str, session: requests.Session) -> requests.Session:
+        """Share one HTTP session per host, so connections are kept alive between requests."""
+        with self._lock:
+            return self._sessions.setdefault(base_url, session)
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+    @staticmethod
+    def key(url: str, headers: dict[str, str]) -> tuple[str, str, str]:
+        authorization = headers.get("Authorization", "")
+        installation_id = _installation_id.get()
+        if installation_id is not None:
+            # The scheme tells the installation token from the app's own JWT
+            auth_scope = f"{installation_id}:{authorization.split(' ', 1)[0]}"
+        else:
+            auth_scope = hashlib.sha256(authorization.encode()).hexdigest()
+        return url, headers.get("Accept", ""), auth_scope
+
+
+class CachedRequestsResponse(RequestsResponse):
+    # mimic RequestsResponse for responses served from the cache
+    def __init__(self, status: int, headers: dict[str, str], text: str) -> None:
+        self.status = status
+        self.headers = headers  # type: ignore[assignment]
+        self.text = text
+
+
+class ETagCachingConnection(HTTPSRequestsConnectionClass):
+    cache: ClassVar[ETagCache]
+
+    def __init__(self, host: str, port: Optional[int] = None, **kwargs: Any) -> None:
+        super().__init__(host, port, **kwargs)
+        # PyGithub creates a new connection per request when connection classes are injected
+        self.session = self.cache.session(f"{self.protocol}://{host}:{self.port}", self.session)
+
+    def getresponse(self) -> RequestsResponse:
+        if self.verb != "GET":
+            return super().getresponse()
+
+        key = self.cache.key(self.url, self.headers)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.headers = {**self.headers, "If-None-Match": cached.etag}
+
+        response = super().getresponse()
+
+        if cached is not None and response.status == 304:
+            self.cache.record(hit=True)
+            logger.debug(f"Not modified: {self.url}")
+            # Fresh rate limit headers come with the 304 response
+            rate_limit_headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower().startswith("x-ratelimit-")
+            }
+            return CachedRequestsResponse(
+                status=200,
+                headers={**cached.headers, **rate_limit_headers},
+                text=cached.text,
+            )
+
+        self.cache.record(hit=False)
+        etag = response.headers.get("ETag")
+        if response.status == 200 and etag:
+            self.cache.put(
+                key,
+                CachedResponse(etag=etag, headers=dict(response.headers), text=response.text),
+            )
+
+        return response
+
+    def close(self) -> None:
+        # The session is shared between connections and stays open
+        pass
@@ -0,0 +1,254 @@
+import base64
+import logging
+import os
+import re
+import subprocess
+import threading
+from typing import ClassVar, Generator, Optional, Sequence
+
+from github.Repository import Repository
+
+from acedev.service.git_repository import GitRepository, GitRepositoryException, is_ignored
+from acedev.service.model import File, TreeEntry
+from acedev.service.rate_limit_scheduler import InstallationRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Credentials in URLs, e.g. https://x-access-token:<token>@github.com
+URL_CREDENTIALS_PATTERN = re.compile(r"(?<=://)[^/@\s]+@")
+
+
+class GitMirror:
+    """
+    Local bare mirror of the remote branches of one repository.
+
+    Trees and blobs are read with ``git ls-tree`` and ``git cat-file`` straight from
+    the packfiles, which git maps into memory, so reads need no network round trips.
+    """
+
+    _locks: ClassVar[dict[str, threading.Lock]] = {}
+    _locks_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __repr__(self) -> str:
+        return f"GitMirror({self.path})"
+
+    def sync(self, remote_url: str, token: Optional[str] = None) -> None:
+        """Create the mirror if needed and fetch all branches from the remote."""
+        with self._lock():
+            if not os.path.isdir(self.path):
+                logger.info(f"Creating git mirror: {self.path}")
+                os.makedirs(self.path)
+                self._git("init", "--bare", "--quiet")
+
+            # The token is passed in the environment, so it is neither stored in the
+            # config nor visible in the process list
+            env = None
+            if token is not None:
+                credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+                env = {
+                    **os.environ,
+                    "GIT_CONFIG_COUNT": "1",
+                    "GIT_CONFIG_KEY_0": "http.extraHeader",
+                    "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+                }
+            self._git(
+                "fetch", "--prune", "--no-tags", "--quiet",
+                remote_url, "+refs/heads/*:refs/heads/*",
+                env=env,
+            )
+
+    def branches(self) -> list[str]:
+        output = self._git("for-each-ref", "--format=%(refname)", "refs/heads")
+        return [ref.removeprefix("refs/heads/") for ref in output.decode().splitlines()]
+
+    def resolve(self, branch: str) -> Optional[str]:
+        try:
+            output = self._git("rev-parse", "--verify", "--quiet", f"refs/heads/{branch}^{{commit}}")
+        except GitRepositoryException:
+            return None
+        return output.decode().strip()
+
+    def list_tree(self, commit: str, path: str = "") -> list[TreeEntry]:
+        args = ["ls-tree", "-r", "-l", "-z", "--full-tree", commit]
+        if path:
+            args += ["--", path]
+
+        entries = []
+        for line in self._git(*args).decode("utf-8").split("\0"):
+            if not line:
+                continue
+            info, entry_path = line.split("\t", 1)
+            _, entry_type, sha, size = info.split()
+            entries.append(
+                TreeEntry(
+                    path=entry_path,
+                    type=entry_type,
+                    size=None if size == "-" else int(size),
+                    sha=sha,
+                )
+            )
+        return entries
+
+    def read_blobs(self, commit: str, paths: Sequence[str]) -> dict[str, Optional[bytes]]:
+        """Read the blobs at the given paths in a single ``git cat-file --batch`` call."""
+        return dict(zip(paths, self._cat_file([f"{commit}:{path}" for path in paths])))
+
+    def read_objects(self, shas: Sequence[str]) -> dict[str, Optional[bytes]]:
+        """Read the blobs with the given object ids in a single ``git cat-file --batch`` call."""
+        return dict(zip(shas, self._cat_file(shas)))
+
+    def read_blob(self, commit: str, path: str) -> Optional[bytes]:
+        return self.read_blobs(commit, [path])[path]
+
+    def _cat_file(self, objects: Sequence[str]) -> list[Optional[bytes]]:
+        if not objects:
+            return []
+
+        batch = "".join(f"{name}\n" for name in objects).encode("utf-8")
+        output = self._git("cat-file", "--batch", input=batch)
+
+        blobs: list[Optional[bytes]] = []
+        offset = 0
+        for _ in objects:
+            header_end = output.index(b"\n", offset)
+            header = output[offset:header_end].split()
+            offset = header_end + 1
+
+            if header[-1] == b"missing" or header[-1] == b"ambiguous":
+                blobs.append(None)
+                continue
+
+            size = int(header[2])
+            blobs.append(output[offset:offset + size] if header[1] == b"blob" else None)
+            offset += size + 1
+
+        return blobs
+
+    def _lock(self) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(os.path.abspath(self.path), threading.Lock())
+
+    def _git(
+        self, *args: str, input: Optional[bytes] = None, env: Optional[dict[str, str]] = None
+    ) -> bytes:
+        process = subprocess.run(
+            ["git", f"--git-dir={self.path}", *args],
+            input=input,
+            capture_output=True,
+            env=env,
+        )
+        if process.returncode != 0:
+            stderr = process.stderr.decode("utf-8", errors="replace").strip()
+            raise GitRepositoryException(
+                f"git {args[0]} failed: {URL_CREDENTIALS_PATTERN.sub('***@', stderr)}"
+            )
+        return process.stdout
+
+
+class MirroredGitRepository(GitRepository):
+    """
+    GitRepository that serves reads from a local GitMirror and writes through the API.
+
+    The mirror is fetched before the first read and again after every write,
+    so reads always see the latest remote state.
+    """
+
+    local_reads = True
+
+    def __init__(
+        self,
+        github_repo: Repository,
+        mirror: GitMirror,
+        remote_url: str,
+        token: Optional[str] = None,
+        rate_limiter: Optional[InstallationRateLimiter] = None,
+    ) -> None:
+        super().__init__(github_repo, rate_limiter)
+        self.mirror = mirror
+        self.remote_url = remote_url
+        self.token = token
+        self._synced = False
+        self._sync_lock = threading.Lock()
+
+    def get_files(
+        self, path: str = "", branch: Optional[str] = None
+    ) -> Generator[File, None, None]:
+        commit = self._commit(branch or self.default_branch)
+
+        entries = [
+            entry
+            for entry in self.mirror.list_tree(commit, path)
+            if entry.type == "blob"
+            and not any(is_ignored(name) for name in entry.path.split("/"))
+        ]
+        blobs = self.mirror.read_blobs(commit, [entry.path for entry in entries])
+
+        for entry in entries:
+            logger.info(f"Processing file: {entry.path}. Size: {entry.size}")
+            yield File(path=entry.path, content=blobs[entry.path].decode("utf-8"))
+
+    def get_file(self, path: str, branch: Optional[str] = None) -> Optional[File]:
+        try:
+            commit = self._commit(branch or self.default_branch)
+        except GitRepositoryException:
+            return None
+
+        content = self.mirror.read_blob(commit, path)
+        if content is None:
+            return None
+        return File(path=path, content=content.decode("utf-8"))
+
+    def get_files_by_path(
+        self, paths: Sequence[str], branch: Optional[str] = None
+    ) -> dict[str, Optional[File]]:
+        commit = self._commit(branch or self.default_branch)
+        blobs = self.mirror.read_blobs(commit, list(dict.fromkeys(paths)))
+        return {
+            path: None if content is None else File(path=path, content=content.decode("utf-8"))
+            for path, content in blobs.items()
+        }
+
+    def get_tree(self, branch: Optional[str] = None) -> list[TreeEntry]:
+        commit = self._commit(branch or self.default_branch)
+        return [entry for entry in self.mirror.list_tree(commit) if entry.type == "blob"]
+
+    def get_blobs(self, shas: Sequence[str]) -> dict[str, Optional[bytes]]:
+        self._sync()
+        return self.mirror.read_objects(list(dict.fromkeys(shas)))
+
+    def branch_exists(self, branch: str) -> bool:
+        self._sync()
+        return self.mirror.resolve(branch) is not None
+
+    def create_new_branch(self, branch: str) -> str:
+        ref = super().create_new_branch(branch)
+        self._synced = False
+        return ref
+
+    def update_file(self, file: File, branch: str) -> None:
+        super().update_file(file, branch)
+        self._synced = False
+
+    def create_file(self, file: File, branch: str) -> None:
+        super().create_file(file, branch)
+        self._synced = False
+
+    def delete_file(self, file: File, branch: str) -> None:
+        super().delete_file(file, branch)
+        self._synced = False
+
+    def _sync(self) -> None:
+        with self._sync_lock:
+            if not self._synced:
+                self.mirror.sync(self.remote_url, token=self.token)
+                self._synced = True
+
+    def _commit(self, branch: str) -> str:
+        self._sync()
+        commit = self.mirror.resolve(branch)
+        if commit is None:
+            raise GitRepositoryException(f"Branch does not exist: {branch}")
+        return commit
@@ -1,10 +1,17 @@
+import base64
 import logging
-from typing import Generator, Optional
+from typing import Generator, Optional, Sequence
 
 from github import UnknownObjectException
 from github.Repository import Repository
 
-from acedev.service.model import File
+from acedev.service.model import File, TreeEntry
+from acedev.service.rate_limit_scheduler import (
+    InstallationRateLimiter,
+    RequestPriority,
+    throttle,
+    throttled,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +35,25 @@ FILES_IGNORE = [
 ]
 
 
+def is_ignored(name: str) -> bool:
+    return name.startswith(".") or any(pattern in name for pattern in FILES_IGNORE)
+
+
+def _rate_limited(message: str) -> Exception:
+    return GitRepositoryException(message)
+
+
 class GitRepository:
-    def __init__(self, github_repo: Repository) -> None:
+    # Reads cost one API request per file, so reading the whole tree is expensive
+    local_reads = False
+
+    def __init__(
+        self,
+        github_repo: Repository,
+        rate_limiter: Optional[InstallationRateLimiter] = None,
+    ) -> None:
         self.github_repo = github_repo
+        self.rate_limiter = rate_limiter
         self.default_branch = github_repo.default_branch
         self.full_name = github_repo.full_name
         self.language = (github_repo.language or
@@ -42,12 +65,12 @@ class GitRepository:
     def get_files(
         self, path: str = "", branch: Optional[str] = None
     ) -> Generator[File, None, None]:
-        for file in self.github_repo.get_contents(path, branch or self.default_branch):  # type: ignore[union-attr]
-            if file.name.startswith("."):
-                continue
+        with throttle(self.rate_limiter, RequestPriority.BULK, _rate_limited):
+            contents = self.github_repo.get_contents(path, branch or self.default_branch)
 
+        for file in contents:  # type: ignore[union-attr]
             # TODO: handle images and other non-textual files
-            if any(pattern in file.name for pattern in FILES_IGNORE):
+            if is_ignored(file.name):
                 continue
 
             if file.type == "dir":
@@ -57,9 +80,11 @@ class GitRepository:
             logger.info(
                 f"Processing file: {file.path}. Encoding: {file.encoding}. Size: {file.size}"
             )
-            content = file.decoded_content
+            with throttle(self.rate_limiter, RequestPriority.BULK, _rate_limited):
+                content = file.decoded_content
             yield File(path=file.path, content=content.decode("utf-8"),)
 
+    @throttled(RequestPriority.BULK, _rate_limited)
     def get_file(self, path: str, branch: Optional[str] = None) -> Optional[File]:
         try:
             file = self.github_repo.get_contents(path, branch or self.default_branch)  # type: ignore[union-attr]
@@ -68,6 +93,49 @@ class GitRepository:
         except UnknownObjectException:
             return None
 
+    def get_files_by_path(
+        self, paths: Sequence[str], branch: Optional[str] = None
+    ) -> dict[str, Optional[File]]:
+        """Read the files at the given paths, None for the paths that do not exist."""
+        return {path: self.get_file(path, branch) for path in dict.fromkeys(paths)}
+
+    @throttled(RequestPriority.BULK, _rate_limited)
+    def get_tree(self, branch: Optional[str] = None) -> list[TreeEntry]:
+        """List the blobs of the branch with their object ids, without reading their content."""
+        branch = branch or self.default_branch
+        try:
+            tree = self.github_repo.get_git_tree(branch, recursive=True)
+        except UnknownObjectException as e:
+            raise GitRepositoryException(f"Branch does not exist: {branch}") from e
+
+        if tree.raw_data.get("truncated"):
+            logger.warning(f"The tree of {self.full_name}@{branch} is truncated")
+
+        return [
+            TreeEntry(path=element.path, type=element.type, size=element.size, sha=element.sha)
+            for element in tree.tree
+            if element.type == "blob"
+        ]
+
+    def get_blobs(self, shas: Sequence[str]) -> dict[str, Optional[bytes]]:
+        """Read the blobs with the given object ids. Blobs that do not exist are None."""
+        blobs: dict[str, Optional[bytes]] = {}
+        for sha in dict.fromkeys(shas):
+            try:
+                with throttle(self.rate_limiter, RequestPriority.BULK, _rate_limited):
+                    blob = self.github_repo.get_git_blob(sha)
+            except UnknownObjectException:
+                blobs[sha] = None
+                continue
+
+            blobs[sha] = (
+                base64.b64decode(blob.content)
+                if blob.encoding == "base64"
+                else blob.content.encode("utf-8")
+            )
+        return blobs
+
+    @throttled(RequestPriority.INTERACTIVE, _rate_limited)
     def create_new_branch(self, branch: str) -> str:
         logger.info(f"Creating new branch: {branch}")
 
@@ -81,9 +149,11 @@ class GitRepository:
 
         return git_ref.ref
 
+    @throttled(RequestPriority.INTERACTIVE, _rate_limited)
     def branch_exists(self, branch: str) -> bool:
         return branch in [_branch.name for _branch in self.github_repo.get_branches()]
 
+    @throttled(RequestPriority.INTERACTIVE, _rate_limited)
     def update_file(self, file: File, branch: str) -> None:
         logger.info(f"Updating file: {file.path}")
 
@@ -95,6 +165,7 @@ class GitRepository:
             branch=branch,
         )
 
+    @throttled(RequestPriority.INTERACTIVE, _rate_limited)
     def create_file(self, file: File, branch: str) -> None:
         logger.info(f"Creating file: {file.path}")
 
@@ -105,6 +176,7 @@ class GitRepository:
             branch=branch,
         )
 
+    @throttled(RequestPriority.INTERACTIVE, _rate_limited)
     def delete_file(self, file: File, branch: str) -> None:
         logger.info(f"Deleting file: {file.path}")
 
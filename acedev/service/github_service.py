@@ -1,7 +1,11 @@
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
 from github import UnknownObjectException
+from github.Issue import Issue as GitHubIssue
+from github.PullRequest import PullRequest as GitHubPullRequest
+from github.PullRequestComment import PullRequestComment
 from github.Repository import Repository
 
 from acedev.service.model import (
@@ -11,55 +15,98 @@ from acedev.service.model import (
     Issue,
     IssueComment,
 )
+from acedev.service.rate_limit_scheduler import (
+    InstallationRateLimiter,
+    RequestPriority,
+    throttled,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _rate_limited(message: str) -> Exception:
+    return GitHubServiceException(message)
+
+
 @dataclass
 class GitHubService:
-    github_repo: Repository
+    """
+    GitHub operations for a single repository.
 
+    An instance is created per webhook event, so fetched issues, pull requests
+    and review comments are memoized for the lifetime of the instance and each
+    of them is requested from GitHub at most once per event.
+    """
+
+    github_repo: Repository
+    rate_limiter: Optional[InstallationRateLimiter] = None
+    _issues: dict[int, GitHubIssue] = field(default_factory=dict, init=False, repr=False)
+    _pulls: dict[int, GitHubPullRequest] = field(default_factory=dict, init=False, repr=False)
+    _review_comments: dict[int, PullRequestComment] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    # Open pull request of each branch
+    _pull_request_numbers: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+
+    @throttled(RequestPriority.INTERACTIVE, _rate_limited)
     def create_pull_request(self, title: str, body: str, branch: str) -> PullRequest:
         logger.debug(f"Opening Pull Request ({title=}, {branch=})")
 
-        for pull in self.github_repo.get_pulls(state="open"):
-            if pull.head.ref == branch:
-                raise GitHubServiceException(
-                    f"Pull request already exists for {branch=}"
-                )
+        if self._find_pull_request_number(branch) is not None:
+            raise GitHubServiceException(f"Pull request already exists for {branch=}")
 
         pull_request = self.github_repo.create_pull(
             title=title, body=body, head=branch, base=self.github_repo.default_branch
         )
+        self._pulls[pull_request.number] = pull_request
+        self._pull_request_numbers[branch] = pull_request.number
 
         return PullRequest.from_github(pull_request)
 
+    @throttled(RequestPriority.BULK, _rate_limited)
     def get_pull_request(self, number: int) -> PullRequest:
         try:
-            pull_request = self.github_repo.get_pull(number=number)
+            pull_request = self._get_pull(number)
             return PullRequest.from_github(pull_request)
         except UnknownObjectException as e:
             error_message = f"PR#{number} not found"
             raise GitHubServiceException(error_message) from e
 
+    @throttled(RequestPriority.BULK, _rate_limited)
+    def get_pull_request_file_diff(self, branch: str, filename: str) -> str:
+        number = self._find_pull_request_number(branch)
+        if number is None:
+            raise GitHubServiceException(f"Pull request not found for {branch=}")
+
+        for file in self._get_pull(number).get_files():
+            if file.filename == filename:
+                return file.patch or ""
+
+        raise GitHubServiceException(f"{filename} is not changed in PR#{number}")
+
+    @throttled(RequestPriority.BULK, _rate_limited)
     def get_pull_request_review_thread(
         self, pull_request_number: int, comment_id: int
     ) -> PullRequestReviewThread:
         # TODO: handle PR not found
-        pull_request = self.github_repo.get_pull(number=pull_request_number)
-        comment = pull_request.get_review_comment(comment_id)
+        pull_request = self._get_pull(pull_request_number)
+        comment = self._get_review_comment(pull_request, comment_id)
 
         root_comment = PullRequestReviewComment.from_github(
             comment
             if comment.in_reply_to_id is None
-            else pull_request.get_review_comment(comment.in_reply_to_id)
+            else self._get_review_comment(pull_request, comment.in_reply_to_id)
+        )
+
+        comments = list(
+            pull_request.get_review_comments(sort="created", direction="asc")
         )
+        for _comment in comments:
+            self._review_comments.setdefault(_comment.id, _comment)
 
         response_comments = [
             PullRequestReviewComment.from_github(comment)
-            for comment in (
-                pull_request.get_review_comments(sort="created", direction="asc")
-            )
+            for comment in comments
             if comment.in_reply_to_id == root_comment.id
         ]
 
@@ -68,16 +115,18 @@ class GitHubService:
             comments=[root_comment] + response_comments,
         )
 
+    @throttled(RequestPriority.INTERACTIVE, _rate_limited)
     def reply_in_pull_request_thread(
         self, pull_request_number: int, root_comment_id: int, body: str
     ) -> None:
         # TODO: handle PR not found
-        pull_request = self.github_repo.get_pull(number=pull_request_number)
+        pull_request = self._get_pull(pull_request_number)
         pull_request.create_review_comment_reply(comment_id=root_comment_id, body=body)
 
+    @throttled(RequestPriority.BULK, _rate_limited)
     def get_issue(self, issue_number: int) -> Issue:
         # TODO: handle issue not found
-        _issue = self.github_repo.get_issue(number=issue_number)
+        _issue = self._get_issue(issue_number)
         return Issue(
             id=_issue.id,
             number=_issue.number,
@@ -89,16 +138,52 @@ class GitHubService:
             ],
         )
 
+    @throttled(RequestPriority.BULK, _rate_limited)
     def issue_is_pull_request(self, issue_number: int) -> bool:
         # TODO: handle issue not found
-        issue = self.github_repo.get_issue(number=issue_number)
+        issue = self._get_issue(issue_number)
         return issue.pull_request is not None
 
+    @throttled(RequestPriority.INTERACTIVE, _rate_limited)
     def create_issue_comment(self, issue_number: int, body: str) -> None:
         # TODO: handle issue not found
-        issue = self.github_repo.get_issue(number=issue_number)
+        issue = self._get_issue(issue_number)
         issue.create_comment(body=body)
 
+    def _find_pull_request_number(self, branch: str) -> Optional[int]:
+        number = self._pull_request_numbers.get(branch)
+        if number is not None and self._get_pull(number).state != "open":
+            # The pull request was closed or merged, the branch may have a new one
+            del self._pull_request_numbers[branch]
+            number = None
+
+        if number is None:
+            head = f"{self.github_repo.owner.login}:{branch}"
+            for pull in self.github_repo.get_pulls(state="open", head=head):
+                self._pull_request_numbers[branch] = number = pull.number
+                break
+
+        return number
+
+    def _get_issue(self, number: int) -> GitHubIssue:
+        if number not in self._issues:
+            self._issues[number] = self.github_repo.get_issue(number=number)
+        return self._issues[number]
+
+    def _get_pull(self, number: int) -> GitHubPullRequest:
+        if number not in self._pulls:
+            self._pulls[number] = self.github_repo.get_pull(number=number)
+        return self._pulls[number]
+
+    def _get_review_comment(
+        self, pull_request: GitHubPullRequest, comment_id: int
+    ) -> PullRequestComment:
+        if comment_id not in self._review_comments:
+            self._review_comments[comment_id] = pull_request.get_review_comment(
+                comment_id
+            )
+        return self._review_comments[comment_id]
+
 
 class GitHubServiceException(Exception):
     def __init__(self, message: str):
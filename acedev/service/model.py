@@ -1,3 +1,4 @@
+import hashlib
 import json
 from typing import Sequence, Any, Optional
 
@@ -14,10 +15,37 @@ class File(BaseModel):
     content: str = Field(description="Content of the file")
 
 
+class TreeEntry(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    path: str = Field(description="Path to the entry in the repository")
+    type: str = Field(description="Git object type, e.g. blob or tree")
+    size: Optional[int] = Field(default=None, description="Size of the blob in bytes")
+    sha: str = Field(description="Git object id")
+
+    @classmethod
+    def from_file(cls, file: File) -> "TreeEntry":
+        """Entry of a file already read, with the object id git gives its content."""
+        content = file.content.encode()
+        sha = hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+        return TreeEntry(path=file.path, type="blob", size=len(content), sha=sha)
+
+
 class FileChange(BaseModel):
     status: str
     filename: str
     diff: str
+    summary: Optional[str] = Field(
+        default=None, description="One-line summary shown instead of the diff"
+    )
+
+
+class FailedHunk(BaseModel):
+    hunk: str = Field(description="Diff hunk that failed to apply")
+    context: str = Field(description="Line-numbered lines of the file around the hunk")
+    reason: Optional[str] = Field(
+        default=None, description="Why the hunk did not apply, when it is known"
+    )
 
 
 class PullRequest(BaseModel):
@@ -1,54 +1,124 @@
-from typing import Sequence, Iterator, Callable
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Sequence, Iterator, Callable, Optional
 
 from litellm import completion
 from litellm.utils import function_to_dict
 
 from acedev.service.model import ChatMessage, ToolCall, AssistantMessage
+from acedev.service.response_cache import ResponseCache
 
+logger = logging.getLogger(__name__)
 
+# Providers that only cache prompt prefixes marked with cache_control. OpenAI caches
+# long prefixes automatically.
+EXPLICIT_PROMPT_CACHING_MODELS = ("claude", "anthropic/")
+
+# function_to_dict leaves out the item type of list parameters, which the API requires
+STRING_ARRAY_PARAMETERS = {
+    "update_symbols": ("symbols", "definitions"),
+    "get_symbols": ("paths", "symbols"),
+    "get_files": ("paths",),
+}
+
+
+@dataclass
+class PromptCacheStats:
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+
+
+@dataclass
 class OpenAIService:
-    @staticmethod
+    # Opt-in cache of deterministic (temperature 0) responses
+    response_cache: Optional[ResponseCache] = None
+    prompt_cache_stats: PromptCacheStats = field(default_factory=PromptCacheStats)
+
     def invoke(
+        self,
         messages: Sequence[ChatMessage],
         model: str = "gpt-4",
         temperature: float = 0,
     ) -> ChatMessage:
-        response = completion(
+        request = dict(
             model=model,
-            messages=[message.to_openai_format() for message in messages],
+            messages=self._to_openai_format(messages, model),
             temperature=temperature,
         )
 
-        message = response.choices[0].message
+        return self._cached_complete(request)
 
-        return AssistantMessage(
-            content=message.content,
+    def invoke_candidates(
+        self,
+        messages: Sequence[ChatMessage],
+        n: int,
+        model: str = "gpt-4",
+        temperature: float = 0.7,
+    ) -> list[AssistantMessage]:
+        """Sample n responses in one request, so the prompt is only processed once."""
+        response = completion(
+            model=model,
+            messages=self._to_openai_format(messages, model),
+            temperature=temperature,
+            n=n,
         )
 
+        self._record_usage(response)
+
+        return [AssistantMessage(content=choice.message.content) for choice in response.choices]
+
     def stream(self, messages: Sequence[ChatMessage]) -> Iterator[ChatMessage]:
         pass
 
-    @staticmethod
     def invoke_with_tools(
+        self,
         messages: Sequence[ChatMessage],
         tools: dict[str, Callable[[str], str]],
         model: str = "gpt-4",
         temperature: float = 0,
     ) -> AssistantMessage:
-        response = completion(
+        request = dict(
             model=model,
-            messages=[message.to_openai_format() for message in messages],
+            messages=self._to_openai_format(messages, model),
             temperature=temperature,
             tools=[
                 {
                     "type": "function",
                     "function": OpenAIService._convert_tools(name, tool),
                 }
-                for name, tool in tools.items()
+                # Sorted, so the tool schemas are a stable part of the cached prompt prefix
+                for name, tool in sorted(tools.items())
             ],
             tool_choice="auto",
         )
 
+        return self._cached_complete(request)
+
+    def stream_with_tools(
+        self, messages: Sequence[ChatMessage], tools: dict[str, Callable[[str], str]]
+    ) -> Iterator[ChatMessage]:
+        pass
+
+    def _cached_complete(self, request: dict) -> AssistantMessage:
+        if self.response_cache is None or request["temperature"] != 0:
+            return self._complete(request)
+
+        key = self.response_cache.key(**request)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            logger.info(f"LLM response served from cache: {key}")
+            return AssistantMessage.model_validate(json.loads(cached))
+
+        response = self._complete(request)
+        self.response_cache.put(key, response.model_dump_json())
+        return response
+
+    def _complete(self, request: dict) -> AssistantMessage:
+        response = completion(**request)
+
+        self._record_usage(response)
+
         message = response.choices[0].message
 
         return AssistantMessage(
@@ -63,10 +133,53 @@ class OpenAIService:
             ),
         )
 
-    def stream_with_tools(
-        self, messages: Sequence[ChatMessage], tools: dict[str, Callable[[str], str]]
-    ) -> Iterator[ChatMessage]:
-        pass
+    def _record_usage(self, response: Any) -> None:
+        prompt_tokens, cached_tokens = self._prompt_tokens(getattr(response, "usage", None))
+        self.prompt_cache_stats.prompt_tokens += prompt_tokens
+        self.prompt_cache_stats.cached_tokens += cached_tokens
+        logger.info(f"Prompt tokens: {prompt_tokens}, cached: {cached_tokens}")
+
+    @staticmethod
+    def _to_openai_format(messages: Sequence[ChatMessage], model: str) -> list[dict]:
+        """
+        Convert the messages and mark the leading system messages as a cacheable prefix.
+
+        The system prompt and the tool schemas are resent unchanged on every agent step,
+        so providers with prompt caching only process them once.
+        """
+        output = [message.to_openai_format() for message in messages]
+
+        if not any(name in model for name in EXPLICIT_PROMPT_CACHING_MODELS):
+            return output
+
+        prefix = 0
+        while prefix < len(output) and output[prefix]["role"] == "system":
+            prefix += 1
+
+        if prefix > 0:
+            last = output[prefix - 1]
+            last["content"] = [
+                {
+                    "type": "text",
+                    "text": last["content"],
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+
+        return output
+
+    @staticmethod
+    def _prompt_tokens(usage: Any) -> tuple[int, int]:
+        if usage is None:
+            return 0, 0
+
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (
+            getattr(details, "cached_tokens", None)  # OpenAI
+            or getattr(usage, "cache_read_input_tokens", None)  # Anthropic
+            or 0
+        )
+        return getattr(usage, "prompt_tokens", None) or 0, cached_tokens
 
     @staticmethod
     def _convert_tools(name: str, func: Callable[[str], str]) -> dict:
@@ -123,4 +236,9 @@ class OpenAIService:
                     ],
                 },
             }
+        if name in STRING_ARRAY_PARAMETERS:
+            schema = function_to_dict(func)
+            for parameter in STRING_ARRAY_PARAMETERS[name]:
+                schema["parameters"]["properties"][parameter]["items"] = {"type": "string"}
+            return schema
         return function_to_dict(func)
@@ -0,0 +1,213 @@
+import functools
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from github import Github, RateLimitExceededException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Used when GitHub reports a secondary rate limit without a Retry-After header
+DEFAULT_RETRY_AFTER = 60
+
+
+class RequestPriority(Enum):
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+@dataclass
+class RateLimitBudget:
+    remaining: int
+    limit: int
+    reset_at: float
+    blocked_until: float = 0
+
+
+@dataclass
+class RateLimitScheduler:
+    """
+    Tracks the GitHub rate limit budget of every installation and throttles requests
+    before the budget is exhausted.
+
+    Bulk requests stop once the remaining budget drops to ``bulk_reserve`` of the limit,
+    so the rest of the budget is kept for interactive requests (replies, commits).
+    Secondary rate limits block both priorities until ``Retry-After`` has passed.
+    """
+
+    bulk_reserve: float = 0.1
+    max_wait: float = 300
+    clock: Callable[[], float] = time.time
+    sleep: Callable[[float], None] = time.sleep
+    _budgets: dict[int, RateLimitBudget] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def for_installation(self, installation_id: int, github: Github) -> "InstallationRateLimiter":
+        return InstallationRateLimiter(
+            scheduler=self, installation_id=installation_id, github=github
+        )
+
+    def budgets(self) -> dict[int, RateLimitBudget]:
+        """Snapshot of the current budget per installation."""
+        with self._lock:
+            return {
+                installation_id: RateLimitBudget(**vars(budget))
+                for installation_id, budget in self._budgets.items()
+            }
+
+    def acquire(self, installation_id: int, priority: RequestPriority) -> None:
+        """Block until the request fits into the installation's budget."""
+        with self._lock:
+            wait = self._wait_time(installation_id, priority)
+
+        if wait > self.max_wait:
+            raise RateLimitSchedulerException(
+                f"GitHub rate limit for installation {installation_id} resets in {wait:.0f}s"
+            )
+
+        if wait > 0:
+            logger.warning(
+                f"Throttling {priority.value} request for installation {installation_id} for {wait:.1f}s"
+            )
+            self.sleep(wait)
+
+        with self._lock:
+            budget = self._budgets.get(installation_id)
+            if budget is not None:
+                if self.clock() >= budget.reset_at:
+                    budget.remaining = budget.limit
+                # Reserve the request until the response headers report the real value
+                budget.remaining = max(budget.remaining - 1, 0)
+
+    def update(self, installation_id: int, remaining: int, limit: int, reset_at: float) -> None:
+        with self._lock:
+            budget = self._budgets.setdefault(
+                installation_id, RateLimitBudget(remaining=remaining, limit=limit, reset_at=reset_at)
+            )
+            budget.remaining = remaining
+            budget.limit = limit
+            budget.reset_at = reset_at
+
+        logger.info(f"GitHub rate limit for installation {installation_id}: {remaining}/{limit}")
+
+    def release(self, installation_id: int) -> None:
+        """Give back the request reserved by ``acquire`` when it was not sent."""
+        with self._lock:
+            budget = self._budgets.get(installation_id)
+            if budget is not None:
+                budget.remaining = min(budget.remaining + 1, budget.limit)
+
+    def block(self, installation_id: int, retry_after: float) -> None:
+        with self._lock:
+            now = self.clock()
+            budget = self._budgets.setdefault(
+                installation_id, RateLimitBudget(remaining=0, limit=0, reset_at=now)
+            )
+            budget.blocked_until = max(budget.blocked_until, now + retry_after)
+
+        logger.warning(
+            f"GitHub secondary rate limit hit for installation {installation_id}, retry in {retry_after}s"
+        )
+
+    def _wait_time(self, installation_id: int, priority: RequestPriority) -> float:
+        budget = self._budgets.get(installation_id)
+        if budget is None:
+            return 0
+
+        now = self.clock()
+        wait = max(budget.blocked_until - now, 0)
+
+        reserve = math.ceil(budget.limit * self.bulk_reserve) if priority == RequestPriority.BULK else 0
+        if budget.remaining <= reserve and budget.reset_at > now:
+            wait = max(wait, budget.reset_at - now)
+
+        return wait
+
+
+@dataclass
+class InstallationRateLimiter:
+    scheduler: RateLimitScheduler
+    installation_id: int
+    github: Github
+
+    @contextmanager
+    def throttle(self, priority: RequestPriority) -> Iterator[None]:
+        """Wait for the budget before the wrapped requests and record it after them."""
+        self.scheduler.acquire(self.installation_id, priority)
+        # Github.rate_limiting requests /rate_limit when no response was seen yet, so the
+        # values the requester parsed from the last response headers are read instead
+        requester = self.github._Github__requester  # type: ignore[attr-defined]
+        last_rate_limit = requester.rate_limiting
+        try:
+            yield
+        except RateLimitExceededException as e:
+            self.scheduler.block(self.installation_id, self._retry_after(e))
+            raise
+        finally:
+            # The requester sets a new tuple on every response with rate limit headers
+            if requester.rate_limiting is last_rate_limit:
+                self.scheduler.release(self.installation_id)
+            else:
+                remaining, limit = requester.rate_limiting
+                self.scheduler.update(
+                    self.installation_id,
+                    remaining=remaining,
+                    limit=limit,
+                    reset_at=requester.rate_limiting_resettime,
+                )
+
+    @staticmethod
+    def _retry_after(e: RateLimitExceededException) -> float:
+        headers: Optional[dict[str, str]] = e.headers
+        if headers and "retry-after" in headers:
+            return float(headers["retry-after"])
+        return DEFAULT_RETRY_AFTER
+
+
+@contextmanager
+def throttle(
+    rate_limiter: Optional[InstallationRateLimiter],
+    priority: RequestPriority,
+    error: Callable[[str], Exception],
+) -> Iterator[None]:
+    """
+    Throttle the wrapped requests, if there is a rate limiter.
+
+    A budget that does not allow the requests in time raises ``error``, the exception
+    type the callers of the service already handle.
+    """
+    try:
+        context = rate_limiter.throttle(priority) if rate_limiter else nullcontext()
+        with context:
+            yield
+    except RateLimitSchedulerException as e:
+        raise error(e.message) from e
+
+
+def throttled(
+    priority: RequestPriority, error: Callable[[str], Exception]
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Throttle a method of an object that has an optional ``rate_limiter`` attribute."""
+
+    def decorator(method: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:
+            with throttle(self.rate_limiter, priority, error):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class RateLimitSchedulerException(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.message = message
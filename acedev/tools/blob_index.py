@@ -0,0 +1,130 @@
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Iterator, Optional, Sequence, TypeVar
+
+from tree_sitter import Language, Parser
+
+from acedev.service.model import TreeEntry
+
+logger = logging.getLogger(__name__)
+
+# Larger blobs are usually generated or vendored, and are not worth indexing
+MAX_INDEXED_BLOB_BYTES = 1024 * 1024
+
+# Repositories whose indexes are kept in memory, the least recently used ones are dropped
+MAX_INDEXED_REPOSITORIES = 16
+
+T = TypeVar("T", bound="BlobIndex")
+
+
+@dataclass
+class BlobIndex:
+    """
+    Base of the indexes that follow the blob tree of one repository.
+
+    The index follows the tree of the commit it was last updated to: only the blobs whose
+    object id changed are read and re-indexed, so moving between commits and branches
+    costs as much as the diff between them. Subclasses index the text of each file in
+    ``_add`` and forget it in ``_remove``, both called under the index lock.
+    Indexes given a tree-sitter language get their own parser, since they are shared
+    between events and a parser must not be used by two threads at once.
+    """
+
+    language: Optional[Language] = None
+    _parser: Optional[Parser] = field(default=None, init=False, repr=False)
+    _blobs: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    # Indexes of each repository by kind, shared between events, least recently used first
+    _indexes: ClassVar["OrderedDict[str, dict[type, BlobIndex]]"] = OrderedDict()
+    max_repositories: ClassVar[int] = MAX_INDEXED_REPOSITORIES
+    _indexes_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __post_init__(self) -> None:
+        if self.language is not None:
+            self._parser = Parser()
+            self._parser.set_language(self.language)
+
+    @classmethod
+    def for_repository(cls: type[T], full_name: str, **kwargs: Any) -> T:
+        with BlobIndex._indexes_lock:
+            indexes = BlobIndex._indexes.setdefault(full_name, {})
+            BlobIndex._indexes.move_to_end(full_name)
+            if cls not in indexes:
+                indexes[cls] = cls(**kwargs)
+
+            while len(BlobIndex._indexes) > BlobIndex.max_repositories:
+                evicted, _ = BlobIndex._indexes.popitem(last=False)
+                logger.info(f"Dropped the indexes of {evicted}")
+            return indexes[cls]  # type: ignore[return-value]
+
+    def update(
+        self,
+        tree: Sequence[TreeEntry],
+        get_blobs: Callable[[Sequence[str]], dict[str, Optional[bytes]]],
+    ) -> None:
+        """Move the index to the tree, reading only the blobs that changed."""
+        blobs = {entry.path: entry.sha for entry in tree if entry.type == "blob"}
+        sizes = {entry.path: entry.size for entry in tree}
+
+        with self._lock:
+            removed = [path for path, sha in self._blobs.items() if blobs.get(path) != sha]
+            for path in removed:
+                del self._blobs[path]
+                self._remove(path)
+
+            changed = {path: sha for path, sha in blobs.items() if path not in self._blobs}
+            to_read = [
+                sha
+                for path, sha in changed.items()
+                if (sizes[path] or 0) <= MAX_INDEXED_BLOB_BYTES
+            ]
+            contents = get_blobs(to_read) if to_read else {}
+
+            for path, sha in changed.items():
+                # Binary and oversized blobs are remembered, so they are not read again,
+                # but not indexed
+                self._blobs[path] = sha
+                content = self._decode(contents.get(sha))
+                if content is not None:
+                    self._add(path, content)
+
+            if removed or changed:
+                logger.info(
+                    f"Updated {type(self).__name__}: {len(changed)} blobs indexed, "
+                    f"{len(removed)} removed, {len(self._blobs)} blobs in total"
+                )
+
+    @contextmanager
+    def at(
+        self: T,
+        tree: Sequence[TreeEntry],
+        get_blobs: Callable[[Sequence[str]], dict[str, Optional[bytes]]],
+    ) -> Iterator[T]:
+        """
+        Move the index to the tree and hold it there while the block queries it.
+
+        The index is shared between events, so another event may move it to another
+        branch between an update and a query made under separate locks.
+        """
+        with self._lock:
+            self.update(tree, get_blobs)
+            yield self
+
+    def _add(self, path: str, content: str) -> None:
+        raise NotImplementedError
+
+    def _remove(self, path: str) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _decode(blob: Optional[bytes]) -> Optional[str]:
+        if blob is None or b"\0" in blob[:8000]:
+            return None
+        try:
+            return blob.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
@@ -1,55 +1,390 @@
 import difflib
+import hashlib
 import logging
 import re
 import subprocess
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
 
 from acedev.service.model import File
+from acedev.utils.line_index import split_lines
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class DiffResult:
+    file: File
+    failed_hunks: list[str] = field(default_factory=list)
+    # Why a failed hunk did not apply, for the hunks that matched more than one place
+    failure_reasons: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SearchReplaceBlock:
+    search: str
+    replace: str
+
+
 @dataclass
 class CodeEditor:
 
     @staticmethod
     def apply_diff(diff: str, file: File) -> File:
-        file_content = file.content
-        hunks = split_diff_into_hunks(diff)
-        for hunk in hunks:
-            before, after = split_hunk_to_before_after(hunk.splitlines(keepends=True))
-            updated_file = find_and_replace(file_content, before, after)
+        result = CodeEditor.apply_diff_partially(diff, file)
 
-            if updated_file != file_content:
-                file_content = updated_file
-                continue
+        if result.failed_hunks:
+            failed_hunk = result.failed_hunks[0]
+            norm_diff = "".join(
+                normalize_diff(failed_hunk.splitlines(keepends=True), file.path)
+            )
+            reason = result.failure_reasons.get(failed_hunk)
+            raise CodeEditorException(
+                f"Failed to apply diff to {file.path}: {reason}\n{norm_diff}"
+                if reason
+                else f"Failed to apply diff to {file.path}: {norm_diff}"
+            )
 
-            norm_diff_lines = normalize_diff(hunk.splitlines(keepends=True), file.path)
-            norm_diff = "".join(norm_diff_lines)
-            updated_file = run_patch_cli(file.path, file_content, norm_diff)
+        return result.file
 
-            if updated_file:
-                file_content = updated_file
+    @staticmethod
+    def apply_diff_partially(diff: str, file: File) -> DiffResult:
+        """
+        Apply every hunk of the diff that applies cleanly and collect the ones that don't.
+
+        Hunks are anchored in the original file first, all in one pass over its lines.
+        Hunks that can't be anchored exactly fall back to the patch CLI.
+        """
+        file_lines = file.content.splitlines(keepends=True)
+        # Hunk lines always end with a newline, so the last line is matched as if it did too
+        matched_lines = [line if line.endswith("\n") else line + "\n" for line in file_lines]
+        line_index = index_lines(matched_lines)
+
+        replacements = []
+        unanchored = []
+        failed_hunks = []
+        failure_reasons = {}
+        for hunk in split_diff_into_hunks(diff):
+            hunk_lines = hunk.splitlines(keepends=True)
+            before, after = split_hunk_to_before_after(hunk_lines, as_lines=True)
+            try:
+                start = find_hunk(before, matched_lines, line_index, hunk_start_hint(hunk))
+            except CodeEditorException as e:
+                logger.warning(f"{e.message}:\n{hunk}")
+                failed_hunks.append(hunk)
+                failure_reasons[hunk] = e.message
                 continue
 
-            fixed_honk = fix_hunk(
-                hunk.splitlines(keepends=True),
-                file.path,
-                file_content.splitlines(keepends=True),
-            )
+            if start is None:
+                unanchored.append(hunk)
+            else:
+                replacements.append((start, start + len(before), after, hunk))
+
+        new_lines: list[str] = []
+        position = 0
+        for start, end, after, hunk in sorted(replacements, key=lambda replacement: replacement[:2]):
+            if start < position:
+                logger.warning(f"Hunk overlaps the previous one in {file.path}:\n{hunk}")
+                unanchored.append(hunk)
+                continue
+            new_lines.extend(file_lines[position:start])
+            new_lines.extend(after)
+            position = end
+        new_lines.extend(file_lines[position:])
 
-            updated_file = run_patch_cli(file.path, file_content, fixed_honk)
+        file_content = "".join(new_lines)
+        for hunk in unanchored:
+            updated_file = apply_hunk(hunk, file.path, file_content)
 
-            if updated_file:
+            if updated_file is None:
+                failed_hunks.append(hunk)
+            else:
                 file_content = updated_file
+
+        return DiffResult(
+            file=File(path=file.path, content=file_content),
+            failed_hunks=failed_hunks,
+            failure_reasons=failure_reasons,
+        )
+
+    @staticmethod
+    def apply_search_replace(blocks: list[SearchReplaceBlock], file: File) -> File:
+        """
+        Apply search/replace blocks, matching the search lines while ignoring surrounding whitespace.
+
+        Every search text must match exactly once. The replacement is re-indented by the
+        difference between the file's and the search text's indentation.
+        """
+        file_lines = file.content.splitlines(keepends=True)
+        stripped_lines = [line.strip() for line in file_lines]
+
+        # One pass over the file to index the candidate start lines
+        line_index = index_lines(stripped_lines)
+
+        replacements = []
+        for block in blocks:
+            search_lines = block.search.splitlines(keepends=True)
+            replace_lines = block.replace.splitlines(keepends=True)
+
+            if not search_lines:
+                # An empty search appends to the end of the file
+                replacements.append((len(file_lines), len(file_lines), replace_lines))
                 continue
-            else:
+
+            stripped_search = [line.strip() for line in search_lines]
+            matches = [
+                start
+                for start in line_index.get(stripped_search[0], [])
+                if stripped_lines[start : start + len(stripped_search)] == stripped_search
+            ]
+
+            if not matches:
+                raise CodeEditorException(
+                    f"Search text not found in {file.path}:\n{block.search}"
+                )
+
+            if len(matches) > 1:
+                lines = ", ".join(str(start + 1) for start in matches)
+                raise CodeEditorException(
+                    f"Search text matches {len(matches)} times in {file.path} (lines {lines}), "
+                    f"include more lines to make it unique:\n{block.search}"
+                )
+
+            start = matches[0]
+            end = start + len(search_lines)
+            replacements.append(
+                (start, end, reindent(replace_lines, search_lines, file_lines[start:end]))
+            )
+
+        replacements.sort(key=lambda replacement: replacement[:2])
+        new_lines: list[str] = []
+        position = 0
+        for start, end, lines in replacements:
+            if start < position:
                 raise CodeEditorException(
-                    f"Failed to apply diff to {file.path}: {norm_diff}"
+                    f"Search texts overlap in {file.path} at line {start + 1}"
                 )
+            new_lines.extend(file_lines[position:start])
+            if new_lines and not new_lines[-1].endswith("\n"):
+                new_lines[-1] += "\n"
+            new_lines.extend(lines)
+            position = end
+        new_lines.extend(file_lines[position:])
+
+        return File(path=file.path, content="".join(new_lines))
+
+
+SEARCH_REPLACE_PATTERN = re.compile(
+    r"^<{5,} SEARCH[^\n]*\n(.*?)^={5,}[^\n]*\n(.*?)^>{5,} REPLACE[^\n]*$",
+    re.MULTILINE | re.DOTALL,
+)
+
+
+def parse_search_replace_blocks(text: str) -> list[SearchReplaceBlock]:
+    return [
+        SearchReplaceBlock(search=search, replace=replace)
+        for search, replace in SEARCH_REPLACE_PATTERN.findall(text)
+    ]
+
+
+def reindent(
+    replace_lines: list[str], search_lines: list[str], matched_lines: list[str]
+) -> list[str]:
+    """Shift the replacement by the indentation difference between the file and the search text."""
+    for search_line, matched_line in zip(search_lines, matched_lines):
+        if search_line.strip():
+            search_indent = search_line[: len(search_line) - len(search_line.lstrip())]
+            file_indent = matched_line[: len(matched_line) - len(matched_line.lstrip())]
+            break
+    else:
+        return replace_lines
+
+    if search_indent == file_indent:
+        return replace_lines
+
+    reindented = []
+    for line in replace_lines:
+        if line.strip() and line.startswith(search_indent):
+            line = file_indent + line[len(search_indent):]
+        reindented.append(line)
+    return reindented
+
+
+def summarize_edit(before: File, after: File, max_diff_lines: int = 200) -> str:
+    """
+    Returns a compact acknowledgement of an edit: line counts, content hash and the unified diff.
+
+    Args:
+        before (File): The file before the edit.
+        after (File): The file after the edit.
+        max_diff_lines (int): Diff lines shown before the rest is omitted.
+
+    Returns:
+        str: The summary of the edit.
+    """
+    diff_lines = list(
+        difflib.unified_diff(
+            before.content.splitlines(keepends=True),
+            after.content.splitlines(keepends=True),
+            fromfile=before.path,
+            tofile=after.path,
+            n=2,
+        )
+    )
+    if not diff_lines:
+        return f"No changes to {after.path}."
+
+    added = sum(1 for line in diff_lines[2:] if line.startswith("+"))
+    removed = sum(1 for line in diff_lines[2:] if line.startswith("-"))
+    total = len(after.content.splitlines())
+    content_hash = hashlib.sha256(after.content.encode()).hexdigest()[:12]
+
+    shown = [line if line.endswith("\n") else line + "\n" for line in diff_lines[:max_diff_lines]]
+    if len(diff_lines) > max_diff_lines:
+        shown.append(f"... {len(diff_lines) - max_diff_lines} more diff lines omitted\n")
+
+    return (
+        f"Edited {after.path}: +{added} -{removed} lines, {total} lines total, sha256 {content_hash}.\n"
+        f"```diff\n{''.join(shown)}```"
+    )
+
+
+def index_lines(lines: Iterable[str]) -> dict[str, list[int]]:
+    """Maps every line to the numbers of the lines with the same content."""
+    line_index: dict[str, list[int]] = {}
+    for number, line in enumerate(lines):
+        line_index.setdefault(line, []).append(number)
+    return line_index
+
+
+def hunk_start_hint(hunk: str) -> Optional[int]:
+    """Returns the 0-based start line from the hunk's `@@ -start,count ... @@` header, if any."""
+    match = re.match(r"@@ -(\d+)", hunk)
+    if match is None:
+        return None
+    return max(int(match.group(1)) - 1, 0)
+
+
+def find_hunk(
+    before_lines: list[str],
+    file_lines: list[str],
+    line_index: dict[str, list[int]],
+    hint: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Finds the line where the hunk's context and removed lines occur in the file.
+
+    Args:
+        before_lines (list[str]): The context and removed lines of the hunk.
+        file_lines (list[str]): The lines of the file.
+        line_index (dict[str, list[int]]): The file's lines indexed with index_lines.
+        hint (Optional[int]): The expected 0-based start line from the hunk header.
+
+    Returns:
+        Optional[int]: The 0-based start line, or None if the lines don't occur in the file.
+
+    Raises:
+        CodeEditorException: If the lines occur more than once and the hint doesn't
+        single out the closest occurrence.
+    """
+    if not before_lines:
+        return None
+
+    matches = [
+        start
+        for start in line_index.get(before_lines[0], [])
+        if file_lines[start : start + len(before_lines)] == before_lines
+    ]
+
+    if len(matches) <= 1:
+        return matches[0] if matches else None
+
+    if hint is not None:
+        # Search outward from the expected position
+        matches.sort(key=lambda start: abs(start - hint))
+        if abs(matches[0] - hint) != abs(matches[1] - hint):
+            return matches[0]
+
+    lines = ", ".join(str(start + 1) for start in sorted(matches))
+    raise CodeEditorException(
+        f"Hunk matches {len(matches)} places (lines {lines}), "
+        f"include more context lines to make it unique"
+    )
 
-        return File(path=file.path, content=file_content)
+
+def apply_hunk(hunk: str, file_path: str, file_content: str) -> Optional[str]:
+    norm_diff_lines = normalize_diff(hunk.splitlines(keepends=True), file_path)
+    norm_diff = "".join(norm_diff_lines)
+    updated_file = run_patch_cli(file_path, file_content, norm_diff)
+
+    if updated_file:
+        return updated_file
+
+    fixed_honk = fix_hunk(
+        hunk.splitlines(keepends=True),
+        file_path,
+        file_content.splitlines(keepends=True),
+    )
+
+    return run_patch_cli(file_path, file_content, fixed_honk)
+
+
+def hunk_context(hunk: str, file_content: str, extra_lines: int = 5) -> str:
+    """
+    Returns the line-numbered part of the file the hunk most likely targets.
+
+    The hunk is anchored at the longest run of its context and removed lines found
+    in the file, ignoring surrounding whitespace, and padded with extra_lines. When
+    all of those lines occur in several places, every place is shown.
+
+    Args:
+        hunk (str): The hunk that failed to apply.
+        file_content (str): The content of the file.
+        extra_lines (int): Number of lines shown before and after the hunk.
+
+    Returns:
+        str: The matched lines prefixed with their 1-based line numbers.
+    """
+    file_lines = split_lines(file_content)
+    before, _ = split_hunk_to_before_after(hunk.splitlines(keepends=True), as_lines=True)
+
+    matcher = difflib.SequenceMatcher(
+        None,
+        [line.strip() for line in before],
+        [line.strip() for line in file_lines],
+        autojunk=False,
+    )
+    match = matcher.find_longest_match(0, len(before), 0, len(file_lines))
+    if not match.size:
+        return _numbered_ranges(file_lines, [(0, len(file_lines))])
+
+    hunk_starts = [match.b - match.a]
+    if match.size == len(before):
+        stripped_before = [line.strip() for line in before]
+        stripped_lines = [line.strip() for line in file_lines]
+        hunk_starts = [
+            start
+            for start in range(len(file_lines) - len(before) + 1)
+            if stripped_lines[start : start + len(before)] == stripped_before
+        ]
+
+    ranges: list[tuple[int, int]] = []
+    for hunk_start in hunk_starts:
+        start = max(hunk_start - extra_lines, 0)
+        end = min(hunk_start + len(before) + extra_lines, len(file_lines))
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return _numbered_ranges(file_lines, ranges)
+
+
+def _numbered_ranges(file_lines: list[str], ranges: list[tuple[int, int]]) -> str:
+    width = len(str(ranges[-1][1])) if ranges else 1
+    return "\n...\n".join(
+        "\n".join(f"{index + 1:>{width}} | {file_lines[index]}" for index in range(start, end))
+        for start, end in ranges
+    )
 
 
 def run_patch_cli(file_path: str, file_content: str, norm_diff: str) -> Optional[str]:
@@ -240,17 +575,3 @@ def reconcile_diffs(current_diff: list[str], original_diff: list[str]) -> list[s
             reconciled_diff.append(line)
     return reconciled_diff
 
-
-def find_and_replace(file_content: str, old_text: str, new_text: str) -> str:
-    """
-    Finds and replaces all occurrences of old_text with new_text in the given file_content.
-
-    Args:
-        file_content (str): The content of the file as a string.
-        old_text (str): The text to be replaced.
-        new_text (str): The text to replace with.
-
-    Returns:
-        str: The updated file content with all occurrences of old_text replaced by new_text.
-    """
-    return file_content.replace(old_text, new_text)
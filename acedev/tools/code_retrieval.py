@@ -0,0 +1,194 @@
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Sequence
+
+from tree_sitter import Node
+
+from acedev.tools.blob_index import BlobIndex
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+SUBTOKEN_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+# Words too common in code and issues to tell files apart
+STOP_WORDS = frozenset(
+    """
+    a an and are as at be but by can def do does for from has have if in import into is it
+    its not of on or return self should so that the then this to use we when will with
+    """.split()
+)
+
+# Node types of the definitions indexed as symbols, across the tree-sitter grammars
+DEFINITION_TYPES = frozenset(
+    {
+        "class_definition",
+        "function_definition",
+        "class_declaration",
+        "interface_declaration",
+        "method_declaration",
+        "function_declaration",
+        "method_definition",
+        "function_item",
+        "struct_item",
+        "trait_item",
+    }
+)
+
+MAX_SIGNATURE_CHARS = 120
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercase words of the text, with identifiers split into their subtokens.
+
+    ``getFileContent`` and ``get_file_content`` both give ``get``, ``file`` and ``content``,
+    plus the whole identifier, so exact mentions score higher than partial ones.
+    """
+    tokens = []
+    for word in IDENTIFIER_PATTERN.findall(text):
+        subtokens = [subtoken.lower() for subtoken in SUBTOKEN_PATTERN.findall(word)]
+        if len(subtokens) > 1:
+            tokens.append(word.lower())
+        tokens.extend(
+            subtoken for subtoken in subtokens if len(subtoken) > 1 and subtoken not in STOP_WORDS
+        )
+    return tokens
+
+
+@dataclass(frozen=True)
+class Document:
+    path: str
+    symbol: Optional[str] = None
+    line: Optional[int] = None
+    signature: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self.symbol is None:
+            return self.path
+        return f"{self.path}:{self.line} {self.signature}"
+
+
+@dataclass
+class Bm25Corpus:
+    """Okapi BM25 ranking over documents that can be added and removed one at a time."""
+
+    k1: float = 1.2
+    b: float = 0.75
+    _postings: dict[str, dict[Document, int]] = field(default_factory=dict, repr=False)
+    _terms: dict[Document, tuple[str, ...]] = field(default_factory=dict, repr=False)
+    _lengths: dict[Document, int] = field(default_factory=dict, repr=False)
+    _total_length: int = field(default=0, repr=False)
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, document: Document, tokens: Sequence[str]) -> None:
+        self.remove(document)
+
+        counts = Counter(tokens)
+        self._terms[document] = tuple(counts)
+        self._lengths[document] = len(tokens)
+        self._total_length += len(tokens)
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[document] = count
+
+    def remove(self, document: Document) -> None:
+        if document not in self._lengths:
+            return
+
+        self._total_length -= self._lengths.pop(document)
+        for term in self._terms.pop(document):
+            postings = self._postings[term]
+            del postings[document]
+            if not postings:
+                del self._postings[term]
+
+    def search(self, terms: Sequence[str], limit: int) -> list[tuple[Document, float]]:
+        if not self._lengths:
+            return []
+
+        count = len(self._lengths)
+        average_length = self._total_length / count or 1
+        scores: dict[Document, float] = {}
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for document, frequency in postings.items():
+                length_norm = 1 - self.b + self.b * self._lengths[document] / average_length
+                scores[document] = scores.get(document, 0.0) + idf * (
+                    frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                )
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+@dataclass
+class Bm25Index(BlobIndex):
+    """
+    Lexical retrieval index over the files and symbols of one repository.
+
+    Files are ranked by their path and content, symbols by their name, path and definition,
+    with identifiers split into subtokens. No embedding service is involved, so the index
+    can be built offline and kept up to date per commit.
+    """
+
+    extensions: Sequence[str] = ()
+    _files: Bm25Corpus = field(default_factory=Bm25Corpus, init=False, repr=False)
+    _symbols: Bm25Corpus = field(default_factory=Bm25Corpus, init=False, repr=False)
+    _path_symbols: dict[str, list[Document]] = field(default_factory=dict, init=False, repr=False)
+
+    def search_files(self, query: str, limit: int) -> list[tuple[Document, float]]:
+        with self._lock:
+            return self._files.search(tokenize(query), limit)
+
+    def search_symbols(self, query: str, limit: int) -> list[tuple[Document, float]]:
+        with self._lock:
+            return self._symbols.search(tokenize(query), limit)
+
+    def _add(self, path: str, content: str) -> None:
+        path_tokens = tokenize(path)
+        # The path is counted twice, since it names what the whole file is about
+        self._files.add(Document(path=path), path_tokens * 2 + tokenize(content))
+
+        if self._parser is None or not path.endswith(tuple(self.extensions)):
+            return
+
+        tree = self._parser.parse(content.encode())
+        documents = []
+        for name, node in self._definitions(tree.root_node):
+            signature = node.text.decode("utf-8", errors="replace").splitlines()[0].strip()
+            document = Document(
+                path=path,
+                symbol=name,
+                line=node.start_point[0] + 1,
+                signature=signature[:MAX_SIGNATURE_CHARS],
+            )
+            self._symbols.add(
+                document,
+                tokenize(name) * 2
+                + path_tokens
+                + tokenize(node.text.decode("utf-8", errors="replace")),
+            )
+            documents.append(document)
+        self._path_symbols[path] = documents
+
+    def _remove(self, path: str) -> None:
+        self._files.remove(Document(path=path))
+        for document in self._path_symbols.pop(path, []):
+            self._symbols.remove(document)
+
+    @staticmethod
+    def _definitions(root: Node) -> Iterator[tuple[str, Node]]:
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.type in DEFINITION_TYPES:
+                name = node.child_by_field_name("name")
+                if name is not None:
+                    yield name.text.decode("utf-8"), node
+            stack.extend(reversed(node.children))
@@ -0,0 +1,242 @@
+import bisect
+import fnmatch
+import re
+import string
+from dataclasses import dataclass, field
+from typing import Optional
+
+from acedev.tools.blob_index import BlobIndex
+from acedev.utils.line_index import line_offsets
+
+MAX_SNIPPET_CHARS = 200
+
+# Digits taken by the escapes of character codes
+_HEX_DIGITS = {"x": 2, "u": 4, "U": 8}
+
+
+@dataclass(frozen=True)
+class SearchMatch:
+    path: str
+    line: int
+    text: str
+
+    def __str__(self) -> str:
+        text = self.text.strip()
+        if len(text) > MAX_SNIPPET_CHARS:
+            text = text[:MAX_SNIPPET_CHARS] + "..."
+        return f"{self.path}:{self.line}: {text}"
+
+
+def trigrams(text: str) -> set[str]:
+    text = text.casefold()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern: str) -> list[str]:
+    """
+    Literal strings that every match of the regular expression contains.
+
+    The extraction is conservative: character classes, groups and optional atoms end
+    the current literal, and a pattern with a top-level alternation requires nothing,
+    so the literals can only narrow the search, never miss a match.
+    """
+    if re.match(r"\(\?[a-zA-Z]*x", pattern):
+        # Whitespace is not literal in verbose patterns
+        return []
+
+    literals: list[str] = []
+    run: list[str] = []
+
+    def end_run() -> None:
+        if run:
+            literals.append("".join(run))
+            run.clear()
+
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            # Escaped letters and digits are classes, positions, backreferences or codes
+            if escaped.isalnum():
+                end_run()
+                i = _skip_escape(pattern, i)
+            else:
+                run.append(escaped)
+                i += 2
+        elif char == "[":
+            end_run()
+            i = _skip_class(pattern, i)
+        elif char == "(":
+            end_run()
+            i = _skip_group(pattern, i)
+        elif char in "*?{":
+            # The atom before the quantifier may not occur at all
+            if run:
+                run.pop()
+            end_run()
+            i = pattern.find("}", i) + 1 if char == "{" and "}" in pattern[i:] else i + 1
+        elif char == "|":
+            return []
+        elif char in "+.^$)":
+            end_run()
+            i += 1
+        else:
+            run.append(char)
+            i += 1
+
+    end_run()
+    return literals
+
+
+def _skip_escape(pattern: str, start: int) -> int:
+    """Index after the escape of a letter or digit starting at ``start``, with its arguments."""
+    escaped = pattern[start + 1]
+    i = start + 2
+    if escaped in _HEX_DIGITS:
+        return _skip_while(pattern, i, string.hexdigits, _HEX_DIGITS[escaped])
+    if escaped == "N" and pattern.startswith("{", i):
+        end = pattern.find("}", i)
+        return len(pattern) if end == -1 else end + 1
+    if escaped == "0":
+        return _skip_while(pattern, i, string.octdigits, 2)
+    if escaped.isdigit():
+        octal = pattern[start + 1:start + 4]
+        if len(octal) == 3 and all(char in string.octdigits for char in octal):
+            return start + 4
+        # Backreferences have up to two digits
+        return _skip_while(pattern, i, string.digits, 1)
+    return i
+
+
+def _skip_while(pattern: str, start: int, chars: str, limit: int) -> int:
+    i = start
+    while i < len(pattern) and i - start < limit and pattern[i] in chars:
+        i += 1
+    return i
+
+
+def _skip_class(pattern: str, start: int) -> int:
+    i = start + 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_group(pattern: str, start: int) -> int:
+    depth = 0
+    i = start
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            i += 2
+            continue
+        if pattern[i] == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if pattern[i] == "(":
+            depth += 1
+        elif pattern[i] == ")":
+            depth -= 1
+            if depth == 0:
+                break
+        i += 1
+    # A quantifier after the group applies to the whole group, which is skipped anyway
+    return i + 1
+
+
+@dataclass
+class TrigramIndex(BlobIndex):
+    """
+    Trigram index over the text blobs of one repository, used to grep it without reading every file.
+
+    A regular expression is narrowed to the files that contain all trigrams of its
+    required literals before their lines are scanned.
+    """
+
+    _contents: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    _trigrams: dict[str, set[str]] = field(default_factory=dict, init=False, repr=False)
+    _postings: dict[str, set[str]] = field(default_factory=dict, init=False, repr=False)
+
+    def candidates(self, pattern: str) -> list[str]:
+        """Paths of the indexed files that can contain a match of the regular expression."""
+        required = set().union(*(trigrams(literal) for literal in required_literals(pattern)))
+
+        with self._lock:
+            if not required:
+                return sorted(self._contents)
+
+            # Intersect starting from the rarest trigram to keep the sets small
+            postings = sorted(
+                (self._postings.get(trigram, set()) for trigram in required), key=len
+            )
+            paths = set(postings[0])
+            for posting in postings[1:]:
+                paths &= posting
+                if not paths:
+                    break
+            return sorted(paths)
+
+    def search(
+        self, pattern: str, path_glob: Optional[str] = None, max_results: int = 50
+    ) -> list[SearchMatch]:
+        """
+        Lines of the indexed files matching the regular expression, in path order.
+
+        The expression is compiled with ``re.MULTILINE`` and run over each candidate file,
+        a match spanning several lines is reported on the line where it starts.
+        """
+        try:
+            regex = re.compile(pattern, re.MULTILINE)
+        except re.error as e:
+            raise CodeSearchException(f"Invalid regular expression {pattern!r}: {e}") from e
+
+        matches: list[SearchMatch] = []
+        with self._lock:
+            for path in self.candidates(pattern):
+                if path_glob and not fnmatch.fnmatch(path, path_glob):
+                    continue
+
+                content = self._contents[path]
+                offsets = None
+                last_line = 0
+                for match in regex.finditer(content):
+                    if offsets is None:
+                        # Most candidates have no match, so their lines are never indexed
+                        offsets = line_offsets(content)
+                    line = bisect.bisect_right(offsets, match.start())
+                    if line == last_line:
+                        continue
+                    last_line = line
+
+                    start = offsets[line - 1]
+                    end = content.find("\n", start)
+                    text = content[start:] if end == -1 else content[start:end]
+                    matches.append(SearchMatch(path=path, line=line, text=text))
+                    if len(matches) >= max_results:
+                        return matches
+
+        return matches
+
+    def _add(self, path: str, content: str) -> None:
+        self._contents[path] = content
+        self._trigrams[path] = trigrams(content)
+        for trigram in self._trigrams[path]:
+            self._postings.setdefault(trigram, set()).add(path)
+
+    def _remove(self, path: str) -> None:
+        self._contents.pop(path, None)
+        for trigram in self._trigrams.pop(path, set()):
+            posting = self._postings[trigram]
+            posting.discard(path)
+            if not posting:
+                del self._postings[trigram]
+
+
+class CodeSearchException(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.message = message
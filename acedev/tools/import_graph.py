@@ -0,0 +1,245 @@
+import posixpath
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from tree_sitter import Node
+
+from acedev.service.model import TreeEntry
+from acedev.tools.blob_index import BlobIndex
+from acedev.tools.symbol_manipulator import IMPORT_CAPTURE
+
+
+@dataclass(frozen=True)
+class ImportReference:
+    """An import statement: ``from <module> import <names>``, with ``level`` leading dots."""
+
+    module: str
+    names: tuple[str, ...] = ()
+    level: int = 0
+
+
+def module_names(path: str, packages: set[str]) -> list[str]:
+    """
+    Names under which the Python file can be imported.
+
+    The name starts below the topmost package that contains the file, so ``src/app/db.py``
+    is ``app.db`` when ``src/app`` is a package. The dotted path from the root of the
+    repository is kept as well, for namespace packages.
+    """
+    directories = path.split("/")[:-1]
+    stem = posixpath.basename(path).removesuffix(".py")
+    parts = directories if stem == "__init__" else directories + [stem]
+
+    root = len(directories)
+    while root > 0 and "/".join(directories[:root]) in packages:
+        root -= 1
+
+    names = [".".join(parts[root:])] if parts[root:] else []
+    if root > 0:
+        names.append(".".join(parts))
+    return names
+
+
+@dataclass
+class ImportGraph(BlobIndex):
+    """
+    Module dependency graph of the Python files of one repository.
+
+    Each file is parsed once per blob and its import statements are kept. Edges point
+    from the importing file to the imported files of the repository, and are stored as
+    sets of integer file ids in both directions. When files are only modified, just their
+    own edges are resolved again. When files are added or removed, imports may resolve
+    to other files, so all edges are resolved again from the kept imports, without parsing.
+    """
+
+    _query: Any = field(default=None, init=False, repr=False)
+    _imports: dict[str, tuple[ImportReference, ...]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _ids: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _paths: list[str] = field(default_factory=list, init=False, repr=False)
+    _modules: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    _forward: dict[int, frozenset[int]] = field(default_factory=dict, init=False, repr=False)
+    _reverse: dict[int, set[int]] = field(default_factory=dict, init=False, repr=False)
+    _changed: set[str] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.language is not None:
+            self._query = self.language.query(
+                f"""
+                (import_statement) @{IMPORT_CAPTURE}
+                (import_from_statement) @{IMPORT_CAPTURE}
+                """
+            )
+
+    def __contains__(self, path: str) -> bool:
+        with self._lock:
+            return path in self._imports
+
+    def update(
+        self,
+        tree: Sequence[TreeEntry],
+        get_blobs: Callable[[Sequence[str]], dict[str, Optional[bytes]]],
+    ) -> None:
+        with self._lock:
+            files = set(self._imports)
+            self._changed.clear()
+            super().update(tree, get_blobs)
+
+            if set(self._imports) != files:
+                self._modules = self._module_index()
+                self._changed = set(self._imports)
+            for path in self._changed:
+                self._resolve(path)
+
+    def dependencies(self, path: str) -> list[str]:
+        """Files of the repository imported by the file."""
+        with self._lock:
+            targets = self._forward.get(self._ids.get(path, -1), frozenset())
+            return sorted(self._paths[target] for target in targets)
+
+    def importers(self, path: str) -> list[str]:
+        """Files of the repository that import the file."""
+        with self._lock:
+            importers = self._reverse.get(self._ids.get(path, -1), set())
+            return sorted(self._paths[importer] for importer in importers)
+
+    def importer_count(self, path: str) -> int:
+        with self._lock:
+            return len(self._reverse.get(self._ids.get(path, -1), set()))
+
+    def _add(self, path: str, content: str) -> None:
+        if self._parser is None or not path.endswith(".py"):
+            return
+
+        tree = self._parser.parse(content.encode())
+        self._imports[path] = tuple(
+            reference
+            for node, _ in self._query.captures(tree.root_node)
+            for reference in self._references(node)
+        )
+        self._changed.add(path)
+
+    def _remove(self, path: str) -> None:
+        if self._imports.pop(path, None) is None:
+            return
+
+        self._set_edges(self._id(path), frozenset())
+        self._changed.discard(path)
+
+    def _id(self, path: str) -> int:
+        if path not in self._ids:
+            self._ids[path] = len(self._paths)
+            self._paths.append(path)
+        return self._ids[path]
+
+    def _set_edges(self, file_id: int, targets: frozenset[int]) -> None:
+        for target in self._forward.pop(file_id, frozenset()) - targets:
+            self._reverse[target].discard(file_id)
+            if not self._reverse[target]:
+                del self._reverse[target]
+        for target in targets:
+            self._reverse.setdefault(target, set()).add(file_id)
+        if targets:
+            self._forward[file_id] = targets
+
+    def _module_index(self) -> dict[str, str]:
+        packages = {
+            posixpath.dirname(path)
+            for path in self._imports
+            if posixpath.basename(path) == "__init__.py"
+        }
+        modules: dict[str, str] = {}
+        # Shorter paths win when two files have the same module name
+        for path in sorted(self._imports, key=lambda path: (path.count("/"), path)):
+            for name in module_names(path, packages):
+                modules.setdefault(name, path)
+        return modules
+
+    def _resolve(self, path: str) -> None:
+        targets = {
+            self._id(target)
+            for reference in self._imports[path]
+            for target in self._targets(path, reference)
+            if target != path
+        }
+        self._set_edges(self._id(path), frozenset(targets))
+
+    def _targets(self, path: str, reference: ImportReference) -> Iterator[str]:
+        if reference.level:
+            yield from self._relative_targets(path, reference)
+            return
+
+        resolved = False
+        for name in reference.names:
+            target = self._modules.get(f"{reference.module}.{name}")
+            if target:
+                resolved = True
+                yield target
+
+        if resolved:
+            return
+
+        # `import a.b.c` imports the closest module of the repository on the way
+        parts = reference.module.split(".")
+        for end in range(len(parts), 0, -1):
+            target = self._modules.get(".".join(parts[:end]))
+            if target:
+                yield target
+                return
+
+    def _relative_targets(self, path: str, reference: ImportReference) -> Iterator[str]:
+        directory = posixpath.dirname(path)
+        for _ in range(reference.level - 1):
+            directory = posixpath.dirname(directory)
+        base = posixpath.join(directory, *reference.module.split(".")) if reference.module else directory
+
+        resolved = False
+        for name in reference.names:
+            for candidate in self._module_files(posixpath.join(base, name)):
+                if candidate in self._imports:
+                    resolved = True
+                    yield candidate
+                    break
+        if resolved:
+            return
+
+        for candidate in self._module_files(base) if base else ("__init__.py",):
+            if candidate in self._imports:
+                yield candidate
+                return
+
+    @staticmethod
+    def _module_files(base: str) -> tuple[str, str]:
+        return f"{base}.py", posixpath.join(base, "__init__.py")
+
+    @staticmethod
+    def _references(node: Node) -> Iterator[ImportReference]:
+        if node.type == "import_statement":
+            for name in node.children_by_field_name("name"):
+                if name.type == "aliased_import":
+                    name = name.child_by_field_name("name")
+                yield ImportReference(module=name.text.decode("utf-8"))
+            return
+
+        module = node.child_by_field_name("module_name")
+        if module is None:
+            return
+
+        level = 0
+        if module.type == "relative_import":
+            prefix = module.child(0)
+            level = len(prefix.text) if prefix is not None and prefix.type == "import_prefix" else 0
+            dotted = next((child for child in module.children if child.type == "dotted_name"), None)
+            module_name = dotted.text.decode("utf-8") if dotted is not None else ""
+        else:
+            module_name = module.text.decode("utf-8")
+
+        names = []
+        for name in node.children_by_field_name("name"):
+            if name.type == "aliased_import":
+                name = name.child_by_field_name("name")
+            names.append(name.text.decode("utf-8"))
+
+        yield ImportReference(module=module_name, names=tuple(names), level=level)
@@ -0,0 +1,162 @@
+from array import array
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Sequence
+
+from tree_sitter import Language, Node
+
+from acedev.tools.blob_index import BlobIndex
+from acedev.tools.code_retrieval import DEFINITION_TYPES
+
+REFERENCE_CAPTURE = "reference"
+
+# Node types of identifiers, across the tree-sitter grammars. Outside Python, member and
+# type names have node types of their own.
+IDENTIFIER_TYPES = (
+    "identifier",
+    "property_identifier",
+    "shorthand_property_identifier",
+    "field_identifier",
+    "type_identifier",
+)
+# Node types of function and method calls, across the tree-sitter grammars
+CALL_TYPES = frozenset({"call", "call_expression", "method_invocation"})
+# Node types of member access, whose last identifier is the called method
+ATTRIBUTE_TYPES = frozenset(
+    {"attribute", "member_expression", "field_expression", "selector_expression"}
+)
+
+
+class ReferenceKind(IntEnum):
+    REFERENCE = 0
+    CALL = 1
+    DEFINITION = 2
+
+    def __str__(self) -> str:
+        return self.name.lower()
+
+
+@dataclass(frozen=True)
+class Reference:
+    path: str
+    line: int
+    column: int
+    start_byte: int
+    end_byte: int
+    kind: ReferenceKind
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.line}:{self.column} {self.kind}"
+
+
+@dataclass
+class ReferenceIndex(BlobIndex):
+    """
+    Index of the identifiers of one repository, from the name to where it occurs.
+
+    Every identifier captured by tree-sitter is classified as a definition, a call or
+    another reference, and stored per name and file as a flat array of
+    ``(start byte, line, column, kind)``. Looking a name up is a dictionary access, and only
+    the files that contain the name are visited.
+    """
+
+    extensions: Sequence[str] = ()
+    _query: Any = field(default=None, init=False, repr=False)
+    _references: dict[str, dict[str, array]] = field(default_factory=dict, init=False, repr=False)
+    _names: dict[str, tuple[str, ...]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.language is not None:
+            self._query = self.language.query(
+                "\n".join(
+                    f"({node_type}) @{REFERENCE_CAPTURE}"
+                    for node_type in IDENTIFIER_TYPES
+                    if _has_node_type(self.language, node_type)
+                )
+            )
+
+    def find(self, name: str) -> list[Reference]:
+        with self._lock:
+            files = self._references.get(name, {})
+            references = []
+            for path in sorted(files):
+                entries = files[path]
+                for i in range(0, len(entries), 4):
+                    start, line, column, kind = entries[i:i + 4]
+                    references.append(
+                        Reference(
+                            path=path,
+                            line=line,
+                            column=column,
+                            start_byte=start,
+                            end_byte=start + len(name.encode()),
+                            kind=ReferenceKind(kind),
+                        )
+                    )
+            return references
+
+    def _add(self, path: str, content: str) -> None:
+        if self._parser is None or not path.endswith(tuple(self.extensions)):
+            return
+
+        tree = self._parser.parse(content.encode())
+        entries: dict[str, array] = {}
+        for node, _ in self._query.captures(tree.root_node):
+            name = node.text.decode("utf-8")
+            entries.setdefault(name, array("L")).extend(
+                (node.start_byte, node.start_point[0] + 1, node.start_point[1] + 1, self._kind(node))
+            )
+
+        for name, positions in entries.items():
+            self._references.setdefault(name, {})[path] = positions
+        self._names[path] = tuple(entries)
+
+    def _remove(self, path: str) -> None:
+        for name in self._names.pop(path, ()):
+            files = self._references[name]
+            del files[path]
+            if not files:
+                del self._references[name]
+
+    @staticmethod
+    def _kind(node: Node) -> ReferenceKind:
+        parent = node.parent
+        if parent is None:
+            return ReferenceKind.REFERENCE
+
+        if parent.type in DEFINITION_TYPES and _is_field(parent, "name", node):
+            return ReferenceKind.DEFINITION
+
+        if parent.type in ATTRIBUTE_TYPES and not _is_last_child(parent, node):
+            # The object of ``obj.method()`` is not called
+            return ReferenceKind.REFERENCE
+
+        callee = parent if parent.type in ATTRIBUTE_TYPES else node
+        caller = callee.parent
+        if caller is not None and caller.type in CALL_TYPES:
+            function = caller.child_by_field_name("function") or caller.child_by_field_name("name")
+            if function is not None and function.start_byte == callee.start_byte and (
+                function.end_byte == callee.end_byte
+            ):
+                return ReferenceKind.CALL
+
+        return ReferenceKind.REFERENCE
+
+
+def _has_node_type(language: Language, node_type: str) -> bool:
+    try:
+        language.query(f"({node_type})")
+    except NameError:
+        # The query of a node type the grammar does not have fails to compile
+        return False
+    return True
+
+
+def _is_field(parent: Node, field_name: str, node: Node) -> bool:
+    child = parent.child_by_field_name(field_name)
+    return child is not None and child.start_byte == node.start_byte
+
+
+def _is_last_child(parent: Node, node: Node) -> bool:
+    return parent.end_byte == node.end_byte
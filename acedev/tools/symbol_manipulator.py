@@ -1,4 +1,5 @@
 import logging
+import re
 from dataclasses import dataclass
 from typing import Sequence, Optional
 
@@ -12,6 +13,10 @@ FUNC_CAPTURE = "func"
 IMPORT_CAPTURE = "import"
 EXPRESSION_CAPTURE = "expression"
 
+IMPORT_TYPES = ("import_statement", "import_from_statement", "future_import_statement")
+# Node types of string literals, whose lines are never re-indented
+STRING_TYPES = frozenset({"string", "string_literal", "raw_string_literal", "template_string"})
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,8 +42,20 @@ class SymbolManipulator:
             return None
         return Symbol(content=node.text.decode("utf-8"), path=file.path)
 
+    def get_symbols(self, symbols: Sequence[str], file: File) -> dict[str, Optional[Symbol]]:
+        """Looks up several symbols with one parse of the file."""
+        syntax_tree = self.parser.parse(file.content.encode())
+        result = {}
+        for symbol in symbols:
+            node = self._find_symbol(syntax_tree.root_node, symbol)
+            result[symbol] = (
+                Symbol(content=node.text.decode("utf-8"), path=file.path) if node else None
+            )
+        return result
+
     def update_symbol(self, symbol: str, content: str, file: File) -> File:
-        current_tree = self.parser.parse(file.content.encode())
+        file_content = file.content.encode()
+        current_tree = self.parser.parse(file_content)
         current_node = self._find_symbol(current_tree.root_node, symbol)
 
         if not current_node:
@@ -46,6 +63,51 @@ class SymbolManipulator:
                 f"Symbol {symbol} not found in {file.path}"
             )
 
+        self._validate_definition(symbol, content, current_node)
+
+        new_content = self._splice_definition(
+            file_content, self._replaced_node(current_node, content), content
+        )
+
+        return File(path=file.path, content=new_content.decode("utf-8"))
+
+    def update_symbols(self, definitions: Sequence[tuple[str, str]], file: File) -> File:
+        """
+        Updates several symbols with one parse of the file.
+
+        All new definitions are validated before any of them is applied, and the splices
+        are applied from the end of the file backwards, so the parsed offsets stay valid.
+        """
+        file_content = file.content.encode()
+        current_tree = self.parser.parse(file_content)
+
+        splices = []
+        for symbol, content in definitions:
+            current_node = self._find_symbol(current_tree.root_node, symbol)
+
+            if not current_node:
+                raise SymbolManipulatorException(
+                    f"Symbol {symbol} not found in {file.path}"
+                )
+
+            self._validate_definition(symbol, content, current_node)
+            node = self._replaced_node(current_node, content)
+            splices.append((*self._definition_splice(file_content, node, content), symbol))
+
+        splices.sort()
+        for (_, end, _, symbol), (start, _, _, next_symbol) in zip(splices, splices[1:]):
+            if start < end:
+                raise SymbolManipulatorException(
+                    f"Definitions of {symbol} and {next_symbol} overlap in {file.path}"
+                )
+
+        buffer = bytearray(file_content)
+        for start, end, new_definition, _ in reversed(splices):
+            buffer[start:end] = new_definition
+
+        return File(path=file.path, content=buffer.decode("utf-8"))
+
+    def _validate_definition(self, symbol: str, content: str, current_node: Node) -> None:
         new_tree = self.parser.parse(content.encode())
         new_root_node = new_tree.root_node
 
@@ -75,15 +137,6 @@ class SymbolManipulator:
                 f"New definition is for {new_symbol_name} instead of {symbol}"
             )
 
-        new_content = self._update_symbol_in_file_content(
-            file_content=file.content,
-            start_point=current_node.start_point,
-            end_point=current_node.end_point,
-            updated_definition=content,
-        )
-
-        return File(path=file.path, content=new_content)
-
     def add_symbol(self, symbol: str, content: str, file: File) -> File:
         """Naively adds a symbol to the end of the file."""
         current_tree = self.parser.parse(file.content.encode())
@@ -122,6 +175,106 @@ class SymbolManipulator:
 
         return File(path=file.path, content=new_content)
 
+    def get_symbol_scope(self, symbol: str, file: File) -> File:
+        """
+        Returns a file with only the module's imports and the symbol's definition.
+
+        The definition is dedented, so that methods can be edited as top-level functions.
+        The edited scope is put back into the file with splice_symbol_scope.
+        """
+        content = file.content.encode()
+        tree = self.parser.parse(content)
+        node = self._find_symbol(tree.root_node, symbol)
+
+        if not node:
+            raise SymbolManipulatorException(
+                f"Symbol {symbol} not found in {file.path}"
+            )
+
+        definition_node = self._definition_node(node)
+        start, end, indent = self._definition_range(definition_node, content)
+        first_row = definition_node.start_point[0]
+        string_rows = {row - first_row for row in self._string_rows(definition_node)}
+        definition = "\n".join(
+            line if row in string_rows else line.removeprefix(indent)
+            for row, line in enumerate(content[start:end].decode("utf-8").split("\n"))
+        )
+
+        imports = "\n".join(self._imports(tree.root_node))
+        scope = f"{imports}\n\n\n{definition}\n" if imports else f"{definition}\n"
+
+        return File(path=file.path, content=scope)
+
+    def splice_symbol_scope(self, symbol: str, scope: File, file: File) -> File:
+        """
+        Puts an edited scope from get_symbol_scope back into the file.
+
+        The symbol's definition is replaced by byte range and imports that were added
+        to the scope are added to the file. Any other definition or statement added to
+        the scope is rejected, since there is no telling where it belongs in the file.
+        """
+        scope_tree = self.parser.parse(scope.content.encode())
+        scope_node = self._find_symbol(scope_tree.root_node, symbol)
+
+        if not scope_node:
+            raise SymbolManipulatorException(
+                f"Symbol {symbol} not found in the edited definition: {scope.content}"
+            )
+
+        definition_node = self._definition_node(scope_node)
+        extra_lines = [
+            child.text.decode("utf-8").split("\n")[0]
+            for child in scope_tree.root_node.children
+            if child.type not in (*IMPORT_TYPES, "comment")
+            and (child.start_byte, child.end_byte)
+            != (definition_node.start_byte, definition_node.end_byte)
+        ]
+        if extra_lines:
+            raise SymbolManipulatorException(
+                f"The edited scope of {symbol} contains more than its definition and imports: "
+                f"{', '.join(extra_lines)}. Edit the rest of the file separately."
+            )
+
+        new_definition = definition_node.text.decode("utf-8")
+
+        content = file.content.encode()
+        tree = self.parser.parse(content)
+        node = self._find_symbol(tree.root_node, symbol)
+
+        if not node:
+            raise SymbolManipulatorException(
+                f"Symbol {symbol} not found in {file.path}"
+            )
+
+        new_content = self._splice_definition(
+            content, self._definition_node(node), new_definition
+        ).decode("utf-8")
+
+        existing_imports = set(self._imports(tree.root_node))
+        new_imports = [
+            statement
+            for statement in self._imports(scope_tree.root_node)
+            if statement not in existing_imports
+        ]
+
+        new_file = File(path=file.path, content=new_content)
+        if new_imports:
+            new_file = self.add_imports(new_imports, new_file)
+        return new_file
+
+    def find_mentioned_symbols(self, text: str, file: File) -> list[str]:
+        """Returns the names of the functions and classes in the file that are mentioned in the text."""
+        tree = self.parser.parse(file.content.encode())
+        query = self.language.query(
+            f"""
+            (class_definition name: (identifier) @{CLASS_CAPTURE})
+            (function_definition name: (identifier) @{FUNC_CAPTURE})
+            """
+        )
+        names = {node.text.decode("utf-8") for node, _ in query.captures(tree.root_node)}
+        mentioned = set(re.findall(r"\w+", text))
+        return sorted(names & mentioned)
+
     @staticmethod
     def add_imports(import_statements: list[str], file: File) -> File:
         """Naively adds import statements to the top of the file."""
@@ -140,6 +293,39 @@ class SymbolManipulator:
             new_content = new_content.replace(old_import, new_import)
         return File(path=file.path, content=new_content)
 
+    @staticmethod
+    def _definition_node(node: Node) -> Node:
+        if node.parent and node.parent.type == "decorated_definition":
+            return node.parent
+        return node
+
+    @classmethod
+    def _replaced_node(cls, node: Node, definition: str) -> Node:
+        """
+        The node replaced by the new definition. get_symbol returns definitions without their
+        decorators, so they are kept unless the new definition has decorators of its own.
+        """
+        if definition.lstrip().startswith("@"):
+            return cls._definition_node(node)
+        return node
+
+    @staticmethod
+    def _definition_range(node: Node, content: bytes) -> tuple[int, int, str]:
+        """Returns the byte range of the definition's lines and its indentation."""
+        line_start = node.start_byte - node.start_point[1]
+        indent = content[line_start:node.start_byte].decode("utf-8")
+        if indent.strip():
+            return node.start_byte, node.end_byte, ""
+        return line_start, node.end_byte, indent
+
+    @staticmethod
+    def _imports(root_node: Node) -> list[str]:
+        return [
+            child.text.decode("utf-8")
+            for child in root_node.children
+            if child.type in IMPORT_TYPES
+        ]
+
     @staticmethod
     def _node_type(node: Node) -> str:
         if node.type == "decorated_definition":
@@ -152,42 +338,41 @@ class SymbolManipulator:
             return node.child(1).child_by_field_name("name").text.decode("utf-8")
         return node.child_by_field_name("name").text.decode("utf-8")
 
-    @staticmethod
-    def _update_symbol_in_file_content(
-        file_content: str,
-        start_point: tuple[int, int],
-        end_point: tuple[int, int],
-        updated_definition: str,
-    ) -> str:
-        lines = file_content.split("\n")
+    def _splice_definition(self, content: bytes, node: Node, definition: str) -> bytes:
+        start, end, new_definition = self._definition_splice(content, node, definition)
+        return content[:start] + new_definition + content[end:]
 
-        # Remove trailing whitespace
-        lines = [line.rstrip() for line in lines]
-
-        # Handle start and end lines, considering partial line replacements
-        start_line, start_char = start_point
-        end_line, end_char = end_point
-        updated_lines = updated_definition.split("\n")
-
-        # Before start line unchanged
-        new_content = lines[:start_line]
-
-        # Handle partial line at the start if needed TODO: handle indents
-        new_content.append(lines[start_line][:start_char] + updated_lines[0].lstrip())
-        updated_lines = updated_lines[
-            1:
-        ]  # Remove the first line of updated definition since it's merged
-
-        # Insert updated definition lines
-        new_content.extend(updated_lines)
-
-        # Handle partial line at the end if needed
-        new_content[-1] = new_content[-1] + lines[end_line][end_char:]
+    def _definition_splice(
+        self, content: bytes, node: Node, definition: str
+    ) -> tuple[int, int, bytes]:
+        """
+        Returns the byte range of the definition node and the new definition re-indented to its column.
+        """
+        start, end, indent = self._definition_range(node, content)
+
+        lines = definition.split("\n")
+        first_line = next((line for line in lines if line.strip()), "")
+        base_indent = first_line[: len(first_line) - len(first_line.lstrip())]
+        string_rows = self._string_rows(self.parser.parse(definition.encode()).root_node)
+        definition = "\n".join(
+            indent + line.removeprefix(base_indent) if line and row not in string_rows else line
+            for row, line in enumerate(lines)
+        )
 
-        # After end line unchanged
-        new_content.extend(lines[end_line + 1 :])
+        return start, end, definition.encode()
 
-        return "\n".join(new_content)
+    @staticmethod
+    def _string_rows(node: Node) -> set[int]:
+        """Rows of the node that start inside a multi-line string literal."""
+        rows: set[int] = set()
+        stack = [node]
+        while stack:
+            child = stack.pop()
+            if child.type in STRING_TYPES:
+                rows.update(range(child.start_point[0] + 1, child.end_point[0] + 1))
+            else:
+                stack.extend(child.children)
+        return rows
 
     @staticmethod
     def _print_capture(node: Node, capture_name: str) -> str:
@@ -0,0 +1,114 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+
+from tree_sitter import Node, Parser
+
+from acedev.service.model import File
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_EXTENSIONS = {
+    "python": (".py", ".pyi"),
+    "javascript": (".js", ".jsx", ".mjs", ".cjs"),
+    "typescript": (".ts",),
+    "tsx": (".tsx",),
+    "java": (".java",),
+    "kotlin": (".kt", ".kts"),
+    "go": (".go",),
+    "rust": (".rs",),
+    "ruby": (".rb",),
+    "php": (".php",),
+    "c": (".c", ".h"),
+    "cpp": (".cpp", ".cc", ".cxx", ".hpp", ".hh"),
+    "c_sharp": (".cs",),
+    "scala": (".scala",),
+}
+
+
+@dataclass(frozen=True)
+class ParseError:
+    line: int
+    column: int
+    text: str
+    missing: bool = False
+
+    def __str__(self) -> str:
+        problem = f"missing {self.text}" if self.missing else f"unexpected {self.text!r}"
+        return f"line {self.line}, column {self.column}: {problem}"
+
+
+@dataclass
+class SyntaxValidator:
+    """
+    Rejects edits that introduce new parse errors, using the tree-sitter parser of the repository.
+
+    Files that were already broken can still be edited, only errors that were not in the file
+    before the edit are reported.
+    """
+
+    parser: Parser
+    extensions: Sequence[str]
+
+    def supports(self, file: File) -> bool:
+        return file.path.endswith(tuple(self.extensions))
+
+    def errors(self, file: File) -> list[ParseError]:
+        if not self.supports(file):
+            return []
+
+        tree = self.parser.parse(file.content.encode())
+        return list(self._errors(tree.root_node))
+
+    def new_errors(self, before: File, after: File) -> list[ParseError]:
+        # Errors are compared by their text, since an edit moves the ones below it
+        existing = Counter(self._signature(error) for error in self.errors(before))
+        new_errors = []
+        for error in self.errors(after):
+            if existing[self._signature(error)] > 0:
+                existing[self._signature(error)] -= 1
+            else:
+                new_errors.append(error)
+        return new_errors
+
+    def validate(self, before: File, after: File) -> None:
+        new_errors = self.new_errors(before, after)
+        if new_errors:
+            details = "\n".join(str(error) for error in new_errors)
+            raise SyntaxValidatorException(
+                f"The edit introduces syntax errors in {after.path}:\n{details}"
+            )
+
+    def _errors(self, node: Node) -> Iterator[ParseError]:
+        if node.type == "ERROR":
+            text = node.text.decode("utf-8", errors="replace").strip().splitlines()
+            yield ParseError(
+                line=node.start_point[0] + 1,
+                column=node.start_point[1] + 1,
+                text=text[0] if text else "",
+            )
+            return
+
+        if node.is_missing:
+            yield ParseError(
+                line=node.start_point[0] + 1,
+                column=node.start_point[1] + 1,
+                text=node.type,
+                missing=True,
+            )
+            return
+
+        for child in node.children:
+            if child.has_error or child.is_missing:
+                yield from self._errors(child)
+
+    @staticmethod
+    def _signature(error: ParseError) -> tuple[str, bool]:
+        return error.text, error.missing
+
+
+class SyntaxValidatorException(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.message = message
@@ -1,17 +1,48 @@
+import fnmatch
 import random
 import string
+from collections import Counter
 from dataclasses import dataclass
 from typing import Callable, Optional
 
 from acedev.agent.coding_agent import CodingAgent, CodingAgentException
 from acedev.service.github_service import GitHubService, GitHubServiceException
 from acedev.service.git_repository import GitRepository, GitRepositoryException
-from acedev.service.model import File
-from acedev.tools.code_editor import CodeEditor, CodeEditorException
+from acedev.service.model import File, TreeEntry
+from acedev.tools.code_editor import CodeEditor, CodeEditorException, summarize_edit
+from acedev.tools.code_retrieval import Bm25Index
+from acedev.tools.code_search import CodeSearchException, TrigramIndex
+from acedev.tools.import_graph import ImportGraph
+from acedev.tools.reference_index import ReferenceIndex, ReferenceKind
 from acedev.tools.symbol_manipulator import (
     SymbolManipulator,
     SymbolManipulatorException,
 )
+from acedev.tools.syntax_validator import (
+    LANGUAGE_EXTENSIONS,
+    SyntaxValidator,
+    SyntaxValidatorException,
+)
+from acedev.utils.line_index import count_lines, line_offsets, numbered_lines
+
+# Files longer than this are read in pages of this many lines
+FILE_PAGE_LINES = 500
+
+# Edits of files this long are limited to the symbol mentioned in the instruction
+SCOPED_EDIT_MIN_LINES = 300
+
+# Matching lines returned by one code search
+MAX_SEARCH_RESULTS = 50
+
+# Files and symbols returned by one relevance search
+RELEVANT_FILES = 5
+RELEVANT_SYMBOLS = 10
+
+# References returned by one reference search
+MAX_REFERENCES = 100
+
+# Files listed by one directory listing, unless the agent asks for another limit
+MAX_LISTED_FILES = 200
 
 
 @dataclass
@@ -21,6 +52,7 @@ class ToolProvider:
     symbol_manipulator: SymbolManipulator
     code_editor: CodeEditor
     coding_agent: CodingAgent
+    syntax_validator: Optional[SyntaxValidator] = None
 
     def get_default_branch(self):
         """
@@ -57,10 +89,87 @@ class ToolProvider:
                     branch=branch or self.git_repository.default_branch
                 )
             )
+            if self.git_repository.language == "python":
+                # The graph is built from the files just read, so no blob is fetched twice
+                tree = [TreeEntry.from_file(file) for file in files]
+                blobs = {entry.sha: file.content.encode() for entry, file in zip(tree, files)}
+                with self._import_graph().at(
+                    tree, lambda shas: {sha: blobs[sha] for sha in shas}
+                ) as graph:
+                    # The modules imported the most come first, since they are the core of the project
+                    files.sort(key=lambda file: -graph.importer_count(file.path))
             return self.symbol_manipulator.get_project_outline(files)
         except (GitRepositoryException, SymbolManipulatorException) as e:
             return f"Failed to get project outline: {e.message}"
 
+    def list_files(
+        self,
+        path_prefix: str = "",
+        glob: Optional[str] = None,
+        max_entries: int = MAX_LISTED_FILES,
+        branch: Optional[str] = None,
+    ) -> str:
+        """
+        List the files of the remote repo with their sizes, without reading them.
+        It is much cheaper than the project outline, use it to find your way in large projects.
+
+        Parameters
+        ----------
+        path_prefix : str, optional
+            Only list the files in this directory, e.g. "acedev/tools". Default is the whole project.
+        glob : str, optional
+            Only list the files whose path matches the glob, e.g. "*.py" or "*/tests/*".
+        max_entries : int, optional
+            Maximum number of files to list. Default is 200.
+        branch : str, optional
+            Name of the remote branch. Default is the default branch.
+
+        Returns
+        -------
+        str
+            Paths and sizes of the files, and the number of files per directory when the list is cut,
+            or failure message.
+            Returns failure message if the branch does not exist.
+        """
+        prefix = path_prefix.strip("/").removeprefix("./").rstrip("/")
+        try:
+            tree = self._tree(branch)
+        except GitRepositoryException as e:
+            return f"Failed to list files: {e.message}"
+
+        entries = [
+            entry
+            for entry in sorted(tree, key=lambda entry: entry.path)
+            if (not prefix or entry.path == prefix or entry.path.startswith(f"{prefix}/"))
+            and (not glob or fnmatch.fnmatch(entry.path, glob))
+        ]
+        location = f" in {prefix}" if prefix else ""
+        if not entries:
+            return f"No files{location}" + (f" match {glob!r}." if glob else ".")
+
+        listed = entries[:max(max_entries, 0)]
+        output = f"{len(entries)} files{location}:\n" + "\n".join(
+            f"{entry.path} ({entry.size} bytes)" if entry.size is not None else entry.path
+            for entry in listed
+        )
+        if len(listed) < len(entries):
+            # Without the rest of the list, the directories tell where the other files are
+            directories = Counter(
+                entry.path[len(prefix):].lstrip("/").split("/")[0]
+                for entry in entries
+                if "/" in entry.path[len(prefix):].lstrip("/")
+            )
+            output += (
+                f"\n\nShowing the first {len(listed)} files. "
+                "Narrow path_prefix or glob to see the rest."
+            )
+            if directories:
+                output += "\nDirectories:\n" + "\n".join(
+                    f"- {'/'.join(filter(None, [prefix, directory]))}/ ({count} files)"
+                    for directory, count in sorted(directories.items())
+                )
+        return output
+
     def get_symbol(self, symbol: str, path: str, branch: Optional[str] = None):
         """
         Expand the symbol e.g. function, class or method from the project file of the remote repo.
@@ -102,9 +211,15 @@ class ToolProvider:
         except (GitRepositoryException, SymbolManipulatorException) as e:
             return f"Failed to get {symbol} from {path}: {e.message}"
 
-    def get_file(self, path: str, branch: Optional[str] = None):
+    def get_file(
+        self,
+        path: str,
+        branch: Optional[str] = None,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+    ):
         """
-        Get the file from the remote repo.
+        Get the file from the remote repo. Large files are returned in pages of line-numbered lines.
 
         Parameters
         ----------
@@ -112,11 +227,16 @@ class ToolProvider:
             Path to the file.
         branch : str, optional
             Name of the remote branch. Default is the default branch.
+        start_line : int, optional
+            First line to return, starting from 1. Use it to read a part of a large file.
+        end_line : int, optional
+            Last line to return, inclusive.
 
         Returns
         -------
         str
-            Content of the file or failure message.
+            Content of the file, or the requested lines with line numbers and the total line count,
+            or failure message.
             Returns failure message if the branch does not exist.
             Returns failure message if the path does not exist.
         """
@@ -131,23 +251,130 @@ class ToolProvider:
             if not file:
                 return f"Failed to get {path}: path does not exist."
 
-            return file.content
+            return self._read_lines(file, start_line, end_line)
         except GitRepositoryException as e:
             return f"Failed to get {path}: {e.message}"
 
-    def get_file_from_default(self, path: str):
+    def get_symbols(
+        self, paths: list[str], symbols: list[str], branch: Optional[str] = None
+    ) -> str:
+        """
+        Expand several symbols e.g. functions, classes or methods from the project files of the remote repo
+        in one call. Prefer it over get_symbol when you need more than one definition.
+
+        Parameters
+        ----------
+        paths : list
+            Paths to the project files containing the symbols, one per symbol.
+        symbols : list
+            Names of the symbols, in the same order as the paths.
+        branch : str, optional
+            Name of the remote branch. Default is the default branch.
+
+        Returns
+        -------
+        str
+            Expanded symbols, each in a code block titled with the path and the symbol name,
+            or failure messages for the symbols that could not be expanded.
+            Returns failure message if the branch does not exist.
         """
-        Get the file from the remote repo.
+        if len(paths) != len(symbols):
+            return f"Failed to get symbols: got {len(paths)} paths and {len(symbols)} symbols."
+
+        try:
+            if branch and not self.git_repository.branch_exists(branch):
+                return f"Failed to get symbols: {branch=} does not exist."
+
+            files = self._get_files(paths, branch or self.git_repository.default_branch)
+        except GitRepositoryException as e:
+            return f"Failed to get symbols: {e.message}"
+
+        symbols_by_path: dict[str, list[str]] = {}
+        for path, symbol in zip(paths, symbols):
+            symbols_by_path.setdefault(path, []).append(symbol)
+
+        results = []
+        for path, path_symbols in symbols_by_path.items():
+            file = files[path]
+            if isinstance(file, GitRepositoryException):
+                results += [f"Failed to get {symbol} from {path}: {file.message}" for symbol in path_symbols]
+                continue
+
+            if not file:
+                results += [f"Failed to get {symbol} from {path}: {path=} does not exist." for symbol in path_symbols]
+                continue
+
+            try:
+                found = self.symbol_manipulator.get_symbols(symbols=path_symbols, file=file)
+            except SymbolManipulatorException as e:
+                results += [f"Failed to get {symbol} from {path}: {e.message}" for symbol in path_symbols]
+                continue
+
+            for symbol in path_symbols:
+                if found[symbol] is None:
+                    results.append(f"Failed to get {symbol} from {path}: {symbol=} does not exist.")
+                else:
+                    results.append(f"```{path} {symbol}\n{found[symbol].content}\n```")
+
+        return "\n\n".join(results)
+
+    def get_files(self, paths: list[str], branch: Optional[str] = None) -> str:
+        """
+        Get several files from the remote repo in one call. Prefer it over get_file when you need more than one file.
+
+        Parameters
+        ----------
+        paths : list
+            Paths to the files.
+        branch : str, optional
+            Name of the remote branch. Default is the default branch.
+
+        Returns
+        -------
+        str
+            Content of each file in a code block titled with its path,
+            or failure messages for the files that could not be read.
+            Returns failure message if the branch does not exist.
+        """
+        try:
+            if branch and not self.git_repository.branch_exists(branch):
+                return f"Failed to get files: {branch=} does not exist."
+
+            files = self._get_files(paths, branch or self.git_repository.default_branch)
+        except GitRepositoryException as e:
+            return f"Failed to get files: {e.message}"
+
+        results = []
+        for path, file in files.items():
+            if isinstance(file, GitRepositoryException):
+                results.append(f"Failed to get {path}: {file.message}")
+            elif not file:
+                results.append(f"Failed to get {path}: path does not exist.")
+            else:
+                results.append(f"```{path}\n{file.content}\n```")
+
+        return "\n\n".join(results)
+
+    def get_file_from_default(
+        self, path: str, start_line: Optional[int] = None, end_line: Optional[int] = None
+    ):
+        """
+        Get the file from the remote repo. Large files are returned in pages of line-numbered lines.
 
         Parameters
         ----------
         path : str
             Path to the file.
+        start_line : int, optional
+            First line to return, starting from 1. Use it to read a part of a large file.
+        end_line : int, optional
+            Last line to return, inclusive.
 
         Returns
         -------
         str
-            Content of the file or failure message.
+            Content of the file, or the requested lines with line numbers and the total line count,
+            or failure message.
             Returns failure message if the path does not exist.
         """
         try:
@@ -156,10 +383,225 @@ class ToolProvider:
             if not file:
                 return f"Failed to get {path}: path does not exist."
 
-            return file.content
+            return self._read_lines(file, start_line, end_line)
         except GitRepositoryException as e:
             return f"Failed to get {path}: {e.message}"
 
+    def get_pr_file_diff(self, branch: str, path: str):
+        """
+        Get the full diff of the file changed in the pull request opened from the branch.
+        Use it for the files whose diff is omitted from the pull request description.
+
+        Parameters
+        ----------
+        branch : str
+            Name of the pull request branch.
+        path : str
+            Path to the changed file.
+
+        Returns
+        -------
+        str
+            Diff of the file or failure message.
+            Returns failure message if the pull request does not exist.
+            Returns failure message if the file is not changed in the pull request.
+        """
+        try:
+            return self.github_service.get_pull_request_file_diff(
+                branch=branch, filename=path
+            )
+        except GitHubServiceException as e:
+            return f"Failed to get diff of {path}: {e.message}"
+
+    def search_code(
+        self, pattern: str, path_glob: Optional[str] = None, branch: Optional[str] = None
+    ) -> str:
+        """
+        Search the files of the remote repo with a regular expression, like grep.
+        Use it to find definitions, call sites and string literals without reading the files.
+
+        Parameters
+        ----------
+        pattern : str
+            Python regular expression, e.g. "def get_file\\(" or "TODO". Use "(?i)" for case-insensitive search.
+        path_glob : str, optional
+            Only search the files whose path matches the glob, e.g. "*.py" or "acedev/tools/*".
+            Default is all files.
+        branch : str, optional
+            Name of the remote branch. Default is the default branch.
+
+        Returns
+        -------
+        str
+            Matching lines as path:line: snippet, or a message that nothing matches, or failure message.
+            Returns failure message if the branch does not exist or the pattern is invalid.
+        """
+        try:
+            index = TrigramIndex.for_repository(self.git_repository.full_name)
+            with index.at(self._tree(branch), self.git_repository.get_blobs):
+                matches = index.search(pattern, path_glob, max_results=MAX_SEARCH_RESULTS + 1)
+        except (GitRepositoryException, CodeSearchException) as e:
+            return f"Failed to search {pattern!r}: {e.message}"
+
+        if not matches:
+            return f"No matches for {pattern!r}."
+
+        output = "\n".join(str(match) for match in matches[:MAX_SEARCH_RESULTS])
+        if len(matches) > MAX_SEARCH_RESULTS:
+            output += (
+                f"\n\nShowing the first {MAX_SEARCH_RESULTS} matches. "
+                "Narrow the pattern or path_glob to see the rest."
+            )
+        return output
+
+    def find_relevant_code(self, query: str, branch: Optional[str] = None) -> str:
+        """
+        Find the files and functions or classes most relevant to a description, e.g. an issue or a feature.
+        The search matches the words of the query against paths, identifiers and docstrings.
+
+        Parameters
+        ----------
+        query : str
+            Description of what you are looking for, in words or identifiers.
+        branch : str, optional
+            Name of the remote branch. Default is the default branch.
+
+        Returns
+        -------
+        str
+            Most relevant files, and symbols with their line and signature, or failure message.
+            Returns failure message if the branch does not exist.
+        """
+        try:
+            index = Bm25Index.for_repository(
+                self.git_repository.full_name,
+                language=self.symbol_manipulator.language,
+                extensions=LANGUAGE_EXTENSIONS.get(self.git_repository.language, ()),
+            )
+            with index.at(self._tree(branch), self.git_repository.get_blobs):
+                files = index.search_files(query, RELEVANT_FILES)
+                symbols = index.search_symbols(query, RELEVANT_SYMBOLS)
+        except GitRepositoryException as e:
+            return f"Failed to find relevant code: {e.message}"
+
+        if not files and not symbols:
+            return "No relevant code found."
+
+        output = "Files:\n" + "\n".join(f"- {document}" for document, _ in files)
+        if symbols:
+            output += "\n\nSymbols:\n" + "\n".join(f"- {document}" for document, _ in symbols)
+        return output
+
+    def who_imports(self, path: str, branch: Optional[str] = None) -> str:
+        """
+        List the files of the project that import the module. Use it to find the code affected by a change.
+
+        Parameters
+        ----------
+        path : str
+            Path to the module, e.g. "app/models.py".
+        branch : str, optional
+            Name of the remote branch. Default is the default branch.
+
+        Returns
+        -------
+        str
+            Paths of the importing files, or failure message.
+            Returns failure message if the path is not a module of the project.
+        """
+        if self.git_repository.language != "python":
+            return f"Failed to find the files importing {path}: only Python projects are supported."
+
+        try:
+            with self._import_graph().at(self._tree(branch), self.git_repository.get_blobs) as graph:
+                if path not in graph:
+                    return f"Failed to find the files importing {path}: path is not a module of the project."
+                importers = graph.importers(path)
+        except GitRepositoryException as e:
+            return f"Failed to find the files importing {path}: {e.message}"
+
+        if not importers:
+            return f"No files import {path}."
+        return f"Files importing {path}:\n" + "\n".join(f"- {importer}" for importer in importers)
+
+    def dependencies(self, path: str, branch: Optional[str] = None) -> str:
+        """
+        List the files of the project imported by the module.
+
+        Parameters
+        ----------
+        path : str
+            Path to the module, e.g. "app/models.py".
+        branch : str, optional
+            Name of the remote branch. Default is the default branch.
+
+        Returns
+        -------
+        str
+            Paths of the imported files, or failure message.
+            Returns failure message if the path is not a module of the project.
+        """
+        if self.git_repository.language != "python":
+            return f"Failed to find the dependencies of {path}: only Python projects are supported."
+
+        try:
+            with self._import_graph().at(self._tree(branch), self.git_repository.get_blobs) as graph:
+                if path not in graph:
+                    return f"Failed to find the dependencies of {path}: path is not a module of the project."
+                dependencies = graph.dependencies(path)
+        except GitRepositoryException as e:
+            return f"Failed to find the dependencies of {path}: {e.message}"
+
+        if not dependencies:
+            return f"{path} imports no files of the project."
+        return f"Files imported by {path}:\n" + "\n".join(
+            f"- {dependency}" for dependency in dependencies
+        )
+
+    def find_references(self, symbol: str, branch: Optional[str] = None) -> str:
+        """
+        Find where a function, class, method or variable is defined, called and referenced in the project.
+        Use it before changing the signature of a function to find the callers that need to be updated.
+
+        Parameters
+        ----------
+        symbol : str
+            Name of the symbol, e.g. "get_file". For a method, "Class.method" is the same as "method".
+        branch : str, optional
+            Name of the remote branch. Default is the default branch.
+
+        Returns
+        -------
+        str
+            Locations as path:line:column followed by definition, call or reference, or failure message.
+            Returns failure message if the branch does not exist.
+        """
+        name = symbol.rsplit(".", 1)[-1]
+        try:
+            index = ReferenceIndex.for_repository(
+                self.git_repository.full_name,
+                language=self.symbol_manipulator.language,
+                extensions=LANGUAGE_EXTENSIONS.get(self.git_repository.language, ()),
+            )
+            with index.at(self._tree(branch), self.git_repository.get_blobs):
+                references = index.find(name)
+        except GitRepositoryException as e:
+            return f"Failed to find references to {symbol}: {e.message}"
+
+        if not references:
+            return f"No references to {symbol} found."
+
+        counts = ", ".join(
+            f"{sum(reference.kind == kind for reference in references)} {kind}s"
+            for kind in (ReferenceKind.DEFINITION, ReferenceKind.CALL, ReferenceKind.REFERENCE)
+        )
+        output = f"References to {symbol} ({counts}):\n" + "\n".join(
+            str(reference) for reference in references[:MAX_REFERENCES]
+        )
+        if len(references) > MAX_REFERENCES:
+            output += f"\n\nShowing the first {MAX_REFERENCES} references."
+        return output
+
     def edit_file(self, branch: str, path: str, diff: str) -> str:
         """
         Edit the file in the remote branch.
@@ -195,12 +637,13 @@ class ToolProvider:
                 return f"Failed to edit {path}: path does not exist."
 
             new_file = self.code_editor.apply_diff(diff=diff, file=file)
+            self._validate_syntax(file, new_file)
             self.git_repository.update_file(file=new_file, branch=branch)
             return f"Edited {path} in {branch}"
-        except (GitRepositoryException, CodeEditorException) as e:
+        except (GitRepositoryException, CodeEditorException, SyntaxValidatorException) as e:
             return f"Failed to edit {path} in {branch}: {e.message}"
 
-    def dry_edit_file(self, path: str, diff: str) -> str:
+    def dry_edit_file(self, path: str, diff: str, show_content: bool = False) -> str:
         """
         Edit the file in the remote branch.
 
@@ -210,6 +653,8 @@ class ToolProvider:
             Full path to the file, e.g. "module/submodule/file.py".
         diff : str
             Diff of the file in the unified diff format. It should include a few lines of context.
+        show_content : bool, optional
+            Return the full content of the edited file instead of the diff of the changes.
 
         Returns
         -------
@@ -226,11 +671,73 @@ class ToolProvider:
                 return f"Failed to edit {path}: path does not exist."
 
             new_file = self.code_editor.apply_diff(diff=diff, file=file)
-            return f"Edited {path}. The new file content is:\n\n{new_file.content}"
+            return self._edit_acknowledgement(file, new_file, show_content)
         except (GitRepositoryException, CodeEditorException) as e:
             return f"Failed to edit {path}: {e.message}"
 
-    def request_edit(self, branch: str, path: str, instruction: str) -> str:
+    def update_symbols(
+        self, symbols: list[str], definitions: list[str], path: str, branch: str
+    ) -> str:
+        """
+        Update several symbols, e.g. functions, classes or methods, in the project file of the remote repo
+        with a single commit.
+
+        Parameters
+        ----------
+        symbols : list
+            Names of the symbols.
+        definitions : list
+            New definitions of the symbols, in the same order as the names.
+        path : str
+            Path to the file.
+        branch : str
+            Name of the remote branch.
+
+        Returns
+        -------
+        str
+            Success or failure message.
+            Returns failure message if the branch is protected (e.g. main, master).
+            Returns failure message if any symbol is not found.
+            Returns failure message if the path does not exist.
+            Returns failure message if any new definition can not be parsed or is for another symbol.
+            No symbol is updated if any of them fails.
+        """
+        try:
+            if branch == self.git_repository.default_branch:
+                # even if it's not protected, we don't want to push on the default branch
+                return f"Failed to update {symbols} in {path}: {branch=} is protected."
+
+            if len(symbols) != len(definitions):
+                return (
+                    f"Failed to update {symbols} in {path}: got {len(symbols)} symbols "
+                    f"and {len(definitions)} definitions."
+                )
+
+            if not self.git_repository.branch_exists(branch):
+                return f"Failed to update {symbols} in {path}: {branch=} does not exist."
+
+            file = self.git_repository.get_file(path=path, branch=branch)
+
+            if not file:
+                return f"Failed to update {symbols} in {path}: path does not exist."
+
+            new_file = self.symbol_manipulator.update_symbols(
+                definitions=list(zip(symbols, definitions)), file=file
+            )
+            self.git_repository.update_file(file=new_file, branch=branch)
+            return f"Updated {symbols} in {path} on {branch=}"
+        except (GitRepositoryException, SymbolManipulatorException) as e:
+            return f"Failed to update {symbols} in {path} on {branch=}: {e.message}"
+
+    def request_edit(
+        self,
+        branch: str,
+        path: str,
+        instruction: str,
+        symbol: Optional[str] = None,
+        show_content: bool = False,
+    ) -> str:
         """
         Request the file edit in the remote branch. Someone on your team will handle the request.
 
@@ -242,6 +749,11 @@ class ToolProvider:
             Full path to the file, e.g. "module/submodule/file.py".
         instruction : str
             Instruction for the edit. Be as specific as possible.
+        symbol : str, optional
+            Name of the function, class or method the edit is limited to. Only its definition
+            and the file's imports are edited, which is faster for large files.
+        show_content : bool, optional
+            Return the full content of the edited file instead of the diff of the changes.
 
         Returns
         -------
@@ -250,6 +762,7 @@ class ToolProvider:
             Returns failure message if the branch is protected (e.g. main, master).
             Returns failure message if the branch does not exist.
             Returns failure message if the path does not exist.
+            Returns failure message if the symbol does not exist.
         """
         try:
             if branch == self.git_repository.default_branch:
@@ -264,23 +777,129 @@ class ToolProvider:
             if not file:
                 return f"Failed to edit {path}: path does not exist."
 
-            new_file = self.coding_agent.edit_file(
-                instructions=instruction,
-                file=file,
-            )
+            if symbol is None and self._infers_scope(file):
+                mentioned_symbols = self.symbol_manipulator.find_mentioned_symbols(
+                    instruction, file
+                )
+                if len(mentioned_symbols) == 1:
+                    symbol = mentioned_symbols[0]
+
+            if symbol:
+                scope = self.symbol_manipulator.get_symbol_scope(symbol, file)
+                new_scope = self.coding_agent.edit_file(
+                    instructions=instruction,
+                    file=scope,
+                )
+                new_file = self.symbol_manipulator.splice_symbol_scope(
+                    symbol, new_scope, file
+                )
+            else:
+                new_file = self.coding_agent.edit_file(
+                    instructions=instruction,
+                    file=file,
+                )
 
+            if new_file.content == file.content:
+                return f"No changes to {path}."
+
+            self._validate_syntax(file, new_file)
             self.git_repository.update_file(file=new_file, branch=branch)
-            return f"Edited {path}. The new file content is:\n\n{new_file.content}"
-        except (GitRepositoryException, CodingAgentException) as e:
+            return self._edit_acknowledgement(file, new_file, show_content)
+        except (
+            GitRepositoryException,
+            CodingAgentException,
+            SymbolManipulatorException,
+            SyntaxValidatorException,
+        ) as e:
             return f"Failed to edit {path} in {branch}: {e.message}"
 
+    def _infers_scope(self, file: File) -> bool:
+        # Symbols are only found in Python files
+        return (
+            file.content.count("\n") >= SCOPED_EDIT_MIN_LINES
+            and self.git_repository.language == "python"
+            and file.path.endswith(LANGUAGE_EXTENSIONS["python"])
+        )
+
+    @staticmethod
+    def _edit_acknowledgement(file: File, new_file: File, show_content: bool) -> str:
+        if show_content:
+            return f"Edited {new_file.path}. The new file content is:\n\n{new_file.content}"
+        return summarize_edit(file, new_file)
+
+    @staticmethod
+    def _read_lines(file: File, start_line: Optional[int], end_line: Optional[int]) -> str:
+        offsets = line_offsets(file.content)
+        total_lines = count_lines(file.content, offsets)
+
+        if start_line is None and end_line is None:
+            if total_lines <= FILE_PAGE_LINES:
+                return file.content
+            start_line = 1
+
+        start_line = max(start_line or 1, 1)
+        if end_line is None:
+            end_line = start_line + FILE_PAGE_LINES - 1
+        end_line = min(end_line, total_lines)
+
+        if start_line > total_lines:
+            return f"{file.path} has {total_lines} lines, {start_line=} is past the end."
+        if end_line < start_line:
+            return f"Failed to read {file.path}: {end_line=} is before {start_line=}."
+
+        output = (
+            f"Lines {start_line}-{end_line} of {total_lines} in {file.path}:\n"
+            f"{numbered_lines(file.content, start_line, end_line, offsets)}"
+        )
+        if end_line < total_lines:
+            output += f"\n\nRead more with start_line={end_line + 1}."
+        return output
+
+    def _get_files(
+        self, paths: list[str], branch: str
+    ) -> dict[str, Optional[File] | GitRepositoryException]:
+        """Fetches the distinct paths, keeping the errors per path."""
+        if self.git_repository.local_reads:
+            # The mirror reads all the files in one batch
+            return dict(self.git_repository.get_files_by_path(paths, branch))
+
+        # The API client is not thread-safe, so the files are fetched one at a time
+        files: dict[str, Optional[File] | GitRepositoryException] = {}
+        for path in dict.fromkeys(paths):
+            try:
+                files[path] = self.git_repository.get_file(path=path, branch=branch)
+            except GitRepositoryException as e:
+                files[path] = e
+        return files
+
+    def _tree(self, branch: Optional[str]) -> list[TreeEntry]:
+        return self.git_repository.get_tree(branch or self.git_repository.default_branch)
+
+    def _import_graph(self) -> ImportGraph:
+        return ImportGraph.for_repository(
+            self.git_repository.full_name, language=self.symbol_manipulator.language
+        )
+
+    def _validate_syntax(self, file: File, new_file: File) -> None:
+        if self.syntax_validator is not None:
+            self.syntax_validator.validate(file, new_file)
+
     def code_understanding_tools(self) -> dict[str, Callable[..., str]]:
 
         return {
             self.get_default_branch.__name__: self.get_default_branch,
             self.get_project_outline.__name__: self.get_project_outline,
+            self.list_files.__name__: self.list_files,
             self.get_symbol.__name__: self.get_symbol,
             self.get_file.__name__: self.get_file,
+            self.get_symbols.__name__: self.get_symbols,
+            self.get_files.__name__: self.get_files,
+            self.get_pr_file_diff.__name__: self.get_pr_file_diff,
+            self.search_code.__name__: self.search_code,
+            self.find_relevant_code.__name__: self.find_relevant_code,
+            self.who_imports.__name__: self.who_imports,
+            self.dependencies.__name__: self.dependencies,
+            self.find_references.__name__: self.find_references,
         }
 
     def code_editing_tools(self) -> dict[str, Callable[..., str]]:
@@ -616,6 +1235,7 @@ class ToolProvider:
             create_file.__name__: create_file,
             # self.edit_file.__name__: self.edit_file,
             self.request_edit.__name__: self.request_edit,
+            self.update_symbols.__name__: self.update_symbols,
             create_new_branch.__name__: create_new_branch,
             create_pull_request.__name__: create_pull_request,
             # add_imports.__name__: add_imports,
@@ -0,0 +1,61 @@
+from array import array
+from typing import Optional
+
+
+def line_offsets(content: str) -> array:
+    """
+    Offsets of the start of every line in the content.
+
+    Reads of a line range slice the content with the offsets instead of splitting the
+    whole file. Callers that need them more than once compute them once and pass them on.
+    """
+    offsets = array("q", [0])
+    position = content.find("\n")
+    while position != -1:
+        offsets.append(position + 1)
+        position = content.find("\n", position + 1)
+
+    if offsets[-1] == len(content) and len(offsets) > 1:
+        # A trailing newline doesn't start another line
+        offsets.pop()
+    return offsets
+
+
+def split_lines(content: str) -> list[str]:
+    """
+    Lines of the content, split on newlines only so they agree with ``line_offsets``.
+
+    ``str.splitlines`` also splits on form feeds and other separators, which would shift
+    the line numbers.
+    """
+    lines = content.split("\n")
+    if lines[-1] == "":
+        # A trailing newline doesn't start another line
+        lines.pop()
+    return lines
+
+
+def count_lines(content: str, offsets: Optional[array] = None) -> int:
+    if not content:
+        return 0
+    return len(offsets if offsets is not None else line_offsets(content))
+
+
+def numbered_lines(
+    content: str, start_line: int, end_line: int, offsets: Optional[array] = None
+) -> str:
+    """Returns the 1-based, inclusive line range prefixed with line numbers."""
+    if offsets is None:
+        offsets = line_offsets(content)
+    start_line = max(start_line, 1)
+    end_line = min(end_line, len(offsets))
+    if start_line > end_line:
+        return ""
+
+    start = offsets[start_line - 1]
+    end = offsets[end_line] if end_line < len(offsets) else len(content)
+    width = len(str(end_line))
+    return "\n".join(
+        f"{number:>{width}} | {line}"
+        for number, line in enumerate(split_lines(content[start:end]), start=start_line)
+    )
@@ -1,9 +1,18 @@
+import functools
 import inspect
 import re
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional
 
-from jinja2 import Environment, StrictUndefined
+from jinja2 import Environment, StrictUndefined, Template
+
+# Shared by all templates, so compiled templates and the lexer setup are reused
+ENVIRONMENT = Environment(
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+    undefined=StrictUndefined,
+)
 
 
 @dataclass
@@ -24,7 +33,12 @@ class Prompt:
         """
         bound_arguments = self.signature.bind(*args, **kwargs)
         bound_arguments.apply_defaults()
-        return render(self.template, **bound_arguments.arguments)
+        return self.compiled.render(**bound_arguments.arguments).rstrip()
+
+    @functools.cached_property
+    def compiled(self) -> Template:
+        """The cleaned and compiled template, built on first use."""
+        return compile_template(self.template)
 
     def __str__(self) -> str:
         return self.template
@@ -34,8 +48,8 @@ def prompt(fn: Callable[..., None]) -> Prompt:
     """Decorate a function that contains a prompt template.
 
     This allows to define prompts in the docstring of a function and simplify their
-    manipulation by providing some degree of encapsulation. It uses the `render`
-    function internally to render templates.
+    manipulation by providing some degree of encapsulation. The template is cleaned
+    and compiled once, on first use, and every call only renders it.
 
     >>> @prompt
     >>> def my_prompt(name):
@@ -78,6 +92,23 @@ def render(template: str, **values: Optional[Dict[str, Any]]) -> str:
     -------
     A string that contains the rendered template.
 
+    """
+    return compile_template(template).render(**values).rstrip()
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(template: str) -> Template:
+    """Clean and compile a Jinja2 template with the shared environment.
+
+    Parameters
+    ----------
+    template
+        A string that contains a template written with the Jinja2 syntax.
+
+    Returns
+    -------
+    The compiled template. The result is cached, so each template is compiled once.
+
     """
     # Dedent, and remove extra linebreak
     cleaned_template = inspect.cleandoc(template)
@@ -87,13 +118,4 @@ def render(template: str, **values: Optional[Dict[str, Any]]) -> str:
     # used to continue to the next line without linebreak.
     cleaned_template = re.sub(r"(?![\r\n])(\b\s+)", " ", cleaned_template)
 
-    env = Environment(
-        trim_blocks=True,
-        lstrip_blocks=True,
-        keep_trailing_newline=True,
-        undefined=StrictUndefined,
-    )
-
-    jinja_template = env.from_string(cleaned_template)
-
-    return jinja_template.render(**values).rstrip()
+    return ENVIRONMENT.from_string(cleaned_template)
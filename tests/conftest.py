@@ -8,7 +8,38 @@ from starlette.testclient import TestClient
 from acedev.agent.github_agent_factory import GitHubAgentFactory
 from acedev.agent.openai_agent_runner import OpenAIAgentRunner
 from acedev.api.api import get_api
+from acedev.service.model import TreeEntry
 from acedev.service.openai_service import OpenAIService
+from acedev.service.rate_limit_scheduler import RateLimitScheduler
+from acedev.tools.blob_index import BlobIndex
+
+
+class Blobs:
+    """Blob store behind fake repository trees, which records the object ids read."""
+
+    def __init__(self) -> None:
+        self.contents: dict[str, bytes] = {}
+        self.reads: list[str] = []
+
+    def tree(self, files: dict[str, str]) -> list[TreeEntry]:
+        entries = []
+        for path, content in files.items():
+            sha = f"sha-{content}"
+            self.contents[sha] = content.encode()
+            entries.append(TreeEntry(path=path, type="blob", size=len(content), sha=sha))
+        return entries
+
+    def get_blobs(self, shas: list[str]) -> dict[str, bytes]:
+        self.reads.extend(shas)
+        return {sha: self.contents[sha] for sha in shas}
+
+    def update(self, index: BlobIndex, files: dict[str, str]) -> None:
+        index.update(self.tree(files), self.get_blobs)
+
+
+@pytest.fixture()
+def blobs() -> Blobs:
+    return Blobs()
 
 
 @pytest.fixture()
@@ -31,12 +62,18 @@ def github_agent_factory() -> GitHubAgentFactory:
     return create_autospec(GitHubAgentFactory)
 
 
+@pytest.fixture()
+def rate_limit_scheduler() -> RateLimitScheduler:
+    return RateLimitScheduler()
+
+
 @pytest.fixture()
 def api(
     ghe_client: GithubIntegration,
     openai_service: OpenAIService,
     openai_agent: OpenAIAgentRunner,
     github_agent_factory: GitHubAgentFactory,
+    rate_limit_scheduler: RateLimitScheduler,
 ) -> fastapi.FastAPI:
     """Fixture for the initialized API.
 
@@ -49,6 +86,7 @@ def api(
         openai_service=openai_service,
         openai_agent=openai_agent,
         github_agent_factory=github_agent_factory,
+        rate_limit_scheduler=rate_limit_scheduler,
     )
 
 
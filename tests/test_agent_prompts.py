@@ -95,3 +95,55 @@ options, pick the best one and explain why it's the best.
 update their content.
 6. Finally open the pull request.\
 """
+
+
+def test_issue_assigned_prompt_with_relevant_code() -> None:
+    issue = Issue(id=1, number=1, title=TITLE, body=BODY, comments=[])
+
+    assert f"""\
+Issue body:
+{BODY}
+
+Code that may be relevant to the issue, found by matching its words against the repository:
+Files:
+- app.py
+
+Here's what I expect from you now:
+""" in issue_assigned_prompt(issue, relevant_code="Files:\n- app.py")
+
+
+def test_pull_request_review_comment_prompt_summarizes_large_and_generated_diffs() -> None:
+    pull_request = PullRequest(
+        title=TITLE,
+        body=BODY,
+        head_ref=BRANCH,
+        url=URL,
+        files=[
+            FileChange(status=STATUS, filename="poetry.lock", diff=DIFF),
+            FileChange(status=STATUS, filename="large.py", diff="+line\n" * 10),
+            FileChange(status=STATUS, filename=FILENAME, diff=DIFF),
+            FileChange(status=STATUS, filename="over_total.py", diff=DIFF * 5),
+        ],
+    )
+
+    prompt = pull_request_review_comment_prompt(
+        pull_request, max_file_diff_chars=20, max_total_diff_chars=20
+    )
+
+    assert (
+        f"""\
+Pull request files:
+{STATUS} poetry.lock (generated or vendored file, diff omitted)
+
+{STATUS} large.py (10 diff lines omitted, use get_pr_file_diff to read them)
+
+{STATUS} {FILENAME}
+```diff
+{DIFF}
+```
+
+{STATUS} over_total.py (1 diff lines omitted, use get_pr_file_diff to read them)
+
+Here's what I expect from you now:"""
+        in prompt
+    )
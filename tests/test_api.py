@@ -22,6 +22,7 @@ from acedev.api.webhook import (
     IssueAssignedPayload,
     Assignee,
 )
+from acedev.service.rate_limit_scheduler import RateLimitScheduler
 
 ISSUE_ASSIGNED_PAYLOAD = IssueAssignedPayload(
     action="assigned",
@@ -288,3 +289,22 @@ def test_unexpected_event_ignored(
     assert response.status_code == 202
     ghe_client.get_github_for_installation.assert_not_called()
     github_agent_factory.create.assert_not_called()
+
+
+def test_rate_limits(
+    client: TestClient,
+    rate_limit_scheduler: RateLimitScheduler,
+) -> None:
+    rate_limit_scheduler.update(789, remaining=4000, limit=5000, reset_at=1700000000)
+
+    response = client.get("/metrics/rate-limits")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "789": {
+            "remaining": 4000,
+            "limit": 5000,
+            "reset_at": 1700000000,
+            "blocked_until": 0,
+        }
+    }
@@ -3,6 +3,11 @@ import pytest
 from acedev.service.model import File
 from acedev.tools.code_editor import (
     CodeEditor,
+    CodeEditorException,
+    SearchReplaceBlock,
+    hunk_context,
+    parse_search_replace_blocks,
+    summarize_edit,
     reconcile_subsequence,
 )
 
@@ -1028,3 +1033,197 @@ class GitHubServiceException(Exception):
     )
 
     assert code_editor.apply_diff(diff, file) == expected
+
+
+def test_apply_diff_partially_keeps_applied_hunks(
+    code_editor: CodeEditor, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Only exact matches apply, the patch CLI fallback fails
+    monkeypatch.setattr("acedev.tools.code_editor.run_patch_cli", lambda *args: None)
+    file = File(path="file.py", content="line 1\nline 2\nline 3\n")
+    applied_hunk = "@@ ... @@\n line 1\n+new line\n line 2\n"
+    failed_hunk = "@@ ... @@\n missing line\n-other line\n+new line\n"
+
+    result = code_editor.apply_diff_partially(applied_hunk + failed_hunk, file)
+
+    assert result.file.content == "line 1\nnew line\nline 2\nline 3\n"
+    assert result.failed_hunks == [failed_hunk]
+
+
+def test_hunk_context() -> None:
+    content = "".join(f"line {index}\n" for index in range(1, 21))
+    hunk = "@@ ... @@\n line 10\n-line 11\n+changed\n  line 12 \n"
+
+    assert hunk_context(hunk, content, extra_lines=1) == (
+        " 9 | line 9\n10 | line 10\n11 | line 11\n12 | line 12\n13 | line 13"
+    )
+
+
+SEARCH_REPLACE_FILE = File(
+    path="file.py",
+    content="""\
+class MyClass:
+    def my_method(self):
+        return 1
+
+    def my_method2(self):
+        return 1
+""",
+)
+
+
+def test_parse_search_replace_blocks() -> None:
+    text = """\
+Here are the changes:
+
+```
+<<<<<<< SEARCH
+old line
+=======
+new line 1
+new line 2
+>>>>>>> REPLACE
+```
+<<<<<<< SEARCH
+=======
+appended line
+>>>>>>> REPLACE
+"""
+
+    assert parse_search_replace_blocks(text) == [
+        SearchReplaceBlock(search="old line\n", replace="new line 1\nnew line 2\n"),
+        SearchReplaceBlock(search="", replace="appended line\n"),
+    ]
+
+
+def test_apply_search_replace_ignores_indentation(code_editor: CodeEditor) -> None:
+    blocks = [
+        SearchReplaceBlock(
+            search="def my_method2(self):\n    return 1\n",
+            replace="def my_method2(self):\n    return 2\n",
+        ),
+        SearchReplaceBlock(search="", replace="\n\nCONSTANT = 1\n"),
+    ]
+
+    assert code_editor.apply_search_replace(blocks, SEARCH_REPLACE_FILE) == File(
+        path="file.py",
+        content="""\
+class MyClass:
+    def my_method(self):
+        return 1
+
+    def my_method2(self):
+        return 2
+
+
+CONSTANT = 1
+""",
+    )
+
+
+def test_apply_search_replace_ambiguous(code_editor: CodeEditor) -> None:
+    blocks = [SearchReplaceBlock(search="return 1\n", replace="return 2\n")]
+
+    with pytest.raises(CodeEditorException) as e:
+        code_editor.apply_search_replace(blocks, SEARCH_REPLACE_FILE)
+
+    assert "matches 2 times in file.py (lines 3, 6)" in e.value.message
+
+
+def test_apply_search_replace_not_found(code_editor: CodeEditor) -> None:
+    blocks = [SearchReplaceBlock(search="return 3\n", replace="return 2\n")]
+
+    with pytest.raises(CodeEditorException):
+        code_editor.apply_search_replace(blocks, SEARCH_REPLACE_FILE)
+
+
+def test_apply_search_replace_overlapping_blocks(code_editor: CodeEditor) -> None:
+    blocks = [
+        SearchReplaceBlock(search="class MyClass:\n    def my_method(self):\n", replace=""),
+        SearchReplaceBlock(search="def my_method(self):\n    return 1\n", replace=""),
+    ]
+
+    with pytest.raises(CodeEditorException):
+        code_editor.apply_search_replace(blocks, SEARCH_REPLACE_FILE)
+
+
+REPEATED_FILE = File(
+    path="file.py",
+    content="""\
+def first():
+    return None
+
+
+def second():
+    return None
+""",
+)
+
+
+def test_apply_diff_uses_line_hint_for_repeated_blocks(code_editor: CodeEditor) -> None:
+    diff = """\
+@@ -5,2 +5,2 @@
+ def second():
+-    return None
++    return 2
+@@ -2,1 +2,1 @@
+-    return None
++    return 1
+"""
+
+    assert code_editor.apply_diff(diff, REPEATED_FILE) == File(
+        path="file.py",
+        content="""\
+def first():
+    return 1
+
+
+def second():
+    return 2
+""",
+    )
+
+
+def test_apply_diff_refuses_ambiguous_hunk(code_editor: CodeEditor) -> None:
+    diff = """\
+@@ ... @@
+-    return None
++    return 1
+"""
+
+    result = code_editor.apply_diff_partially(diff, REPEATED_FILE)
+
+    assert result.file == REPEATED_FILE
+    assert result.failed_hunks == [diff]
+    assert result.failure_reasons[diff] == (
+        "Hunk matches 2 places (lines 2, 6), include more context lines to make it unique"
+    )
+
+    with pytest.raises(CodeEditorException) as e:
+        code_editor.apply_diff(diff, REPEATED_FILE)
+    assert "Hunk matches 2 places (lines 2, 6)" in e.value.message
+
+
+def test_hunk_context_numbers_lines_like_line_offsets() -> None:
+    content = "a\nb\x0cc\nd\ne\n"
+    hunk = "@@ ... @@\n d\n-e\n+f\n"
+
+    assert hunk_context(hunk, content, extra_lines=0) == "3 | d\n4 | e"
+
+
+def test_hunk_context_shows_every_matching_place() -> None:
+    hunk = "@@ ... @@\n-    return None\n+    return 1\n"
+
+    assert hunk_context(hunk, REPEATED_FILE.content, extra_lines=0) == (
+        "2 |     return None\n...\n6 |     return None"
+    )
+
+
+def test_summarize_edit_truncates_long_diffs() -> None:
+    before = File(path="file.py", content="".join(f"line {number}\n" for number in range(10)))
+    after = File(path="file.py", content="".join(f"new {number}\n" for number in range(10)))
+
+    summary = summarize_edit(before, after, max_diff_lines=5)
+
+    assert summary.startswith("Edited file.py: +10 -10 lines, 10 lines total, sha256 ")
+    assert summary.endswith("-line 1\n... 18 more diff lines omitted\n```")
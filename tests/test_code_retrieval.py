@@ -0,0 +1,82 @@
+import pytest
+from tree_sitter_languages import get_language
+
+from acedev.tools.code_retrieval import Bm25Corpus, Bm25Index, Document, tokenize
+from tests.conftest import Blobs
+
+FILES = {
+    "app/search.py": '''\
+def search_code(pattern):
+    """Grep the repository for the pattern."""
+    return []
+
+
+class TrigramIndex:
+    def candidates(self, pattern):
+        return []
+''',
+    "app/editor.py": '''\
+def apply_diff(diff, content):
+    """Apply the unified diff to the content."""
+    return content
+''',
+    "docs/search.md": "Searching the code.\n",
+}
+
+
+@pytest.fixture
+def index(blobs: Blobs) -> Bm25Index:
+    index = Bm25Index(language=get_language("python"), extensions=(".py",))
+    blobs.update(index, FILES)
+    return index
+
+
+def test_tokenize() -> None:
+    assert tokenize("getFileContent in HTTPServer, see get_file.") == [
+        "getfilecontent", "get", "file", "content",
+        "httpserver", "http", "server",
+        "see",
+        "get_file", "get", "file",
+    ]
+
+
+def test_corpus_ranks_rare_terms_higher() -> None:
+    corpus = Bm25Corpus()
+    common = Document(path="common.py")
+    rare = Document(path="rare.py")
+    corpus.add(common, ["index", "index"])
+    corpus.add(rare, ["index", "trigram"])
+    corpus.add(Document(path="other.py"), ["index"])
+
+    assert [document for document, _ in corpus.search(["index", "trigram"], 2)] == [rare, common]
+
+    corpus.remove(rare)
+    assert [document for document, _ in corpus.search(["trigram"], 2)] == []
+    assert len(corpus) == 2
+
+
+def test_search_files(index: Bm25Index) -> None:
+    files = [document.path for document, _ in index.search_files("The diff is not applied", 2)]
+
+    assert files == ["app/editor.py"]
+
+
+def test_search_symbols(index: Bm25Index) -> None:
+    symbols = [str(document) for document, _ in index.search_symbols("trigram candidates", 2)]
+
+    assert symbols == [
+        "app/search.py:6 class TrigramIndex:",
+        "app/search.py:7 def candidates(self, pattern):",
+    ]
+
+
+def test_update_replaces_changed_files(index: Bm25Index, blobs: Blobs) -> None:
+    files = {**FILES, "app/editor.py": "def apply_patch(patch):\n    return patch\n"}
+    del files["app/search.py"]
+
+    blobs.update(index, files)
+
+    assert index.search_symbols("trigram", 1) == []
+    assert [str(document) for document, _ in index.search_symbols("patch", 1)] == [
+        "app/editor.py:1 def apply_patch(patch):"
+    ]
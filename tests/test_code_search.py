@@ -0,0 +1,155 @@
+import threading
+from collections import OrderedDict
+
+import pytest
+
+from acedev.service.model import TreeEntry
+from acedev.tools.blob_index import MAX_INDEXED_BLOB_BYTES, BlobIndex
+from acedev.tools.code_search import (
+    CodeSearchException,
+    SearchMatch,
+    TrigramIndex,
+    required_literals,
+)
+from tests.conftest import Blobs
+
+
+@pytest.fixture
+def index(blobs: Blobs) -> TrigramIndex:
+    index = TrigramIndex()
+    blobs.update(
+        index,
+        {
+            "app/main.py": "import os\n\ndef get_file(path):\n    return open(path)\n",
+            "app/util.py": "def helper():\n    return get_file('x')\n",
+            "README.md": "Call get_file to read a file.\n",
+        },
+    )
+    return index
+
+
+@pytest.mark.parametrize(
+    "pattern, literals",
+    [
+        ("get_file", ["get_file"]),
+        (r"def get_file\(", ["def get_file("]),
+        (r"get_\w+\(path", ["get_", "(path"]),
+        ("files?", ["file"]),
+        ("colou?r", ["colo", "r"]),
+        ("ab{2,3}c", ["a", "c"]),
+        ("a+bc", ["a", "bc"]),
+        ("import (os|sys)", ["import "]),
+        ("[abc]def", ["def"]),
+        ("foo|bar", []),
+        ("(?x) foo", []),
+        (r"\x41bcd", ["bcd"]),
+        (r"\u0041bcd", ["bcd"]),
+        (r"\U00000041bcd", ["bcd"]),
+        (r"\N{LATIN CAPITAL LETTER A}bcd", ["bcd"]),
+        (r"\101bcd", ["bcd"]),
+        (r"\0bcd", ["bcd"]),
+        (r"(a)\1bcd", ["bcd"]),
+        (r"(a)\1 bcd", [" bcd"]),
+        (r"\bword\b", ["word"]),
+    ],
+)
+def test_required_literals(pattern: str, literals: list[str]) -> None:
+    assert required_literals(pattern) == literals
+
+
+def test_candidates(index: TrigramIndex) -> None:
+    assert index.candidates(r"def get_file\(") == ["app/main.py"]
+    assert index.candidates("get_file") == ["README.md", "app/main.py", "app/util.py"]
+    assert index.candidates("GET_FILE") == ["README.md", "app/main.py", "app/util.py"]
+    assert index.candidates("missing") == []
+    assert index.candidates("os|missing") == ["README.md", "app/main.py", "app/util.py"]
+
+
+def test_search(index: TrigramIndex) -> None:
+    assert index.search(r"get_file\(") == [
+        SearchMatch(path="app/main.py", line=3, text="def get_file(path):"),
+        SearchMatch(path="app/util.py", line=2, text="    return get_file('x')"),
+    ]
+
+
+def test_search_path_glob(index: TrigramIndex) -> None:
+    assert index.search("get_file", path_glob="*.md") == [
+        SearchMatch(path="README.md", line=1, text="Call get_file to read a file.")
+    ]
+
+
+def test_search_multiline(index: TrigramIndex) -> None:
+    assert index.search(r"^def \w+\(\):$") == [
+        SearchMatch(path="app/util.py", line=1, text="def helper():")
+    ]
+
+
+def test_search_max_results(index: TrigramIndex) -> None:
+    assert len(index.search("return", max_results=1)) == 1
+
+
+def test_search_invalid_pattern(index: TrigramIndex) -> None:
+    with pytest.raises(CodeSearchException):
+        index.search("get_file(")
+
+
+def test_update_reads_changed_blobs_only(index: TrigramIndex, blobs: Blobs) -> None:
+    blobs.reads.clear()
+
+    blobs.update(
+        index,
+        {
+            "app/main.py": "import os\n\ndef get_file(path):\n    return open(path)\n",
+            "app/util.py": "def helper():\n    return read_file('x')\n",
+        },
+    )
+
+    assert blobs.reads == ["sha-def helper():\n    return read_file('x')\n"]
+    assert index.candidates("get_file") == ["app/main.py"]
+    assert index.candidates("read_file") == ["app/util.py"]
+
+
+def test_update_skips_binary_and_large_blobs(blobs: Blobs) -> None:
+    index = TrigramIndex()
+    tree = blobs.tree({"image.png": "\0PNG data", "small.py": "data = 1\n"})
+    tree.append(
+        TreeEntry(path="large.json", type="blob", size=MAX_INDEXED_BLOB_BYTES + 1, sha="large")
+    )
+
+    index.update(tree, blobs.get_blobs)
+    index.update(tree, blobs.get_blobs)
+
+    assert index.candidates("data") == ["small.py"]
+    assert blobs.reads == ["sha-\0PNG data", "sha-data = 1\n"]
+
+
+def test_at_holds_the_tree_until_the_block_ends(index: TrigramIndex, blobs: Blobs) -> None:
+    other_branch = blobs.tree({"app/main.py": "def read_file(path):\n    pass\n"})
+    main = blobs.tree({"app/main.py": "import os\n\ndef get_file(path):\n    return open(path)\n"})
+
+    with index.at(main, blobs.get_blobs):
+        update = threading.Thread(target=index.update, args=(other_branch, blobs.get_blobs))
+        update.start()
+        update.join(timeout=0.1)
+
+        assert update.is_alive()
+        assert index.candidates("get_file") == ["app/main.py"]
+
+    update.join()
+    assert index.candidates("get_file") == []
+
+
+def test_for_repository_drops_least_recently_used_repositories(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(BlobIndex, "_indexes", OrderedDict())
+    monkeypatch.setattr(BlobIndex, "max_repositories", 2)
+
+    first = TrigramIndex.for_repository("owner/first")
+    TrigramIndex.for_repository("owner/second")
+    assert TrigramIndex.for_repository("owner/first") is first
+
+    TrigramIndex.for_repository("owner/third")
+
+    assert list(BlobIndex._indexes) == ["owner/first", "owner/third"]
+    assert TrigramIndex.for_repository("owner/first") is first
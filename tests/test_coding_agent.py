@@ -1,9 +1,11 @@
 import pytest
+from tree_sitter_languages import get_parser
 from unittest.mock import create_autospec
-from acedev.agent.coding_agent import CodingAgent, CodingAgentException
+from acedev.agent.coding_agent import CodingAgent, CodingAgentException, EditFormat
 from acedev.service.model import File, AssistantMessage
-from acedev.tools.code_editor import CodeEditor, CodeEditorException
+from acedev.tools.code_editor import CodeEditor, CodeEditorException, DiffResult
 from acedev.service.openai_service import OpenAIService
+from acedev.tools.syntax_validator import SyntaxValidator
 
 
 @pytest.fixture
@@ -43,8 +45,8 @@ def test_edit_file_happy_path(
     openai_service_mock.invoke.return_value = AssistantMessage(
         content="```diff\n+ print('Goodbye, World!')\n```"
     )
-    code_editor_mock.apply_diff.return_value = File(
-        path="test_file.py", content="print('Goodbye, World!')"
+    code_editor_mock.apply_diff_partially.return_value = DiffResult(
+        file=File(path="test_file.py", content="print('Goodbye, World!')")
     )
 
     edited_file = coding_agent.edit_file(
@@ -53,7 +55,7 @@ def test_edit_file_happy_path(
 
     assert edited_file.content == "print('Goodbye, World!')"
     openai_service_mock.invoke.assert_called_once()
-    code_editor_mock.apply_diff.assert_called_once_with(
+    code_editor_mock.apply_diff_partially.assert_called_once_with(
         "\n+ print('Goodbye, World!')\n", file_mock
     )
 
@@ -91,10 +93,219 @@ def test_edit_file_code_editor_exception(
     openai_service_mock.invoke.return_value = AssistantMessage(
         content="```diff\n+ print('Goodbye, World!')\n```"
     )
-    code_editor_mock.apply_diff.side_effect = CodeEditorException("Test Exception")
+    code_editor_mock.apply_diff_partially.side_effect = CodeEditorException("Test Exception")
 
     with pytest.raises(CodingAgentException):
         coding_agent.edit_file("Change greeting to 'Goodbye, World!'", file_mock)
 
     assert openai_service_mock.invoke.call_count == coding_agent.max_retries
-    assert code_editor_mock.apply_diff.call_count == coding_agent.max_retries
+    assert code_editor_mock.apply_diff_partially.call_count == coding_agent.max_retries
+
+
+def test_edit_file_retries_only_failed_hunks(
+    coding_agent: CodingAgent,
+    openai_service_mock: OpenAIService,
+    code_editor_mock: CodeEditor,
+    file_mock: File,
+) -> None:
+    partially_edited_file = File(path="test_file.py", content="print('Hello!')\nprint('Bye!')")
+    edited_file = File(path="test_file.py", content="print('Goodbye!')\nprint('Bye!')")
+    openai_service_mock.invoke.return_value = AssistantMessage(content="```diff\n@@ ... @@\n```")
+    code_editor_mock.apply_diff_partially.side_effect = [
+        DiffResult(file=partially_edited_file, failed_hunks=["@@ ... @@\n-print('Hello!')\n+print('Goodbye!')\n"]),
+        DiffResult(file=edited_file),
+    ]
+
+    assert coding_agent.edit_file("Say goodbye", file_mock) == edited_file
+
+    code_editor_mock.apply_diff_partially.assert_called_with("\n@@ ... @@\n", partially_edited_file)
+    retry_messages = openai_service_mock.invoke.call_args_list[1].args[0]
+    assert len(retry_messages) == 2
+    assert "1 | print('Hello!')" in retry_messages[1].content
+    assert "-print('Hello!')" in retry_messages[1].content
+
+
+def test_edit_file_retry_explains_ambiguous_hunks(
+    coding_agent: CodingAgent,
+    openai_service_mock: OpenAIService,
+    code_editor_mock: CodeEditor,
+    file_mock: File,
+) -> None:
+    hunk = "@@ ... @@\n-print('Hello, World!')\n+print('Goodbye, World!')\n"
+    reason = "Hunk matches 2 places (lines 1, 3), include more context lines to make it unique"
+    edited_file = File(path="test_file.py", content="print('Goodbye, World!')")
+    openai_service_mock.invoke.return_value = AssistantMessage(content="```diff\n@@ ... @@\n```")
+    code_editor_mock.apply_diff_partially.side_effect = [
+        DiffResult(file=file_mock, failed_hunks=[hunk], failure_reasons={hunk: reason}),
+        DiffResult(file=edited_file),
+    ]
+
+    assert coding_agent.edit_file("Say goodbye", file_mock) == edited_file
+
+    retry_message = openai_service_mock.invoke.call_args_list[1].args[0][1]
+    assert f"{reason}." in retry_message.content
+
+
+def test_edit_file_checks_syntax_against_the_original_file(
+    coding_agent: CodingAgent,
+    openai_service_mock: OpenAIService,
+    code_editor_mock: CodeEditor,
+) -> None:
+    coding_agent.syntax_validator = SyntaxValidator(get_parser("python"), [".py"])
+    file = File(path="test_file.py", content="x = [\n    1,\n]\ny = 1\n")
+    # The first hunk deletes the closing bracket, the second one fails
+    partially_edited_file = File(path="test_file.py", content="x = [\n    1,\n\ny = 1\n")
+    invalid_file = File(path="test_file.py", content="x = [\n    1,\n\ny = 2\n")
+    valid_file = File(path="test_file.py", content="x = [\n    1,\n]\ny = 2\n")
+    openai_service_mock.invoke.return_value = AssistantMessage(content="```diff\ndiff\n```")
+    code_editor_mock.apply_diff_partially.side_effect = [
+        DiffResult(file=partially_edited_file, failed_hunks=["@@ ... @@\n-y = 1\n+y = 2\n"]),
+        DiffResult(file=invalid_file),
+        DiffResult(file=valid_file),
+    ]
+
+    assert coding_agent.edit_file("Set y to 2", file) == valid_file
+
+    retry_message = openai_service_mock.invoke.call_args_list[2].args[0][-1]
+    assert "syntax errors" in retry_message.content
+
+
+def test_edit_file_uses_first_candidate_that_applies(
+    coding_agent: CodingAgent,
+    openai_service_mock: OpenAIService,
+    code_editor_mock: CodeEditor,
+    file_mock: File,
+) -> None:
+    coding_agent.candidates = 3
+    openai_service_mock.invoke_candidates.return_value = [
+        AssistantMessage(content="No diff found."),
+        AssistantMessage(content="```diff\nfailed\n```"),
+        AssistantMessage(content="```diff\napplied\n```"),
+    ]
+    edited_file = File(path="test_file.py", content="print('Goodbye, World!')")
+    code_editor_mock.apply_diff_partially.side_effect = [
+        DiffResult(file=file_mock, failed_hunks=["failed"]),
+        DiffResult(file=edited_file),
+    ]
+
+    assert coding_agent.edit_file("Say goodbye", file_mock) == edited_file
+
+    openai_service_mock.invoke.assert_not_called()
+    openai_service_mock.invoke_candidates.assert_called_once()
+    assert openai_service_mock.invoke_candidates.call_args.kwargs["n"] == 3
+
+
+def test_edit_file_prefers_candidate_with_valid_syntax(
+    coding_agent: CodingAgent,
+    openai_service_mock: OpenAIService,
+    code_editor_mock: CodeEditor,
+    file_mock: File,
+) -> None:
+    coding_agent.candidates = 2
+    coding_agent.syntax_validator = SyntaxValidator(get_parser("python"), [".py"])
+    openai_service_mock.invoke_candidates.return_value = [
+        AssistantMessage(content="```diff\ninvalid\n```"),
+        AssistantMessage(content="```diff\nvalid\n```"),
+    ]
+    valid_file = File(path="test_file.py", content="print('Goodbye, World!')")
+    code_editor_mock.apply_diff_partially.side_effect = [
+        DiffResult(file=File(path="test_file.py", content="print('Goodbye, World!'")),
+        DiffResult(file=valid_file),
+    ]
+
+    assert coding_agent.edit_file("Say goodbye", file_mock) == valid_file
+
+
+def test_edit_file_prefers_candidate_accepted_by_is_valid(
+    coding_agent: CodingAgent,
+    openai_service_mock: OpenAIService,
+    code_editor_mock: CodeEditor,
+    file_mock: File,
+) -> None:
+    coding_agent.candidates = 2
+    coding_agent.is_valid = lambda file: "Goodbye" in file.content
+    openai_service_mock.invoke_candidates.return_value = [
+        AssistantMessage(content="```diff\nrejected\n```"),
+        AssistantMessage(content="```diff\naccepted\n```"),
+    ]
+    accepted_file = File(path="test_file.py", content="print('Goodbye, World!')")
+    code_editor_mock.apply_diff_partially.side_effect = [
+        DiffResult(file=File(path="test_file.py", content="print('Hi, World!')")),
+        DiffResult(file=accepted_file),
+    ]
+
+    assert coding_agent.edit_file("Say goodbye", file_mock) == accepted_file
+
+
+def test_edit_file_retries_with_every_candidate_that_has_syntax_errors(
+    coding_agent: CodingAgent,
+    openai_service_mock: OpenAIService,
+    code_editor_mock: CodeEditor,
+    file_mock: File,
+) -> None:
+    coding_agent.candidates = 3
+    coding_agent.syntax_validator = SyntaxValidator(get_parser("python"), [".py"])
+    openai_service_mock.invoke_candidates.side_effect = [
+        [
+            AssistantMessage(content="```diff\nfirst\n```"),
+            AssistantMessage(content="```diff\nfailed\n```"),
+            AssistantMessage(content="```diff\nsecond\n```"),
+        ],
+        [AssistantMessage(content="```diff\nfixed\n```")],
+    ]
+    valid_file = File(path="test_file.py", content="print('Goodbye, World!')")
+    code_editor_mock.apply_diff_partially.side_effect = [
+        DiffResult(file=File(path="test_file.py", content="print('Goodbye, World!'")),
+        DiffResult(file=file_mock, failed_hunks=["failed"]),
+        DiffResult(file=File(path="test_file.py", content="print('Goodbye, World!'))")),
+        DiffResult(file=valid_file),
+    ]
+
+    assert coding_agent.edit_file("Say goodbye", file_mock) == valid_file
+
+    retry_message = openai_service_mock.invoke_candidates.call_args.args[0][-1].content
+    assert "The diffs below apply" in retry_message
+    assert "```diff\nfirst\n```" in retry_message
+    assert "```diff\nsecond\n```" in retry_message
+    assert "failed" not in retry_message
+
+
+def test_edit_file_retries_when_edit_introduces_syntax_errors(
+    coding_agent: CodingAgent,
+    openai_service_mock: OpenAIService,
+    code_editor_mock: CodeEditor,
+    file_mock: File,
+) -> None:
+    coding_agent.syntax_validator = SyntaxValidator(get_parser("python"), [".py"])
+    openai_service_mock.invoke.return_value = AssistantMessage(content="```diff\ndiff\n```")
+    valid_file = File(path="test_file.py", content="print('Goodbye, World!')")
+    code_editor_mock.apply_diff_partially.side_effect = [
+        DiffResult(file=File(path="test_file.py", content="print('Goodbye, World!'")),
+        DiffResult(file=valid_file),
+    ]
+
+    assert coding_agent.edit_file("Say goodbye", file_mock) == valid_file
+
+    retry_message = openai_service_mock.invoke.call_args_list[1].args[0][-1]
+    assert "line 1, column 1: unexpected \"print('Goodbye, World!'\"" in retry_message.content
+
+
+def test_edit_file_with_search_replace(
+    coding_agent: CodingAgent,
+    openai_service_mock: OpenAIService,
+    file_mock: File,
+) -> None:
+    coding_agent.code_editor = CodeEditor()
+    coding_agent.edit_format = EditFormat.SEARCH_REPLACE
+    openai_service_mock.invoke.side_effect = [
+        AssistantMessage(content="<<<<<<< SEARCH\nmissing\n=======\n\n>>>>>>> REPLACE"),
+        AssistantMessage(
+            content="<<<<<<< SEARCH\nprint('Hello, World!')\n=======\nprint('Goodbye, World!')\n>>>>>>> REPLACE"
+        ),
+    ]
+
+    edited_file = coding_agent.edit_file("Change greeting to 'Goodbye, World!'", file_mock)
+
+    assert edited_file == File(path="test_file.py", content="print('Goodbye, World!')\n")
+    retry_message = openai_service_mock.invoke.call_args_list[1].args[0][-1]
+    assert "Search text not found in test_file.py" in retry_message.content
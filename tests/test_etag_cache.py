@@ -0,0 +1,172 @@
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from acedev.service.etag_cache import ETagCache, ETagCachingConnection, installation_scope
+
+URL = "/repos/octocat/hello-world/contents/file.py?ref=main"
+HEADERS = {"Authorization": "token installation-token", "Accept": "application/json"}
+ETAG = '"etag"'
+BODY = '{"content": "cHJpbnQoKQ=="}'
+
+
+@pytest.fixture
+def cache() -> ETagCache:
+    return ETagCache()
+
+
+@pytest.fixture
+def session() -> requests.Session:
+    return MagicMock(spec=requests.Session)
+
+
+@pytest.fixture
+def connection(cache: ETagCache, session: requests.Session) -> ETagCachingConnection:
+    connection_class = type(
+        "TestETagCachingConnection", (ETagCachingConnection,), {"cache": cache}
+    )
+    connection = connection_class("api.github.com")
+    connection.session = session
+    return connection
+
+
+def test_response_is_cached_and_revalidated(
+    connection: ETagCachingConnection, session: requests.Session, cache: ETagCache
+) -> None:
+    session.get.side_effect = [
+        response(200, BODY, {"ETag": ETAG, "X-RateLimit-Remaining": "4999"}),
+        response(304, "", {"ETag": ETAG, "X-RateLimit-Remaining": "4999"}),
+    ]
+
+    connection.request("GET", URL, None, HEADERS)
+    first = connection.getresponse()
+    connection.request("GET", URL, None, HEADERS)
+    second = connection.getresponse()
+
+    assert first.read() == BODY
+    assert second.status == 200
+    assert second.read() == BODY
+    assert session.get.call_args_list[0].kwargs["headers"] == HEADERS
+    assert session.get.call_args_list[1].kwargs["headers"] == {
+        **HEADERS,
+        "If-None-Match": ETAG,
+    }
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_modified_response_replaces_cached_one(
+    connection: ETagCachingConnection, session: requests.Session
+) -> None:
+    session.get.side_effect = [
+        response(200, BODY, {"ETag": ETAG}),
+        response(200, "new body", {"ETag": '"new-etag"'}),
+        response(304, "", {}),
+    ]
+
+    for _ in range(3):
+        connection.request("GET", URL, None, HEADERS)
+        result = connection.getresponse()
+
+    assert result.read() == "new body"
+    assert session.get.call_args_list[2].kwargs["headers"]["If-None-Match"] == '"new-etag"'
+
+
+def test_cache_is_scoped_by_authorization(
+    connection: ETagCachingConnection, session: requests.Session
+) -> None:
+    session.get.side_effect = [
+        response(200, BODY, {"ETag": ETAG}),
+        response(200, BODY, {"ETag": ETAG}),
+    ]
+
+    connection.request("GET", URL, None, HEADERS)
+    connection.getresponse()
+    connection.request("GET", URL, None, {**HEADERS, "Authorization": "token other"})
+    connection.getresponse()
+
+    assert "If-None-Match" not in session.get.call_args_list[1].kwargs["headers"]
+
+
+def test_cache_is_scoped_by_installation(
+    connection: ETagCachingConnection, session: requests.Session
+) -> None:
+    session.get.side_effect = [
+        response(200, BODY, {"ETag": ETAG}),
+        response(304, "", {}),
+        response(200, BODY, {"ETag": ETAG}),
+    ]
+
+    with installation_scope(1):
+        connection.request("GET", URL, None, HEADERS)
+        connection.getresponse()
+        # The installation token was refreshed
+        connection.request("GET", URL, None, {**HEADERS, "Authorization": "token refreshed"})
+        connection.getresponse()
+    with installation_scope(2):
+        connection.request("GET", URL, None, HEADERS)
+        connection.getresponse()
+
+    assert session.get.call_args_list[1].kwargs["headers"]["If-None-Match"] == ETAG
+    assert "If-None-Match" not in session.get.call_args_list[2].kwargs["headers"]
+
+
+def test_writes_are_not_cached(
+    connection: ETagCachingConnection, session: requests.Session, cache: ETagCache
+) -> None:
+    session.put.return_value = response(200, BODY, {"ETag": ETAG})
+
+    connection.request("PUT", URL, "{}", HEADERS)
+    connection.getresponse()
+
+    assert cache.get(cache.key(URL, HEADERS)) is None
+
+
+def test_least_recently_used_entries_are_evicted(
+    connection: ETagCachingConnection, session: requests.Session, cache: ETagCache
+) -> None:
+    cache.max_entries = 1
+    session.get.side_effect = [
+        response(200, BODY, {"ETag": ETAG}),
+        response(200, BODY, {"ETag": ETAG}),
+    ]
+
+    connection.request("GET", URL, None, HEADERS)
+    connection.getresponse()
+    connection.request("GET", URL + "&page=2", None, HEADERS)
+    connection.getresponse()
+
+    assert cache.get(cache.key(URL, HEADERS)) is None
+    assert cache.get(cache.key(URL + "&page=2", HEADERS)) is not None
+
+
+def test_entries_are_evicted_when_cache_is_full(
+    connection: ETagCachingConnection, session: requests.Session, cache: ETagCache
+) -> None:
+    cache.max_size = 2 * len(BODY) + 30
+    session.get.side_effect = [
+        response(200, BODY, {"ETag": ETAG}),
+        response(200, BODY, {"ETag": ETAG}),
+        response(200, BODY, {"ETag": ETAG}),
+        response(200, "x" * cache.max_size, {"ETag": ETAG}),
+    ]
+
+    for page in range(3):
+        connection.request("GET", f"{URL}&page={page}", None, HEADERS)
+        connection.getresponse()
+    connection.request("GET", URL, None, HEADERS)
+    connection.getresponse()
+
+    assert cache.get(cache.key(f"{URL}&page=0", HEADERS)) is None
+    assert cache.get(cache.key(f"{URL}&page=1", HEADERS)) is not None
+    assert cache.get(cache.key(f"{URL}&page=2", HEADERS)) is not None
+    assert cache.get(cache.key(URL, HEADERS)) is None
+
+
+def response(status: int, text: str, headers: dict[str, str]) -> requests.Response:
+    mock = MagicMock(spec=requests.Response)
+    mock.status_code = status
+    mock.text = text
+    mock.headers = CaseInsensitiveDict(headers)
+    return mock
@@ -1,6 +1,7 @@
 from unittest.mock import create_autospec
 
 import pytest
+from github import GithubException
 
 from acedev.agent import AgentRunner
 from acedev.agent.github_agent import (
@@ -12,6 +13,7 @@ from acedev.agent.prompts import (
     issue_assigned_prompt,
 )
 from acedev.service.github_service import GitHubService
+from acedev.service.git_repository import GitRepository
 from acedev.service.model import (
     PullRequest,
     FileChange,
@@ -44,6 +46,7 @@ ISSUE = Issue(
         IssueComment(user=ACEBOTS_APP_USERNAME, body=COMMENT_BODY_1),
     ],
 )
+RELEVANT_CODE = "Files:\n- app.py"
 ROOT_COMMENT_ID = 1
 DIFF_HUNK = "diff_hunk"
 PULL_REQUEST = PullRequest(
@@ -57,7 +60,11 @@ PULL_REQUEST = PullRequest(
 
 @pytest.fixture
 def tool_provider() -> ToolProvider:
-    return create_autospec(ToolProvider)
+    mock = create_autospec(ToolProvider)
+    mock.git_repository = create_autospec(GitRepository)
+    mock.git_repository.local_reads = True
+    mock.find_relevant_code.return_value = RELEVANT_CODE
+    return mock
 
 
 @pytest.fixture
@@ -151,7 +158,9 @@ def test_handle_issue_comment(
 
     agent_runner.run.assert_called_once_with(
         [
-            SystemMessage(content=issue_assigned_prompt(issue=ISSUE)),
+            SystemMessage(
+                content=issue_assigned_prompt(issue=ISSUE, relevant_code=RELEVANT_CODE)
+            ),
             UserMessage(name=USERNAME, content=COMMENT_BODY),
             AssistantMessage(content=COMMENT_BODY_1),
         ],
@@ -199,6 +208,7 @@ def test_handle_issue_assignment(
     github_agent: GitHubAgent,
     github_service: GitHubService,
     agent_runner: AgentRunner,
+    tool_provider: ToolProvider,
 ) -> None:
     github_service.get_issue.return_value = ISSUE
     agent_runner.run.return_value = [
@@ -208,9 +218,13 @@ def test_handle_issue_assignment(
 
     github_agent.handle_issue_assignment(issue_number=ISSUE_NUMBER)
 
+    tool_provider.find_relevant_code.assert_called_once_with(query="title\nbody")
+
     agent_runner.run.assert_called_once_with(
         [
-            SystemMessage(content=issue_assigned_prompt(issue=ISSUE)),
+            SystemMessage(
+                content=issue_assigned_prompt(issue=ISSUE, relevant_code=RELEVANT_CODE)
+            ),
             UserMessage(name=USERNAME, content=COMMENT_BODY),
             AssistantMessage(content=COMMENT_BODY_1),
         ],
@@ -220,3 +234,23 @@ def test_handle_issue_assignment(
     github_service.create_issue_comment.assert_called_once_with(
         issue_number=ISSUE_NUMBER, body=ASSISTANT_MESSAGE.content
     )
+
+
+def test_handle_issue_assignment_without_relevant_code(
+    github_agent: GitHubAgent,
+    github_service: GitHubService,
+    agent_runner: AgentRunner,
+    tool_provider: ToolProvider,
+) -> None:
+    github_service.get_issue.return_value = ISSUE
+    agent_runner.run.return_value = []
+    tool_provider.find_relevant_code.side_effect = GithubException(409, "Git Repository is empty.")
+
+    github_agent.handle_issue_assignment(issue_number=ISSUE_NUMBER)
+
+    tool_provider.git_repository.local_reads = False
+    github_agent.handle_issue_assignment(issue_number=ISSUE_NUMBER)
+
+    tool_provider.find_relevant_code.assert_called_once()
+    system_message = SystemMessage(content=issue_assigned_prompt(issue=ISSUE))
+    assert [call.args[0][0] for call in agent_runner.run.call_args_list] == [system_message] * 2
@@ -1,6 +1,7 @@
 from unittest.mock import create_autospec
 
 from acedev.agent import AgentRunner
+from acedev.agent.coding_agent import EditFormat
 from acedev.agent.github_agent import GitHubAgent
 from acedev.agent.github_agent_factory import GitHubAgentFactory
 from acedev.service.github_service import GitHubService
@@ -20,3 +21,17 @@ def test_create() -> None:
         ),
         GitHubAgent,
     )
+
+
+def test_create_uses_diff_edit_format_by_default() -> None:
+    mock_git_repo = create_autospec(GitRepository)
+    mock_git_repo.language = "python"
+
+    agent = GitHubAgentFactory.create(
+        git_repo=mock_git_repo,
+        github_service=create_autospec(spec=GitHubService),
+        agent_runner=create_autospec(spec=AgentRunner),
+        openai_service=create_autospec(spec=OpenAIService),
+    )
+
+    assert agent.tool_provider.coding_agent.edit_format == EditFormat.DIFF
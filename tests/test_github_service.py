@@ -21,6 +21,13 @@ BODY = "PR Body"
 BRANCH = "feature-branch"
 TITLE = "PR Title"
 URL = "url"
+PULL_REQUEST = PullRequest(
+    title=TITLE,
+    body=BODY,
+    head_ref=BRANCH,
+    url=URL,
+    files=[FileChange(status="status", filename="filename", diff="diff")],
+)
 
 
 @pytest.fixture
@@ -59,6 +66,50 @@ def test_create_pull_request_branch_exists(
         github_service.create_pull_request(TITLE, BODY, BRANCH)
 
 
+def test_create_pull_request_looks_up_branch_by_head(
+    github_service: GitHubService, github_repo: Repository
+) -> None:
+    github_repo.owner.login = "octocat"
+    github_repo.get_pulls.return_value = []
+    github_repo.create_pull.return_value = mock_github_pull_request(PULL_REQUEST)
+
+    github_service.create_pull_request(TITLE, BODY, BRANCH)
+
+    github_repo.get_pulls.assert_called_once_with(
+        state="open", head=f"octocat:{BRANCH}"
+    )
+
+
+def test_create_pull_request_twice_for_branch_uses_index(
+    github_service: GitHubService, github_repo: Repository
+) -> None:
+    github_repo.get_pulls.return_value = []
+    github_repo.create_pull.return_value = mock_github_pull_request(PULL_REQUEST)
+    github_repo.create_pull.return_value.state = "open"
+    github_service.create_pull_request(TITLE, BODY, BRANCH)
+
+    with pytest.raises(GitHubServiceException):
+        github_service.create_pull_request(TITLE, BODY, BRANCH)
+
+    github_repo.get_pulls.assert_called_once()
+    github_repo.create_pull.assert_called_once()
+
+
+def test_create_pull_request_after_pull_request_is_closed(
+    github_service: GitHubService, github_repo: Repository
+) -> None:
+    github_repo.get_pulls.return_value = []
+    github_repo.create_pull.return_value = mock_github_pull_request(PULL_REQUEST)
+    github_repo.create_pull.return_value.state = "open"
+    github_service.create_pull_request(TITLE, BODY, BRANCH)
+
+    github_repo.create_pull.return_value.state = "closed"
+    github_service.create_pull_request(TITLE, BODY, BRANCH)
+
+    assert github_repo.get_pulls.call_count == 2
+    assert github_repo.create_pull.call_count == 2
+
+
 def test_get_pull_request_success(
     github_service: GitHubService, github_repo: Repository
 ) -> None:
@@ -86,6 +137,37 @@ def test_get_pull_request_not_found(
         github_service.get_pull_request(1)
 
 
+def test_get_pull_request_file_diff(
+    github_service: GitHubService, github_repo: Repository
+) -> None:
+    github_repo.get_pulls.return_value = [MagicMock(number=1)]
+    github_repo.get_pull.return_value = mock_github_pull_request(PULL_REQUEST)
+
+    result = github_service.get_pull_request_file_diff(BRANCH, "filename")
+
+    assert result == "diff"
+    github_repo.get_pull.assert_called_once_with(number=1)
+
+
+def test_get_pull_request_file_diff_file_not_changed(
+    github_service: GitHubService, github_repo: Repository
+) -> None:
+    github_repo.get_pulls.return_value = [MagicMock(number=1)]
+    github_repo.get_pull.return_value = mock_github_pull_request(PULL_REQUEST)
+
+    with pytest.raises(GitHubServiceException):
+        github_service.get_pull_request_file_diff(BRANCH, "other_filename")
+
+
+def test_get_pull_request_file_diff_pull_request_not_found(
+    github_service: GitHubService, github_repo: Repository
+) -> None:
+    github_repo.get_pulls.return_value = []
+
+    with pytest.raises(GitHubServiceException):
+        github_service.get_pull_request_file_diff(BRANCH, "filename")
+
+
 def test_get_pull_request_review_thread_for_root_comment(
     github_service: GitHubService, github_repo: Repository
 ) -> None:
@@ -257,6 +339,54 @@ def test_create_issue_comment_success(
     issue.create_comment.assert_called_once_with("comment")
 
 
+def test_issue_is_fetched_once_per_service(
+    github_service: GitHubService, github_repo: Repository
+) -> None:
+    issue = mock_github_issue(
+        Issue(id=1, number=1, title="title", body="body", comments=[])
+    )
+    issue.pull_request = None
+    github_repo.get_issue.return_value = issue
+
+    github_service.get_issue(1)
+    github_service.issue_is_pull_request(1)
+    github_service.create_issue_comment(1, "comment")
+    github_service.create_issue_comment(1, "another comment")
+
+    github_repo.get_issue.assert_called_once_with(number=1)
+    assert issue.create_comment.call_count == 2
+
+
+def test_pull_request_is_fetched_once_per_service(
+    github_service: GitHubService, github_repo: Repository
+) -> None:
+    root_comment = review_comment(1)
+    pull_request = mock_github_pull_request(
+        PullRequest(
+            title=TITLE,
+            body=BODY,
+            head_ref=BRANCH,
+            url=URL,
+            files=[FileChange(status="status", filename="filename", diff="diff")],
+        )
+    )
+    pull_request.get_review_comment.return_value = mock_github_comment(
+        comment=root_comment, in_reply_to_id=None
+    )
+    pull_request.get_review_comments.return_value = []
+    github_repo.get_pull.return_value = pull_request
+
+    github_service.get_pull_request(1)
+    github_service.get_pull_request_review_thread(1, 1)
+    github_service.get_pull_request_review_thread(1, 1)
+    github_service.reply_in_pull_request_thread(
+        pull_request_number=1, root_comment_id=1, body="reply"
+    )
+
+    github_repo.get_pull.assert_called_once_with(number=1)
+    pull_request.get_review_comment.assert_called_once_with(1)
+
+
 def review_comment(_id: int) -> PullRequestReviewComment:
     return PullRequestReviewComment(
         id=_id, user="user", body="body", diff_hunk="diff_hunk"
@@ -1,12 +1,18 @@
+from typing import Optional
+
 import pytest
 from unittest.mock import MagicMock, create_autospec
 
+from github import UnknownObjectException
 from github.Branch import Branch
 from github.ContentFile import ContentFile
+from github.GitBlob import GitBlob
+from github.GitTree import GitTree
+from github.GitTreeElement import GitTreeElement
 from github.Repository import Repository
 
 from acedev.service.git_repository import GitRepository, GitRepositoryException
-from acedev.service.model import File
+from acedev.service.model import File, TreeEntry
 
 
 @pytest.fixture
@@ -101,6 +107,39 @@ def test_get_file(gitrepo: GitRepository, github_repo: Repository) -> None:
     assert result == file
 
 
+def test_get_tree(gitrepo: GitRepository, github_repo: Repository) -> None:
+    tree = create_autospec(GitTree)
+    tree.raw_data = {"truncated": False}
+    tree.tree = [
+        mock_tree_element("app", "tree", None, "t"),
+        mock_tree_element("app/main.py", "blob", 7, "b"),
+    ]
+    github_repo.get_git_tree.return_value = tree
+
+    entries = gitrepo.get_tree()
+
+    github_repo.get_git_tree.assert_called_with("main", recursive=True)
+    assert entries == [TreeEntry(path="app/main.py", type="blob", size=7, sha="b")]
+
+
+def test_get_tree_branch_does_not_exist(
+    gitrepo: GitRepository, github_repo: Repository
+) -> None:
+    github_repo.get_git_tree.side_effect = UnknownObjectException(404, None, None)
+
+    with pytest.raises(GitRepositoryException):
+        gitrepo.get_tree("missing")
+
+
+def test_get_blobs(gitrepo: GitRepository, github_repo: Repository) -> None:
+    blob = create_autospec(GitBlob)
+    blob.encoding = "base64"
+    blob.content = "Y29udGVudA=="
+    github_repo.get_git_blob.side_effect = [blob, UnknownObjectException(404, None, None)]
+
+    assert gitrepo.get_blobs(["b", "b", "missing"]) == {"b": b"content", "missing": None}
+
+
 def test_get_file_custom_branch(
     gitrepo: GitRepository, github_repo: Repository
 ) -> None:
@@ -188,6 +227,15 @@ def mock_file(file: File) -> ContentFile:
     return mock
 
 
+def mock_tree_element(path: str, type: str, size: Optional[int], sha: str) -> GitTreeElement:
+    mock = create_autospec(GitTreeElement)
+    mock.path = path
+    mock.type = type
+    mock.size = size
+    mock.sha = sha
+    return mock
+
+
 def mock_dir(path: str) -> ContentFile:
     mock = create_autospec(ContentFile)
     mock.type = "dir"
@@ -0,0 +1,74 @@
+import pytest
+from tree_sitter_languages import get_language
+
+from acedev.tools.import_graph import ImportGraph, module_names
+from tests.conftest import Blobs
+
+FILES = {
+    "src/app/__init__.py": "",
+    "src/app/db.py": "import os\nfrom .models import User\n",
+    "src/app/models.py": "from app.db import connect\nimport app.util.text as text\n",
+    "src/app/util/__init__.py": "from . import text\n",
+    "src/app/util/text.py": "from ..db import connect\nfrom .. import models\n",
+    "scripts/run.py": "import helper\nfrom app import db\n",
+    "scripts/helper.py": "",
+    "README.md": "import app\n",
+}
+
+
+@pytest.fixture
+def graph(blobs: Blobs) -> ImportGraph:
+    graph = ImportGraph(language=get_language("python"))
+    blobs.update(graph, FILES)
+    return graph
+
+
+def test_module_names() -> None:
+    packages = {"src/app", "src/app/util"}
+
+    assert module_names("src/app/util/text.py", packages) == ["app.util.text", "src.app.util.text"]
+    assert module_names("src/app/__init__.py", packages) == ["app", "src.app"]
+    assert module_names("scripts/run.py", packages) == ["run", "scripts.run"]
+    assert module_names("setup.py", packages) == ["setup"]
+
+
+def test_dependencies(graph: ImportGraph) -> None:
+    assert graph.dependencies("src/app/db.py") == ["src/app/models.py"]
+    assert graph.dependencies("src/app/models.py") == ["src/app/db.py", "src/app/util/text.py"]
+    assert graph.dependencies("src/app/util/text.py") == ["src/app/db.py", "src/app/models.py"]
+    assert graph.dependencies("scripts/run.py") == ["scripts/helper.py", "src/app/db.py"]
+    assert graph.dependencies("README.md") == []
+    assert "README.md" not in graph
+
+
+def test_importers(graph: ImportGraph) -> None:
+    assert graph.importers("src/app/db.py") == [
+        "scripts/run.py",
+        "src/app/models.py",
+        "src/app/util/text.py",
+    ]
+    assert graph.importer_count("src/app/db.py") == 3
+    assert graph.importers("scripts/run.py") == []
+
+
+def test_update_parses_changed_files_only(graph: ImportGraph, blobs: Blobs) -> None:
+    blobs.reads.clear()
+
+    blobs.update(graph, {**FILES, "scripts/run.py": "import helper\n"})
+
+    assert blobs.reads == ["sha-import helper\n"]
+    assert graph.dependencies("scripts/run.py") == ["scripts/helper.py"]
+    assert graph.importers("src/app/db.py") == ["src/app/models.py", "src/app/util/text.py"]
+
+
+def test_update_resolves_again_when_files_are_added(graph: ImportGraph, blobs: Blobs) -> None:
+    files = {**FILES, "src/app/db/__init__.py": "", "src/app/db/connect.py": ""}
+    del files["src/app/db.py"]
+
+    blobs.update(graph, files)
+
+    assert graph.dependencies("src/app/models.py") == [
+        "src/app/db/connect.py",
+        "src/app/util/text.py",
+    ]
+    assert graph.importers("src/app/db.py") == []
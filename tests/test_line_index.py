@@ -0,0 +1,28 @@
+from acedev.utils.line_index import count_lines, line_offsets, numbered_lines, split_lines
+
+CONTENT = "line 1\nline 2\nline 3\n"
+
+
+def test_line_offsets() -> None:
+    assert list(line_offsets(CONTENT)) == [0, 7, 14]
+    assert list(line_offsets("line 1\nline 2")) == [0, 7]
+
+
+def test_count_lines() -> None:
+    assert count_lines(CONTENT) == 3
+    assert count_lines("") == 0
+    assert count_lines(CONTENT, line_offsets(CONTENT)) == 3
+
+
+def test_numbered_lines() -> None:
+    assert numbered_lines(CONTENT, 2, 3) == "2 | line 2\n3 | line 3"
+    assert numbered_lines(CONTENT, 3, 10) == "3 | line 3"
+    assert numbered_lines(CONTENT, 4, 5) == ""
+    assert numbered_lines(CONTENT, 1, 1, line_offsets(CONTENT)) == "1 | line 1"
+
+
+def test_numbered_lines_split_on_newlines_only() -> None:
+    content = "a\nb\x0cc\nd\n"
+
+    assert split_lines(content) == ["a", "b\x0cc", "d"]
+    assert numbered_lines(content, 2, 3) == "2 | b\x0cc\n3 | d"
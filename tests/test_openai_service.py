@@ -0,0 +1,145 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from litellm.types.utils import Usage
+
+from acedev.service.model import AssistantMessage, SystemMessage, UserMessage
+from acedev.service.openai_service import OpenAIService
+from acedev.service.response_cache import ResponseCache
+
+MESSAGES = [UserMessage(content="hello")]
+
+
+def echo_tool(content: str) -> str:
+    """
+    Echo the content.
+
+    Parameters
+    ----------
+    content : str
+        Content to echo.
+    """
+    return content
+
+
+@pytest.fixture
+def completion(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    mock = MagicMock()
+    mock.return_value.choices[0].message.content = "hi"
+    mock.return_value.choices[0].message.get.return_value = None
+    mock.return_value.usage = Usage(
+        prompt_tokens=2000,
+        completion_tokens=10,
+        total_tokens=2010,
+        prompt_tokens_details={"cached_tokens": 1024},
+    )
+    monkeypatch.setattr("acedev.service.openai_service.completion", mock)
+    return mock
+
+
+@pytest.fixture
+def openai_service(tmp_path: Path) -> OpenAIService:
+    return OpenAIService(response_cache=ResponseCache(str(tmp_path / "responses.db")))
+
+
+def test_invoke_with_tools_is_cached(
+    openai_service: OpenAIService, completion: MagicMock
+) -> None:
+    tools = {"echo_tool": echo_tool}
+
+    first = openai_service.invoke_with_tools(MESSAGES, tools)
+    second = openai_service.invoke_with_tools(MESSAGES, tools)
+
+    assert first == second == AssistantMessage(content="hi")
+    completion.assert_called_once()
+    assert openai_service.response_cache.stats.hits == 1
+
+
+def test_invoke_is_not_cached_with_non_zero_temperature(
+    openai_service: OpenAIService, completion: MagicMock
+) -> None:
+    openai_service.invoke(MESSAGES, temperature=0.5)
+    openai_service.invoke(MESSAGES, temperature=0.5)
+
+    assert completion.call_count == 2
+
+
+def test_invoke_without_cache(completion: MagicMock) -> None:
+    openai_service = OpenAIService()
+
+    openai_service.invoke(MESSAGES)
+    openai_service.invoke(MESSAGES)
+
+    assert completion.call_count == 2
+
+
+def test_cached_tokens_are_reported(completion: MagicMock) -> None:
+    openai_service = OpenAIService()
+
+    openai_service.invoke(MESSAGES)
+    openai_service.invoke(MESSAGES)
+
+    assert openai_service.prompt_cache_stats.prompt_tokens == 4000
+    assert openai_service.prompt_cache_stats.cached_tokens == 2048
+
+
+def test_system_prompt_is_marked_cacheable_for_anthropic(completion: MagicMock) -> None:
+    openai_service = OpenAIService()
+
+    openai_service.invoke(
+        [SystemMessage(content="system"), *MESSAGES], model="claude-3-5-sonnet-20240620"
+    )
+
+    messages = completion.call_args.kwargs["messages"]
+    assert messages[0]["content"] == [
+        {"type": "text", "text": "system", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert messages[1] == {"role": "user", "content": "hello"}
+
+
+def test_system_prompt_is_unchanged_for_openai(completion: MagicMock) -> None:
+    openai_service = OpenAIService()
+
+    openai_service.invoke([SystemMessage(content="system"), *MESSAGES], model="gpt-4o")
+
+    messages = completion.call_args.kwargs["messages"]
+    assert messages[0] == {"role": "system", "content": "system"}
+
+
+def test_invoke_candidates(completion: MagicMock) -> None:
+    first, second = MagicMock(), MagicMock()
+    first.message.content = "first"
+    second.message.content = "second"
+    completion.return_value.choices = [first, second]
+    openai_service = OpenAIService()
+
+    candidates = openai_service.invoke_candidates(MESSAGES, n=2)
+
+    assert candidates == [AssistantMessage(content="first"), AssistantMessage(content="second")]
+    assert completion.call_args.kwargs["n"] == 2
+
+
+def test_convert_update_symbols_tool() -> None:
+    def update_symbols(symbols: list[str], definitions: list[str], path: str, branch: str) -> str:
+        """
+        Update symbols.
+
+        Parameters
+        ----------
+        symbols : list
+            Names of the symbols.
+        definitions : list
+            New definitions of the symbols.
+        path : str
+            Path to the file.
+        branch : str
+            Name of the remote branch.
+        """
+        return ""
+
+    schema = OpenAIService._convert_tools("update_symbols", update_symbols)
+
+    assert schema["parameters"]["properties"]["symbols"]["items"] == {"type": "string"}
+    assert schema["parameters"]["properties"]["definitions"]["items"] == {"type": "string"}
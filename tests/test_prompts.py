@@ -1,7 +1,7 @@
 import pytest
 from jinja2 import UndefinedError
 
-from acedev.utils.prompts import prompt, render
+from acedev.utils.prompts import compile_template, prompt, render
 
 
 def test_clean() -> None:
@@ -166,3 +166,23 @@ def test_no_prompt() -> None:
         @prompt
         def test_only_code(variable: str) -> str:
             return variable
+
+
+def test_prompt_is_compiled_once() -> None:
+    @prompt
+    def test_tpl(variable: str) -> None:
+        """{{variable}} test"""
+
+    compiled = test_tpl.compiled
+
+    assert test_tpl("one") == "one test"
+    assert test_tpl("two") == "two test"
+    assert test_tpl.compiled is compiled
+
+
+def test_render_reuses_compiled_template() -> None:
+    template = "Cached {{ name }}!"
+
+    assert render(template, name="once") == "Cached once!"
+    assert render(template, name="twice") == "Cached twice!"
+    assert compile_template(template) is compile_template(template)
@@ -0,0 +1,163 @@
+from unittest.mock import MagicMock, create_autospec
+
+import pytest
+from github import Github, RateLimitExceededException
+from github.Requester import Requester
+
+from acedev.service.rate_limit_scheduler import (
+    RateLimitBudget,
+    RateLimitScheduler,
+    RateLimitSchedulerException,
+    RequestPriority,
+)
+
+INSTALLATION_ID = 1
+NOW = 1000.0
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = NOW
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock: FakeClock) -> RateLimitScheduler:
+    return RateLimitScheduler(bulk_reserve=0.1, clock=clock.time, sleep=clock.sleep)
+
+
+@pytest.fixture
+def requester() -> Requester:
+    mock = create_autospec(Requester)
+    mock.rate_limiting = (-1, -1)
+    mock.rate_limiting_resettime = 0
+    return mock
+
+
+@pytest.fixture
+def github(requester: Requester) -> Github:
+    mock = create_autospec(Github)
+    mock._Github__requester = requester
+    return mock
+
+
+def respond(requester: Requester, remaining: int, limit: int, reset_at: float) -> None:
+    """Set the rate limit like the requester does when it reads the response headers."""
+    requester.rate_limiting = (remaining, limit)
+    requester.rate_limiting_resettime = reset_at
+
+
+def test_acquire_without_budget_does_not_wait(
+    scheduler: RateLimitScheduler, clock: FakeClock
+) -> None:
+    scheduler.acquire(INSTALLATION_ID, RequestPriority.BULK)
+
+    assert clock.sleeps == []
+
+
+def test_bulk_request_waits_when_reserve_is_reached(
+    scheduler: RateLimitScheduler, clock: FakeClock
+) -> None:
+    scheduler.update(INSTALLATION_ID, remaining=10, limit=100, reset_at=NOW + 30)
+
+    scheduler.acquire(INSTALLATION_ID, RequestPriority.BULK)
+
+    assert clock.sleeps == [30]
+    assert scheduler.budgets()[INSTALLATION_ID].remaining == 99
+
+
+def test_interactive_request_uses_reserve(
+    scheduler: RateLimitScheduler, clock: FakeClock
+) -> None:
+    scheduler.update(INSTALLATION_ID, remaining=10, limit=100, reset_at=NOW + 30)
+
+    scheduler.acquire(INSTALLATION_ID, RequestPriority.INTERACTIVE)
+
+    assert clock.sleeps == []
+    assert scheduler.budgets()[INSTALLATION_ID].remaining == 9
+
+
+def test_interactive_request_waits_when_budget_is_exhausted(
+    scheduler: RateLimitScheduler, clock: FakeClock
+) -> None:
+    scheduler.update(INSTALLATION_ID, remaining=0, limit=100, reset_at=NOW + 30)
+
+    scheduler.acquire(INSTALLATION_ID, RequestPriority.INTERACTIVE)
+
+    assert clock.sleeps == [30]
+
+
+def test_acquire_fails_when_wait_is_too_long(scheduler: RateLimitScheduler) -> None:
+    scheduler.update(
+        INSTALLATION_ID, remaining=0, limit=100, reset_at=NOW + scheduler.max_wait + 1
+    )
+
+    with pytest.raises(RateLimitSchedulerException):
+        scheduler.acquire(INSTALLATION_ID, RequestPriority.INTERACTIVE)
+
+
+def test_secondary_rate_limit_blocks_all_requests(
+    scheduler: RateLimitScheduler, clock: FakeClock
+) -> None:
+    scheduler.block(INSTALLATION_ID, retry_after=20)
+
+    scheduler.acquire(INSTALLATION_ID, RequestPriority.INTERACTIVE)
+
+    assert clock.sleeps == [20]
+
+
+def test_throttle_records_budget_from_github(
+    scheduler: RateLimitScheduler, github: Github, requester: Requester
+) -> None:
+    rate_limiter = scheduler.for_installation(INSTALLATION_ID, github)
+
+    with rate_limiter.throttle(RequestPriority.BULK):
+        respond(requester, remaining=4000, limit=5000, reset_at=NOW + 600)
+
+    assert scheduler.budgets() == {
+        INSTALLATION_ID: RateLimitBudget(
+            remaining=4000, limit=5000, reset_at=NOW + 600
+        )
+    }
+    github.get_rate_limit.assert_not_called()
+
+
+def test_throttle_without_request_releases_budget(
+    scheduler: RateLimitScheduler, github: Github, requester: Requester
+) -> None:
+    rate_limiter = scheduler.for_installation(INSTALLATION_ID, github)
+    respond(requester, remaining=4000, limit=5000, reset_at=NOW + 600)
+    scheduler.update(INSTALLATION_ID, remaining=4000, limit=5000, reset_at=NOW + 600)
+
+    with pytest.raises(ValueError):
+        with rate_limiter.throttle(RequestPriority.BULK):
+            raise ValueError("failed before any request")
+
+    assert scheduler.budgets()[INSTALLATION_ID].remaining == 4000
+    github.get_rate_limit.assert_not_called()
+
+
+def test_throttle_blocks_on_secondary_rate_limit(
+    scheduler: RateLimitScheduler, github: Github, clock: FakeClock
+) -> None:
+    rate_limiter = scheduler.for_installation(INSTALLATION_ID, github)
+
+    with pytest.raises(RateLimitExceededException):
+        with rate_limiter.throttle(RequestPriority.BULK):
+            raise RateLimitExceededException(
+                403, MagicMock(), headers={"retry-after": "42"}
+            )
+
+    assert scheduler.budgets()[INSTALLATION_ID].blocked_until == NOW + 42
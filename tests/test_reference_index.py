@@ -0,0 +1,105 @@
+import pytest
+from tree_sitter_languages import get_language
+
+from acedev.tools.reference_index import Reference, ReferenceIndex, ReferenceKind
+from tests.conftest import Blobs
+
+FILES = {
+    "app/files.py": """\
+def get_file(path):
+    return path
+
+
+class Repository:
+    def get_file(self):
+        return get_file(self.path)
+""",
+    "app/cli.py": """\
+from app.files import get_file
+
+repository.get_file()
+handler = get_file
+""",
+    "README.md": "get_file(path)\n",
+}
+
+
+@pytest.fixture
+def index(blobs: Blobs) -> ReferenceIndex:
+    index = ReferenceIndex(language=get_language("python"), extensions=(".py",))
+    blobs.update(index, FILES)
+    return index
+
+
+def test_find(index: ReferenceIndex) -> None:
+    assert [str(reference) for reference in index.find("get_file")] == [
+        "app/cli.py:1:23 reference",
+        "app/cli.py:3:12 call",
+        "app/cli.py:4:11 reference",
+        "app/files.py:1:5 definition",
+        "app/files.py:6:9 definition",
+        "app/files.py:7:16 call",
+    ]
+    assert index.find("get_file")[-1] == Reference(
+        path="app/files.py",
+        line=7,
+        column=16,
+        start_byte=FILES["app/files.py"].index("get_file(self.path)"),
+        end_byte=FILES["app/files.py"].index("get_file(self.path)") + len("get_file"),
+        kind=ReferenceKind.CALL,
+    )
+    assert index.find("missing") == []
+
+
+def test_object_of_method_call_is_a_reference(index: ReferenceIndex) -> None:
+    assert [str(reference) for reference in index.find("repository")] == [
+        "app/cli.py:3:1 reference"
+    ]
+
+
+@pytest.mark.parametrize(
+    "language, path, content, name, expected",
+    [
+        (
+            "javascript",
+            "app.js",
+            "class Repo {\n  getFile() {}\n}\nrepo.getFile();\n",
+            "getFile",
+            ["app.js:2:3 definition", "app.js:4:6 call"],
+        ),
+        (
+            "go",
+            "main.go",
+            "func (r Repo) GetFile() {}\n\nfunc main() { r.GetFile() }\n",
+            "GetFile",
+            ["main.go:1:15 definition", "main.go:3:17 call"],
+        ),
+    ],
+)
+def test_find_member_names(
+    blobs: Blobs, language: str, path: str, content: str, name: str, expected: list[str]
+) -> None:
+    index = ReferenceIndex(language=get_language(language), extensions=(path[path.index("."):],))
+    blobs.update(index, {path: content})
+
+    assert [str(reference) for reference in index.find(name)] == expected
+
+
+def test_update_indexes_changed_files_only(index: ReferenceIndex, blobs: Blobs) -> None:
+    blobs.reads.clear()
+    files = {**FILES, "app/cli.py": "from app.files import get_file as load\n\nload()\n"}
+
+    blobs.update(index, files)
+
+    assert blobs.reads == [f"sha-{files['app/cli.py']}"]
+    assert [str(reference) for reference in index.find("get_file")] == [
+        "app/cli.py:1:23 reference",
+        "app/files.py:1:5 definition",
+        "app/files.py:6:9 definition",
+        "app/files.py:7:16 call",
+    ]
+    assert [str(reference) for reference in index.find("load")] == [
+        "app/cli.py:1:35 reference",
+        "app/cli.py:3:1 call",
+    ]
+    assert index.find("handler") == []
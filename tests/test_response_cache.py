@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import pytest
+
+from acedev.service.response_cache import ResponseCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def cache(tmp_path: Path, clock: Clock) -> ResponseCache:
+    return ResponseCache(str(tmp_path / "cache" / "responses.db"), ttl=60, clock=clock)
+
+
+def test_get_put(cache: ResponseCache) -> None:
+    key = cache.key(model="gpt-4", messages=[{"role": "user", "content": "hi"}])
+
+    assert cache.get(key) is None
+    cache.put(key, "response")
+
+    assert cache.get(key) == "response"
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_key_depends_on_request(cache: ResponseCache) -> None:
+    assert cache.key(model="gpt-4", temperature=0) == cache.key(temperature=0, model="gpt-4")
+    assert cache.key(model="gpt-4", temperature=0) != cache.key(model="gpt-4o", temperature=0)
+
+
+def test_entries_are_persisted(cache: ResponseCache, clock: Clock) -> None:
+    cache.put("key", "response")
+
+    reopened = ResponseCache(cache.path, ttl=60, clock=clock)
+
+    assert reopened.get("key") == "response"
+
+
+def test_expired_entries_are_not_served(cache: ResponseCache, clock: Clock) -> None:
+    cache.put("key", "response")
+    clock.now += 60
+
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted(cache: ResponseCache, clock: Clock) -> None:
+    cache.max_bytes = 10
+    cache.put("first", "12345")
+    clock.now += 1
+    cache.put("second", "12345")
+    clock.now += 1
+    cache.get("first")
+
+    cache.put("third", "12345")
+
+    assert cache.get("first") == "12345"
+    assert cache.get("second") is None
+    assert cache.get("third") == "12345"
+    assert cache.stats.evictions == 1
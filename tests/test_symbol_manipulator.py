@@ -181,6 +181,54 @@ def my_func():
     assert result == expected
 
 
+DECORATED_FILE = File(
+    path="decorated.py",
+    content="""\
+class MyClass:
+    @property
+    def name(self):
+        return "old"
+
+    @staticmethod
+    @cache
+    def build():
+        pass
+""",
+)
+
+
+def test_update_symbol_keeps_decorators(symbol_manipulator: SymbolManipulator) -> None:
+    result = symbol_manipulator.update_symbol(
+        "name", 'def name(self):\n    return "new"', DECORATED_FILE
+    )
+
+    assert result.content == DECORATED_FILE.content.replace('"old"', '"new"')
+
+
+def test_update_symbol_replaces_decorators(symbol_manipulator: SymbolManipulator) -> None:
+    result = symbol_manipulator.update_symbol(
+        "build", "@classmethod\ndef build(cls):\n    pass", DECORATED_FILE
+    )
+
+    assert result.content == DECORATED_FILE.content.replace(
+        "    @staticmethod\n    @cache\n    def build():", "    @classmethod\n    def build(cls):"
+    )
+
+
+def test_update_symbols_keeps_decorators(symbol_manipulator: SymbolManipulator) -> None:
+    result = symbol_manipulator.update_symbols(
+        [
+            ("name", 'def name(self):\n    return "new"'),
+            ("build", "def build():\n    return 1"),
+        ],
+        DECORATED_FILE,
+    )
+
+    assert result.content == DECORATED_FILE.content.replace('"old"', '"new"').replace(
+        "def build():\n        pass", "def build():\n        return 1"
+    )
+
+
 def test_update_symbol_in_file_class(
     symbol_manipulator: SymbolManipulator, file1: File
 ) -> None:
@@ -224,7 +272,6 @@ class MyClass:
     assert result == expected
 
 
-# Fixme: The indentation of the method body is wrong, it should be indented by 8 spaces
 def test_update_symbol_in_file_method(
     symbol_manipulator: SymbolManipulator, file1: File
 ) -> None:
@@ -245,7 +292,7 @@ class MyClass:
         pass
 
     def my_method2(self):
-    print("Hello, World!")
+        print("Hello, World!")
 """,
     )
 
@@ -258,7 +305,6 @@ def my_method2(self):
     assert result == expected
 
 
-# Fixme: The update files has 2 decorators and an extra newline at the end
 def test_update_symbol_in_file_function_with_decorator(
     symbol_manipulator: SymbolManipulator, file2: File
 ) -> None:
@@ -267,11 +313,9 @@ def test_update_symbol_in_file_function_with_decorator(
         content="""\
 from datetime import datetime
 
-@my_decorator
 @my_decorator
 def my_func(param1: str, param2: int) -> None:
     print("Hello, World!")
-\
 """,
     )
 
@@ -499,3 +543,221 @@ def my_func(param1: str, param2: int) -> None:
     )
 
     assert result == expected
+
+
+def test_get_symbol_scope_method(symbol_manipulator: SymbolManipulator, file1: File) -> None:
+    scope = symbol_manipulator.get_symbol_scope("my_method", file1)
+
+    assert scope == File(
+        path="file1.py",
+        content="""\
+import logging
+
+
+def my_method(self):
+    pass
+""",
+    )
+
+
+def test_get_symbol_scope_not_found(
+    symbol_manipulator: SymbolManipulator, file1: File
+) -> None:
+    with pytest.raises(SymbolManipulatorException):
+        symbol_manipulator.get_symbol_scope("non_existent", file1)
+
+
+def test_splice_symbol_scope_method(
+    symbol_manipulator: SymbolManipulator, file1: File
+) -> None:
+    scope = File(
+        path="file1.py",
+        content="""\
+import logging
+import os
+
+
+def my_method(self):
+    return os.getpid()
+""",
+    )
+
+    new_file = symbol_manipulator.splice_symbol_scope("my_method", scope, file1)
+
+    assert new_file == File(
+        path="file1.py",
+        content="""\
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONSTANT = "constant"
+
+def my_func():
+    pass
+
+class MyClass:
+    def my_method(self):
+        return os.getpid()
+
+    def my_method2(self):
+        pass
+""",
+    )
+
+
+def test_splice_symbol_scope_function_with_decorator(
+    symbol_manipulator: SymbolManipulator, file2: File
+) -> None:
+    scope = symbol_manipulator.get_symbol_scope("my_func", file2)
+    scope = File(path=scope.path, content=scope.content.replace("pass", "return None"))
+
+    new_file = symbol_manipulator.splice_symbol_scope("my_func", scope, file2)
+
+    assert new_file.content == file2.content.replace("pass", "return None")
+
+
+def test_splice_symbol_scope_rejects_other_definitions(
+    symbol_manipulator: SymbolManipulator, file1: File
+) -> None:
+    scope = File(
+        path="file1.py",
+        content="""\
+import logging
+
+TIMEOUT = 10
+
+
+def helper():
+    return TIMEOUT
+
+
+def my_method(self):
+    return helper()
+""",
+    )
+
+    with pytest.raises(SymbolManipulatorException) as e:
+        symbol_manipulator.splice_symbol_scope("my_method", scope, file1)
+
+    assert "TIMEOUT = 10, def helper():" in e.value.message
+
+
+def test_symbol_scope_keeps_multiline_strings(symbol_manipulator: SymbolManipulator) -> None:
+    file = File(
+        path="file.py",
+        content="""\
+class MyClass:
+    def my_method(self):
+        query = \"\"\"
+SELECT *
+    FROM table
+\"\"\"
+        return query
+""",
+    )
+
+    scope = symbol_manipulator.get_symbol_scope("my_method", file)
+
+    assert scope.content == """\
+def my_method(self):
+    query = \"\"\"
+SELECT *
+    FROM table
+\"\"\"
+    return query
+"""
+
+    scope = File(path=scope.path, content=scope.content.replace("return query", "return query.strip()"))
+    new_file = symbol_manipulator.splice_symbol_scope("my_method", scope, file)
+
+    assert new_file.content == file.content.replace("return query", "return query.strip()")
+
+
+def test_find_mentioned_symbols(symbol_manipulator: SymbolManipulator, file1: File) -> None:
+    assert symbol_manipulator.find_mentioned_symbols(
+        "Log a warning in MyClass.my_method", file1
+    ) == ["MyClass", "my_method"]
+
+
+def test_update_symbol_keeps_other_lines_untouched(
+    symbol_manipulator: SymbolManipulator,
+) -> None:
+    file = File(
+        path="file.py",
+        content="x = 1  \n\nclass MyClass:\n    def my_method(self):\n        pass\n\ny = 2\t\n",
+    )
+
+    result = symbol_manipulator.update_symbol(
+        "my_method", "    def my_method(self):\n        return 1", file
+    )
+
+    assert result.content == (
+        "x = 1  \n\nclass MyClass:\n    def my_method(self):\n        return 1\n\ny = 2\t\n"
+    )
+
+
+def test_update_symbols(symbol_manipulator: SymbolManipulator, file1: File) -> None:
+    result = symbol_manipulator.update_symbols(
+        [
+            ("my_method2", "def my_method2(self):\n    return 2"),
+            ("my_func", "def my_func():\n    return 0"),
+            ("my_method", "def my_method(self):\n    return 1"),
+        ],
+        file1,
+    )
+
+    assert result == File(
+        path="file1.py",
+        content="""\
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONSTANT = "constant"
+
+def my_func():
+    return 0
+
+class MyClass:
+    def my_method(self):
+        return 1
+
+    def my_method2(self):
+        return 2
+""",
+    )
+
+
+def test_update_symbols_validates_all_definitions(
+    symbol_manipulator: SymbolManipulator, file1: File
+) -> None:
+    with pytest.raises(SymbolManipulatorException):
+        symbol_manipulator.update_symbols(
+            [
+                ("my_func", "def my_func():\n    return 0"),
+                ("my_method", "def other(self):\n    return 1"),
+            ],
+            file1,
+        )
+
+
+def test_update_symbols_overlapping_definitions(
+    symbol_manipulator: SymbolManipulator, file1: File
+) -> None:
+    with pytest.raises(SymbolManipulatorException):
+        symbol_manipulator.update_symbols(
+            [
+                ("MyClass", "class MyClass:\n    pass"),
+                ("my_method", "def my_method(self):\n    return 1"),
+            ],
+            file1,
+        )
+
+
+def test_get_symbols(symbol_manipulator: SymbolManipulator, file1: File) -> None:
+    assert symbol_manipulator.get_symbols(["my_func", "non_existent"], file1) == {
+        "my_func": Symbol(content="def my_func():\n    pass", path="file1.py"),
+        "non_existent": None,
+    }
@@ -0,0 +1,44 @@
+import pytest
+from tree_sitter_languages import get_parser
+
+from acedev.service.model import File
+from acedev.tools.syntax_validator import (
+    ParseError,
+    SyntaxValidator,
+    SyntaxValidatorException,
+)
+
+VALID = File(path="file.py", content="def my_func():\n    return 1\n")
+INVALID = File(path="file.py", content="def my_func():\n    print('x'\n")
+
+
+@pytest.fixture
+def syntax_validator() -> SyntaxValidator:
+    return SyntaxValidator(get_parser("python"), [".py"])
+
+
+def test_errors(syntax_validator: SyntaxValidator) -> None:
+    assert syntax_validator.errors(VALID) == []
+    assert syntax_validator.errors(INVALID) == [
+        ParseError(line=2, column=5, text="print('x'")
+    ]
+
+
+def test_errors_ignores_other_languages(syntax_validator: SyntaxValidator) -> None:
+    assert syntax_validator.errors(File(path="README.md", content="# (")) == []
+
+
+def test_validate_rejects_new_errors(syntax_validator: SyntaxValidator) -> None:
+    with pytest.raises(SyntaxValidatorException) as e:
+        syntax_validator.validate(VALID, INVALID)
+
+    assert e.value.message == (
+        "The edit introduces syntax errors in file.py:\n"
+        "line 2, column 5: unexpected \"print('x'\""
+    )
+
+
+def test_validate_allows_existing_errors(syntax_validator: SyntaxValidator) -> None:
+    edited = File(path="file.py", content="import os\n\n" + INVALID.content)
+
+    syntax_validator.validate(INVALID, edited)
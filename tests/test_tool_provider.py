@@ -1,20 +1,38 @@
+import hashlib
 from unittest.mock import create_autospec
 
 import pytest
+from github import Github
+from github.Repository import Repository
+from github.Requester import Requester
+from tree_sitter_languages import get_language, get_parser
 
 from acedev.agent.coding_agent import CodingAgent, CodingAgentException
-from acedev.service.github_service import GitHubService
-from acedev.service.git_repository import GitRepository
-from acedev.service.model import File, Symbol
+from acedev.service.github_service import GitHubService, GitHubServiceException
+from acedev.service.git_repository import GitRepository, GitRepositoryException
+from acedev.service.model import File, Symbol, TreeEntry
+from acedev.service.rate_limit_scheduler import RateLimitScheduler
+from acedev.tools.blob_index import BlobIndex
 from acedev.tools.code_editor import CodeEditor
+from acedev.tools.code_retrieval import Bm25Index
+from acedev.tools.code_search import TrigramIndex
+from acedev.tools.import_graph import ImportGraph
+from acedev.tools.reference_index import ReferenceIndex
 from acedev.tools.symbol_manipulator import SymbolManipulator
-from acedev.tools.tool_provider import ToolProvider
+from acedev.tools.syntax_validator import SyntaxValidator
+from acedev.tools.tool_provider import (
+    FILE_PAGE_LINES,
+    MAX_SEARCH_RESULTS,
+    SCOPED_EDIT_MIN_LINES,
+    ToolProvider,
+)
 
 
 @pytest.fixture
 def git_repository() -> GitRepository:
     mock = create_autospec(GitRepository)
     mock.default_branch = "main"
+    mock.local_reads = False
     return mock
 
 
@@ -67,6 +85,7 @@ def test_get_project_outline(
     git_repository: GitRepository,
     symbol_manipulator: SymbolManipulator,
 ) -> None:
+    git_repository.language = "go"
     git_repository.branch_exists.return_value = True
     symbol_manipulator.get_project_outline.return_value = "project_outline"
     assert tool_provider.get_project_outline() == "project_outline"
@@ -85,6 +104,32 @@ def test_get_project_outline_branch_does_not_exist(
     )
 
 
+def test_get_file_when_rate_limit_is_exhausted(
+    github_service: GitHubService,
+    symbol_manipulator: SymbolManipulator,
+    code_editor: CodeEditor,
+    coding_agent: CodingAgent,
+) -> None:
+    github = create_autospec(Github)
+    github._Github__requester = create_autospec(Requester)
+    scheduler = RateLimitScheduler(clock=lambda: 1000.0)
+    scheduler.update(1, remaining=400, limit=5000, reset_at=1000.0 + 1800)
+    github_repo = create_autospec(Repository)
+    github_repo.default_branch = "main"
+    github_repo.language = "Python"
+    git_repository = GitRepository(github_repo, scheduler.for_installation(1, github))
+    tool_provider = ToolProvider(
+        git_repository, github_service, symbol_manipulator, code_editor, coding_agent
+    )
+
+    result = tool_provider.get_file("test_file.py")
+
+    assert result == (
+        "Failed to get test_file.py: GitHub rate limit for installation 1 resets in 1800s"
+    )
+    github_repo.get_contents.assert_not_called()
+
+
 def test_get_symbol(
     tool_provider: ToolProvider,
     git_repository: GitRepository,
@@ -109,6 +154,194 @@ def test_get_symbol_branch_does_not_exist(
     )
 
 
+def test_get_pr_file_diff(
+    tool_provider: ToolProvider, github_service: GitHubService
+) -> None:
+    github_service.get_pull_request_file_diff.return_value = "diff"
+
+    assert tool_provider.get_pr_file_diff("branch", "path") == "diff"
+    github_service.get_pull_request_file_diff.assert_called_once_with(
+        branch="branch", filename="path"
+    )
+
+
+def test_get_pr_file_diff_failure(
+    tool_provider: ToolProvider, github_service: GitHubService
+) -> None:
+    github_service.get_pull_request_file_diff.side_effect = GitHubServiceException(
+        "not found"
+    )
+
+    assert (
+        tool_provider.get_pr_file_diff("branch", "path")
+        == "Failed to get diff of path: not found"
+    )
+
+
+def test_edit_file_rejects_syntax_errors(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    code_editor: CodeEditor,
+    file_mock: File,
+) -> None:
+    tool_provider.syntax_validator = SyntaxValidator(get_parser("python"), [".py"])
+    git_repository.branch_exists.return_value = True
+    git_repository.get_file.return_value = file_mock
+    code_editor.apply_diff.return_value = File(path="test_file.py", content="print('Hello'")
+
+    result = tool_provider.edit_file("feature-branch", "test_file.py", "diff")
+
+    assert result == (
+        "Failed to edit test_file.py in feature-branch: The edit introduces syntax errors "
+        "in test_file.py:\nline 1, column 1: unexpected \"print('Hello'\""
+    )
+    git_repository.update_file.assert_not_called()
+
+
+def test_update_symbols(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    symbol_manipulator: SymbolManipulator,
+    file_mock: File,
+) -> None:
+    new_file = File(path="test_file.py", content="new content")
+    git_repository.branch_exists.return_value = True
+    git_repository.get_file.return_value = file_mock
+    symbol_manipulator.update_symbols.return_value = new_file
+
+    result = tool_provider.update_symbols(
+        ["func1", "func2"], ["def func1(): ...", "def func2(): ..."], "test_file.py", "feature-branch"
+    )
+
+    assert result == "Updated ['func1', 'func2'] in test_file.py on branch='feature-branch'"
+    symbol_manipulator.update_symbols.assert_called_once_with(
+        definitions=[("func1", "def func1(): ..."), ("func2", "def func2(): ...")],
+        file=file_mock,
+    )
+    git_repository.update_file.assert_called_once_with(file=new_file, branch="feature-branch")
+
+
+def test_update_symbols_mismatched_definitions(tool_provider: ToolProvider) -> None:
+    result = tool_provider.update_symbols(
+        ["func1", "func2"], ["def func1(): ..."], "test_file.py", "feature-branch"
+    )
+
+    assert result == (
+        "Failed to update ['func1', 'func2'] in test_file.py: got 2 symbols and 1 definitions."
+    )
+
+
+def test_get_file_line_range(
+    tool_provider: ToolProvider, git_repository: GitRepository
+) -> None:
+    git_repository.get_file.return_value = File(
+        path="file.py", content="".join(f"line {number}\n" for number in range(1, 13))
+    )
+
+    result = tool_provider.get_file("file.py", start_line=9, end_line=10)
+
+    assert result == (
+        "Lines 9-10 of 12 in file.py:\n"
+        " 9 | line 9\n"
+        "10 | line 10\n\n"
+        "Read more with start_line=11."
+    )
+
+
+def test_get_file_end_line_before_start_line(
+    tool_provider: ToolProvider, git_repository: GitRepository
+) -> None:
+    git_repository.get_file.return_value = File(
+        path="file.py", content="".join(f"line {number}\n" for number in range(1, 13))
+    )
+
+    assert tool_provider.get_file("file.py", start_line=3, end_line=0) == (
+        "Failed to read file.py: end_line=0 is before start_line=3."
+    )
+
+
+def test_get_file_large_file_is_paginated(
+    tool_provider: ToolProvider, git_repository: GitRepository
+) -> None:
+    git_repository.get_file.return_value = File(
+        path="file.py", content="line\n" * (FILE_PAGE_LINES + 1)
+    )
+
+    result = tool_provider.get_file("file.py")
+
+    assert result.startswith(f"Lines 1-{FILE_PAGE_LINES} of {FILE_PAGE_LINES + 1} in file.py:\n")
+    assert result.endswith(f"Read more with start_line={FILE_PAGE_LINES + 1}.")
+
+
+def test_get_symbols(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    symbol_manipulator: SymbolManipulator,
+) -> None:
+    file1 = File(path="file1.py", content="content1")
+    git_repository.get_file.side_effect = lambda path, branch: file1 if path == "file1.py" else None
+    symbol_manipulator.get_symbols.return_value = {
+        "func1": Symbol(content="def func1(): ...", path="file1.py"),
+        "func2": None,
+    }
+
+    result = tool_provider.get_symbols(
+        ["file1.py", "file2.py", "file1.py"], ["func1", "func3", "func2"]
+    )
+
+    assert result == (
+        "```file1.py func1\ndef func1(): ...\n```\n\n"
+        "Failed to get func2 from file1.py: symbol='func2' does not exist.\n\n"
+        "Failed to get func3 from file2.py: path='file2.py' does not exist."
+    )
+    assert git_repository.get_file.call_count == 2
+    symbol_manipulator.get_symbols.assert_called_once_with(symbols=["func1", "func2"], file=file1)
+
+
+def test_get_files(tool_provider: ToolProvider, git_repository: GitRepository) -> None:
+    git_repository.get_file.side_effect = lambda path, branch: (
+        File(path=path, content=f"content of {path}") if path != "missing.py" else None
+    )
+
+    result = tool_provider.get_files(["file1.py", "missing.py", "file2.py"])
+
+    assert result == (
+        "```file1.py\ncontent of file1.py\n```\n\n"
+        "Failed to get missing.py: path does not exist.\n\n"
+        "```file2.py\ncontent of file2.py\n```"
+    )
+
+
+def test_get_files_from_mirror(tool_provider: ToolProvider, git_repository: GitRepository) -> None:
+    git_repository.local_reads = True
+    git_repository.get_files_by_path.return_value = {
+        "file1.py": File(path="file1.py", content="content of file1.py"),
+        "missing.py": None,
+    }
+
+    result = tool_provider.get_files(["file1.py", "missing.py", "file1.py"])
+
+    assert result == (
+        "```file1.py\ncontent of file1.py\n```\n\n"
+        "Failed to get missing.py: path does not exist."
+    )
+    git_repository.get_files_by_path.assert_called_once_with(
+        ["file1.py", "missing.py", "file1.py"], "main"
+    )
+    git_repository.get_file.assert_not_called()
+
+
+def test_get_files_branch_does_not_exist(
+    tool_provider: ToolProvider, git_repository: GitRepository
+) -> None:
+    git_repository.branch_exists.return_value = False
+
+    assert (
+        tool_provider.get_files(["file1.py"], branch="missing")
+        == "Failed to get files: branch='missing' does not exist."
+    )
+
+
 def test_request_edit_happy_path(
     tool_provider: ToolProvider,
     git_repository: GitRepository,
@@ -118,9 +351,10 @@ def test_request_edit_happy_path(
     branch = "feature-branch"
     path = "module/submodule/file.py"
     instruction = "Please update the greeting message."
+    edited_file = File(path=file_mock.path, content="print('Hello, AceDev!')")
     git_repository.branch_exists.return_value = True
     git_repository.get_file.return_value = file_mock
-    coding_agent.edit_file.return_value = file_mock
+    coding_agent.edit_file.return_value = edited_file
     git_repository.update_file.return_value = (
         None  # Assuming update_file returns nothing on success
     )
@@ -129,12 +363,134 @@ def test_request_edit_happy_path(
         branch=branch, path=path, instruction=instruction
     )
 
-    assert result == f"Edited {path}. The new file content is:\n\n{file_mock.content}"
+    assert result == (
+        "Edited test_file.py: +1 -1 lines, 1 lines total, "
+        f"sha256 {hashlib.sha256(edited_file.content.encode()).hexdigest()[:12]}.\n"
+        "```diff\n"
+        "--- test_file.py\n"
+        "+++ test_file.py\n"
+        "@@ -1 +1 @@\n"
+        "-print('Hello, World!')\n"
+        "+print('Hello, AceDev!')\n"
+        "```"
+    )
     git_repository.get_file.assert_called_once_with(path=path, branch=branch)
     coding_agent.edit_file.assert_called_once_with(
         instructions=instruction, file=file_mock
     )
-    git_repository.update_file.assert_called_once_with(file=file_mock, branch=branch)
+    git_repository.update_file.assert_called_once_with(file=edited_file, branch=branch)
+
+
+def test_request_edit_without_changes(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    coding_agent: CodingAgent,
+    file_mock: File,
+) -> None:
+    git_repository.branch_exists.return_value = True
+    git_repository.get_file.return_value = file_mock
+    coding_agent.edit_file.return_value = file_mock
+
+    result = tool_provider.request_edit(
+        branch="feature-branch", path=file_mock.path, instruction="Keep it as it is."
+    )
+
+    assert result == f"No changes to {file_mock.path}."
+    git_repository.update_file.assert_not_called()
+
+
+def test_request_edit_symbol_scope(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    symbol_manipulator: SymbolManipulator,
+    coding_agent: CodingAgent,
+    file_mock: File,
+) -> None:
+    scope = File(path="test_file.py", content="def my_func():\n    pass\n")
+    edited_scope = File(path="test_file.py", content="def my_func():\n    return 1\n")
+    edited_file = File(path="test_file.py", content="edited")
+    git_repository.branch_exists.return_value = True
+    git_repository.get_file.return_value = file_mock
+    symbol_manipulator.get_symbol_scope.return_value = scope
+    coding_agent.edit_file.return_value = edited_scope
+    symbol_manipulator.splice_symbol_scope.return_value = edited_file
+
+    result = tool_provider.request_edit(
+        branch="feature-branch", path="test_file.py", instruction="Return 1", symbol="my_func"
+    )
+
+    assert result == (
+        "Edited test_file.py: +1 -1 lines, 1 lines total, sha256 1fb9f4097256.\n"
+        "```diff\n"
+        "--- test_file.py\n"
+        "+++ test_file.py\n"
+        "@@ -1 +1 @@\n"
+        "-print('Hello, World!')\n"
+        "+edited\n"
+        "```"
+    )
+    symbol_manipulator.get_symbol_scope.assert_called_once_with("my_func", file_mock)
+    coding_agent.edit_file.assert_called_once_with(instructions="Return 1", file=scope)
+    symbol_manipulator.splice_symbol_scope.assert_called_once_with(
+        "my_func", edited_scope, file_mock
+    )
+    git_repository.update_file.assert_called_once_with(file=edited_file, branch="feature-branch")
+
+
+def test_request_edit_infers_symbol_scope_for_large_files(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    symbol_manipulator: SymbolManipulator,
+) -> None:
+    file = File(path="test_file.py", content="\n" * SCOPED_EDIT_MIN_LINES)
+    git_repository.language = "python"
+    git_repository.branch_exists.return_value = True
+    git_repository.get_file.return_value = file
+    symbol_manipulator.find_mentioned_symbols.return_value = ["my_func"]
+    symbol_manipulator.splice_symbol_scope.return_value = file
+
+    tool_provider.request_edit(
+        branch="feature-branch", path="test_file.py", instruction="Return 1 from my_func"
+    )
+
+    symbol_manipulator.get_symbol_scope.assert_called_once_with("my_func", file)
+
+
+def test_request_edit_edits_whole_file_outside_python(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    symbol_manipulator: SymbolManipulator,
+    coding_agent: CodingAgent,
+) -> None:
+    file = File(path="app.js", content="function myFunc() {}\n" * SCOPED_EDIT_MIN_LINES)
+    git_repository.language = "javascript"
+    git_repository.branch_exists.return_value = True
+    git_repository.get_file.return_value = file
+    coding_agent.edit_file.return_value = file
+
+    tool_provider.request_edit(
+        branch="feature-branch", path="app.js", instruction="Return 1 from myFunc"
+    )
+
+    symbol_manipulator.find_mentioned_symbols.assert_not_called()
+    coding_agent.edit_file.assert_called_once_with(instructions="Return 1 from myFunc", file=file)
+
+
+def test_request_edit_show_content(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    coding_agent: CodingAgent,
+    file_mock: File,
+) -> None:
+    git_repository.branch_exists.return_value = True
+    git_repository.get_file.return_value = file_mock
+    coding_agent.edit_file.return_value = File(path="test_file.py", content="edited")
+
+    result = tool_provider.request_edit(
+        branch="feature-branch", path="test_file.py", instruction="Edit", show_content=True
+    )
+
+    assert result == "Edited test_file.py. The new file content is:\n\nedited"
 
 
 def test_request_edit_default_branch(
@@ -208,3 +564,221 @@ def test_request_edit_coding_agent_exception(
     coding_agent.edit_file.assert_called_once_with(
         instructions=instruction, file=file_mock
     )
+
+
+@pytest.fixture
+def search_repository(git_repository: GitRepository) -> GitRepository:
+    git_repository.full_name = "octocat/search"
+    BlobIndex._indexes.pop(git_repository.full_name, None)
+    git_repository.get_tree.return_value = [
+        TreeEntry(path="app.py", type="blob", size=40, sha="a"),
+        TreeEntry(path="test_app.py", type="blob", size=40, sha="b"),
+    ]
+    git_repository.get_blobs.return_value = {
+        "a": b"def run():\n    return 1\n",
+        "b": b"from app import run\n\nassert run() == 1\n",
+    }
+    return git_repository
+
+
+def test_search_code(tool_provider: ToolProvider, search_repository: GitRepository) -> None:
+    assert tool_provider.search_code(r"run\(") == (
+        "app.py:1: def run():\ntest_app.py:3: assert run() == 1"
+    )
+    assert tool_provider.search_code("import", path_glob="app*") == "No matches for 'import'."
+
+    # The unchanged tree is not read again
+    tool_provider.search_code("return", branch="dev")
+    search_repository.get_tree.assert_called_with("dev")
+    search_repository.get_blobs.assert_called_once()
+
+
+def test_search_code_max_results(
+    tool_provider: ToolProvider, search_repository: GitRepository
+) -> None:
+    search_repository.get_blobs.return_value = {
+        "a": "x = 1\n".encode() * (MAX_SEARCH_RESULTS + 1),
+        "b": b"",
+    }
+
+    output = tool_provider.search_code("x = 1")
+
+    assert output.count("app.py:") == MAX_SEARCH_RESULTS
+    assert output.endswith("Narrow the pattern or path_glob to see the rest.")
+
+
+def test_search_code_failure(
+    tool_provider: ToolProvider, search_repository: GitRepository
+) -> None:
+    assert tool_provider.search_code("run(").startswith("Failed to search 'run(': Invalid")
+
+    search_repository.get_tree.side_effect = GitRepositoryException("Branch does not exist: dev")
+    assert tool_provider.search_code("run", branch="dev") == (
+        "Failed to search 'run': Branch does not exist: dev"
+    )
+
+
+def test_find_relevant_code(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    symbol_manipulator: SymbolManipulator,
+) -> None:
+    git_repository.full_name = "octocat/retrieval"
+    git_repository.language = "python"
+    symbol_manipulator.language = get_language("python")
+    BlobIndex._indexes.pop(git_repository.full_name, None)
+    git_repository.get_tree.return_value = [
+        TreeEntry(path="app/login.py", type="blob", size=40, sha="a"),
+        TreeEntry(path="app/billing.py", type="blob", size=40, sha="b"),
+    ]
+    git_repository.get_blobs.return_value = {
+        "a": b"def check_password(user, password):\n    return True\n",
+        "b": b"def charge(invoice):\n    pass\n",
+    }
+
+    assert tool_provider.find_relevant_code("Login accepts any password") == (
+        "Files:\n- app/login.py\n\nSymbols:\n- app/login.py:1 def check_password(user, password):"
+    )
+    assert tool_provider.find_relevant_code("unrelated words") == "No relevant code found."
+
+
+@pytest.fixture
+def graph_repository(
+    git_repository: GitRepository, symbol_manipulator: SymbolManipulator
+) -> GitRepository:
+    git_repository.full_name = "octocat/graph"
+    git_repository.language = "python"
+    symbol_manipulator.language = get_language("python")
+    BlobIndex._indexes.pop(git_repository.full_name, None)
+    git_repository.get_tree.return_value = [
+        TreeEntry(path="app/__init__.py", type="blob", size=0, sha="a"),
+        TreeEntry(path="app/cli.py", type="blob", size=40, sha="b"),
+        TreeEntry(path="app/models.py", type="blob", size=40, sha="c"),
+        TreeEntry(path="app/views.py", type="blob", size=40, sha="d"),
+    ]
+    git_repository.get_blobs.return_value = {
+        "a": b"",
+        "b": b"from app import views\n",
+        "c": b"import os\n",
+        "d": b"from .models import User\n",
+    }
+    return git_repository
+
+
+def test_get_project_outline_ranks_imported_modules_first(
+    tool_provider: ToolProvider,
+    graph_repository: GitRepository,
+    symbol_manipulator: SymbolManipulator,
+) -> None:
+    files = [
+        File(path="app/__init__.py", content=""),
+        File(path="app/cli.py", content="from app import views\n"),
+        File(path="app/views.py", content="from .models import User\n"),
+        File(path="app/models.py", content="import os\n"),
+    ]
+    graph_repository.get_files.return_value = iter(files)
+
+    tool_provider.get_project_outline()
+
+    symbol_manipulator.get_project_outline.assert_called_once_with(
+        [files[2], files[3], files[0], files[1]]
+    )
+    graph_repository.get_tree.assert_not_called()
+    graph_repository.get_blobs.assert_not_called()
+
+
+def test_who_imports(tool_provider: ToolProvider, graph_repository: GitRepository) -> None:
+    assert tool_provider.who_imports("app/models.py") == (
+        "Files importing app/models.py:\n- app/views.py"
+    )
+    assert tool_provider.who_imports("app/cli.py") == "No files import app/cli.py."
+    assert tool_provider.who_imports("README.md") == (
+        "Failed to find the files importing README.md: path is not a module of the project."
+    )
+
+
+def test_dependencies(tool_provider: ToolProvider, graph_repository: GitRepository) -> None:
+    assert tool_provider.dependencies("app/cli.py") == "Files imported by app/cli.py:\n- app/views.py"
+    assert tool_provider.dependencies("app/models.py") == (
+        "app/models.py imports no files of the project."
+    )
+
+    graph_repository.language = "go"
+    assert tool_provider.dependencies("app/cli.py") == (
+        "Failed to find the dependencies of app/cli.py: only Python projects are supported."
+    )
+
+
+def test_find_references(
+    tool_provider: ToolProvider,
+    git_repository: GitRepository,
+    symbol_manipulator: SymbolManipulator,
+) -> None:
+    git_repository.full_name = "octocat/references"
+    git_repository.language = "python"
+    symbol_manipulator.language = get_language("python")
+    BlobIndex._indexes.pop(git_repository.full_name, None)
+    git_repository.get_tree.return_value = [
+        TreeEntry(path="app.py", type="blob", size=40, sha="a"),
+        TreeEntry(path="README.md", type="blob", size=40, sha="b"),
+    ]
+    git_repository.get_blobs.return_value = {
+        "a": b"class Repo:\n    def load(self):\n        pass\n\nRepo().load()\n",
+        "b": b"Call load()",
+    }
+
+    assert tool_provider.find_references("Repo.load") == (
+        "References to Repo.load (1 definitions, 1 calls, 0 references):\n"
+        "app.py:2:9 definition\n"
+        "app.py:5:8 call"
+    )
+    assert tool_provider.find_references("save") == "No references to save found."
+
+
+@pytest.fixture
+def listed_repository(git_repository: GitRepository) -> GitRepository:
+    git_repository.get_tree.return_value = [
+        TreeEntry(path="setup.py", type="blob", size=10, sha="a"),
+        TreeEntry(path="app/views.py", type="blob", size=300, sha="b"),
+        TreeEntry(path="app/models/user.py", type="blob", size=200, sha="c"),
+        TreeEntry(path="app/models/order.py", type="blob", size=100, sha="d"),
+        TreeEntry(path="docs/index.md", type="blob", size=50, sha="e"),
+    ]
+    return git_repository
+
+
+def test_list_files(tool_provider: ToolProvider, listed_repository: GitRepository) -> None:
+    assert tool_provider.list_files("app/", glob="*.py") == (
+        "3 files in app:\n"
+        "app/models/order.py (100 bytes)\n"
+        "app/models/user.py (200 bytes)\n"
+        "app/views.py (300 bytes)"
+    )
+    listed_repository.get_tree.assert_called_once_with("main")
+    listed_repository.get_blobs.assert_not_called()
+    listed_repository.get_files.assert_not_called()
+
+
+def test_list_files_max_entries(
+    tool_provider: ToolProvider, listed_repository: GitRepository
+) -> None:
+    assert tool_provider.list_files(max_entries=2, branch="dev") == (
+        "5 files:\n"
+        "app/models/order.py (100 bytes)\n"
+        "app/models/user.py (200 bytes)\n\n"
+        "Showing the first 2 files. Narrow path_prefix or glob to see the rest.\n"
+        "Directories:\n"
+        "- app/ (3 files)\n"
+        "- docs/ (1 files)"
+    )
+    listed_repository.get_tree.assert_called_once_with("dev")
+
+
+def test_list_files_no_match(tool_provider: ToolProvider, listed_repository: GitRepository) -> None:
+    assert tool_provider.list_files("src") == "No files in src."
+    assert tool_provider.list_files(glob="*.rs") == "No files match '*.rs'."
+
+    listed_repository.get_tree.side_effect = GitRepositoryException("Branch does not exist: dev")
+    assert tool_provider.list_files(branch="dev") == (
+        "Failed to list files: Branch does not exist: dev"
+    )